@@ -5,30 +5,107 @@ from dotenv import load_dotenv
 from config import get_config
 from logging_config import configure_logging
 from error_handlers import register_error_handlers
+from metrics import register_metrics
 from database import init_db
 from routes.crypto_routes import crypto_bp
 from routes.signal_routes import signal_bp
 from routes.ai_routes import ai_bp
 from routes.market_routes import market_bp
+from routes.stream_routes import stream_bp
+from routes.backtest_routes import backtest_bp
+from services.ai_jobs import configure_ai_jobs, fail_interrupted_jobs
+from services.ai_service import configure_ai_client
+from services.candle_cache import configure_candle_cache
+from services.event_bus import install_commit_hooks
+from services.signal_rollups import install_rollup_hooks
+from services.insight_cache import configure_insight_cache
+from services.exchange_client import configure_exchange_clients
+from services.market_service import configure_resampling, start_market_stream
+from services.multi_exchange import configure_aggregation
+from services.single_flight import configure_single_flight
+from services.scheduler import build_scheduler
 
 
-def create_app() -> Flask:
+def create_app(start_background: bool = True) -> Flask:
+    """Build the app. start_background=False leaves the market stream and the scheduler off (CLI use)."""
     load_dotenv(override=True)
     app = Flask(__name__)
     app.config.update(get_config())   #It jumps to config.py, resolves the absolute path for crypto_intel.db, and stores these settings in the Flask app.config object.
 
     configure_logging(app)  #This sets up logging for the app, so you can easily track what's happening and debug issues.
 
-    init_db(app)  #It jumps to database.py, uses SQLAlchemy to check if crypto_intel.db exists, and runs db.create_all() to build the tables (Users, Assets, Signals, AIInsights).
+    # One shared exchange client per process; the limiter file in EXCHANGE_LOCK_DIR is shared by all gunicorn workers.
+    configure_exchange_clients(
+        rate_limit_ms=app.config["EXCHANGE_RATE_LIMIT_MS"],
+        lock_dir=os.path.abspath(app.config["EXCHANGE_LOCK_DIR"]) if app.config["EXCHANGE_LOCK_DIR"] else None,
+        pool_size=app.config["EXCHANGE_POOL_SIZE"],
+        timeout_ms=app.config["EXCHANGE_TIMEOUT_MS"],
+    )
+    # Identical concurrent snapshot and insight calls share one execution; SINGLEFLIGHT_LOCK_DIR extends that across workers.
+    configure_single_flight(
+        lock_dir=os.path.abspath(app.config["SINGLEFLIGHT_LOCK_DIR"]) if app.config["SINGLEFLIGHT_LOCK_DIR"] else None,
+        lock_wait_seconds=app.config["SINGLEFLIGHT_LOCK_WAIT_SECONDS"],
+    )
+    configure_candle_cache(
+        max_entries=app.config["CANDLE_CACHE_SIZE"],
+        max_candles=app.config["CANDLE_CACHE_MAX_CANDLES"],
+    )
+    # Timeframes that are multiples of RESAMPLE_BASE_TIMEFRAME are built from one base fetch per symbol.
+    configure_resampling(
+        base_timeframe=app.config["RESAMPLE_BASE_TIMEFRAME"],
+        max_base_candles=app.config["RESAMPLE_MAX_BASE_CANDLES"],
+    )
+    # POST /api/market/aggregate quotes venues on this pool and waits at most AGGREGATE_TIMEOUT_SECONDS.
+    configure_aggregation(
+        max_workers=app.config["AGGREGATE_MAX_WORKERS"],
+        timeout_seconds=app.config["AGGREGATE_TIMEOUT_SECONDS"],
+    )
+
+    # Shared Gemini client: AI_MAX_CONCURRENCY caps provider calls, and the job pool uses the same number of threads.
+    configure_ai_client(max_concurrency=app.config["AI_MAX_CONCURRENCY"])
+    configure_ai_jobs(
+        max_workers=app.config["AI_MAX_CONCURRENCY"],
+        job_timeout_seconds=app.config["AI_JOB_TIMEOUT_SECONDS"],
+    )
+    configure_insight_cache(
+        ttl_seconds=app.config["AI_CACHE_TTL_SECONDS"],
+        max_entries=app.config["AI_CACHE_SIZE"],
+    )
+
+    init_db(app)  #It jumps to database.py, uses SQLAlchemy to check if crypto_intel.db exists, and (unless DB_AUTO_MIGRATE=0) creates missing tables (Users, Assets, Signals, AIInsights).
 
     # The cursor registers the Blueprints. This maps URL prefixes (like /api/assets) to their respective route files.
     app.register_blueprint(crypto_bp, url_prefix="/api/assets")
     app.register_blueprint(signal_bp, url_prefix="/api/signals")
     app.register_blueprint(ai_bp, url_prefix="/api/ai")
     app.register_blueprint(market_bp, url_prefix="/api/market")
+    app.register_blueprint(stream_bp, url_prefix="/api/stream")
+    app.register_blueprint(backtest_bp, url_prefix="/api/backtest")
+
+    # Wake /api/stream/events listeners whenever a commit inserts signals or insights.
+    install_commit_hooks()
+    # Keep the signal_rollups table (GET /api/signals/analytics) in step with every signal insert, update and delete.
+    install_rollup_hooks()
 
     register_error_handlers(app)
 
+    # GET /metrics, per-route latency and DB timings; X-Profile requests are profiled when PROFILING_ENABLED.
+    register_metrics(app)
+
+    # AI jobs a previous run left queued or running would otherwise be polled forever.
+    if start_background:
+        with app.app_context():
+            fail_interrupted_jobs()
+
+    # WebSocket kline buffers for every stored asset; snapshots read them before falling back to REST.
+    if start_background and app.config["STREAM_ENABLED"]:
+        start_market_stream(app)
+
+    # In-process scheduler; the leader lock keeps it to one gunicorn worker. `python worker.py` runs it standalone instead.
+    if start_background and app.config["SCHEDULER_ENABLED"]:
+        app.extensions["signal_scheduler"] = build_scheduler(app)
+        app.extensions["signal_scheduler"].start()
+
     @app.route("/")
     def index():
         return render_template("index.html")
@@ -36,7 +113,9 @@ def create_app() -> Flask:
     return app
 
 # './instance/crypto_intel.db'
-app = create_app()
+# manage.py sets APP_START_BACKGROUND=0 before importing this module, so commands such as `migrate`
+# run before anything (stream seeding, scheduled scans) queries the database.
+app = create_app(start_background=os.environ.get("APP_START_BACKGROUND", "1") != "0")
 
 
 if __name__ == "__main__":
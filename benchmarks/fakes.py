@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+import json
+import math
+import random
+import time
+import zlib
+
+from services import ai_service, exchange_client
+from services.timeframes import candle_open_ms, is_calendar_timeframe, next_boundary_ms, timeframe_to_ms
+
+
+# Offline stand-ins for the exchange and Gemini. They are swapped in for the real ccxt and
+# google-generativeai modules (see install_fakes), so everything above them runs unchanged:
+# the client registry, rate limiter, candle cache and store, and the AI cache and jobs.
+
+
+def synthetic_ohlcv(
+    seed: str, timeframe: str, count: int, end_ms: Optional[int] = None, since: Optional[int] = None
+) -> List[List[float]]:
+    """Deterministic random-walk candles for `seed`, aligned to `timeframe`, ending at the open candle."""
+    calendar = is_calendar_timeframe(timeframe)
+    step = 30 * 86_400_000 if calendar else timeframe_to_ms(timeframe)  # months: nominal, only seeds the walk
+    end = candle_open_ms(end_ms if end_ms is not None else int(time.time() * 1000), timeframe)
+    if since is not None:
+        start = candle_open_ms(since, timeframe)
+    elif calendar:
+        start = end
+        for _ in range(count - 1):
+            start = candle_open_ms(start - 1, timeframe)
+    else:
+        start = end - step * (count - 1)
+    rows = []
+    open_time = start
+    while open_time <= end and len(rows) < count:
+        # Each candle is derived from its own index so any window of the series is reproducible.
+        rng = random.Random(zlib.crc32(f"{seed}:{open_time // step}".encode()))
+        base = 100 + 20 * math.sin(open_time / step / 500) + 5 * math.sin(open_time / step / 37)
+        open_price = base * (1 + rng.uniform(-0.002, 0.002))
+        close_price = base * (1 + rng.uniform(-0.004, 0.004))
+        high = max(open_price, close_price) * (1 + rng.uniform(0, 0.003))
+        low = min(open_price, close_price) * (1 - rng.uniform(0, 0.003))
+        rows.append([open_time, open_price, high, low, close_price, rng.uniform(1, 100)])
+        open_time = next_boundary_ms(open_time, timeframe)
+    return rows
+
+
+class FakeExchange:
+    """The slice of a ccxt exchange the app uses, serving synthetic_ohlcv with optional latency."""
+
+    rateLimit = 0
+    latency_seconds = 0.0
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.markets: Optional[Dict[str, Any]] = None
+        self.calls = 0
+
+    def load_markets(self, reload: bool = False) -> Dict[str, Any]:
+        self.markets = {}
+        return self.markets
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = "5m", since: Optional[int] = None, limit: Optional[int] = None):
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return synthetic_ohlcv(symbol, timeframe, min(limit or 500, 1000), since=since)
+
+    def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        last = synthetic_ohlcv(symbol, "1m", 1)[-1][4]
+        return {"symbol": symbol, "bid": last * 0.9995, "ask": last * 1.0005, "last": last}
+
+
+FAKE_EXCHANGES = ("binance", "kraken", "coinbase")
+
+
+class _Response:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """generate_content answers instantly with well-formed JSON, single or batch."""
+
+    latency_seconds = 0.0
+
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str) -> _Response:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if "JSON array" in prompt:
+            ids = [json.loads(line[len("Signal: "):])["id"] for line in prompt.splitlines() if line.startswith("Signal: ")]
+            return _Response(json.dumps([
+                {"signal_id": signal_id, "summary": "ok", "recommendation": "hold", "confidence": 0.5, "risks": []}
+                for signal_id in ids
+            ]))
+        return _Response(json.dumps({"summary": "ok", "recommendation": "hold", "confidence": 0.5, "risks": []}))
+
+
+def install_fakes(exchange_latency_ms: float = 0.0, model_latency_ms: float = 0.0) -> None:
+    """Point the exchange registry and the AI service at the fakes. Call before the first request."""
+    FakeExchange.latency_seconds = exchange_latency_ms / 1000
+    FakeModel.latency_seconds = model_latency_ms / 1000
+    venues = {name: type(name, (FakeExchange,), {}) for name in FAKE_EXCHANGES}
+    exchange_client.ccxt = SimpleNamespace(exchanges=list(venues), **venues)
+    exchange_client.configure_exchange_clients(rate_limit_ms=0, lock_dir=None)
+    ai_service.genai = SimpleNamespace(configure=lambda api_key=None: None, GenerativeModel=FakeModel)
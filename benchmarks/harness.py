@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - reported as null in the environment block
+    numpy = None
+
+
+# Timing loop and result files. Every case is timed per call after a warm-up; results are written
+# as JSON so runs can be diffed with --compare (lower is better for every timing).
+
+
+@dataclass
+class Result:
+    name: str
+    group: str
+    params: Dict[str, Any]
+    calls: int
+    items_per_call: int
+    min_s: float
+    median_s: float
+    mean_s: float
+    p95_s: float
+    items_per_second: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def measure(
+    name: str,
+    group: str,
+    func: Callable[[], Any],
+    params: Optional[Dict[str, Any]] = None,
+    items_per_call: int = 1,
+    min_calls: int = 5,
+    max_calls: int = 10_000,
+    min_seconds: float = 1.0,
+    warmup: int = 1,
+) -> Result:
+    """Call `func` until both `min_calls` and `min_seconds` are reached (capped at `max_calls`)."""
+    for _ in range(warmup):
+        func()
+    timings: List[float] = []
+    started = time.perf_counter()
+    while len(timings) < max_calls and (len(timings) < min_calls or time.perf_counter() - started < min_seconds):
+        begin = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - begin)
+    timings.sort()
+    median = statistics.median(timings)
+    return Result(
+        name=name,
+        group=group,
+        params=params or {},
+        calls=len(timings),
+        items_per_call=items_per_call,
+        min_s=timings[0],
+        median_s=median,
+        mean_s=statistics.fmean(timings),
+        p95_s=timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        items_per_second=items_per_call / median if median > 0 else float("inf"),
+    )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    info: Dict[str, Any] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__ if numpy is not None else None,
+    }
+    return info
+
+
+def write_results(path: str, results: List[Result], settings: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    document = {"environment": environment(), "settings": settings, "results": [asdict(r) for r in results]}
+    with open(path, "w") as handle:
+        json.dump(document, handle, indent=2)
+
+
+def print_result(result: Result) -> None:
+    print(
+        f"{result.group:<12} {result.name:<44} median {result.median_s * 1000:10.3f} ms"
+        f"  p95 {result.p95_s * 1000:10.3f} ms  {result.items_per_second:14,.0f}/s  ({result.calls} calls)"
+    )
+
+
+def compare(baseline_path: str, results: List[Result], threshold: float = 0.10) -> int:
+    """Print median changes against a previous results file; returns how many cases regressed past `threshold`."""
+    with open(baseline_path) as handle:
+        baseline = {(r["group"], r["name"]): r for r in json.load(handle)["results"]}
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (median, + is slower):")
+    for result in results:
+        previous = baseline.get((result.group, result.name))
+        if previous is None or previous["median_s"] <= 0:
+            continue
+        change = result.median_s / previous["median_s"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"  {result.group:<12} {result.name:<44} {change:+8.1%}{flag}")
+    return regressions
@@ -0,0 +1,311 @@
+"""Benchmark suite for the signal pipeline, runnable offline.
+
+    python -m benchmarks.run                     # everything, results in benchmarks/results/
+    python -m benchmarks.run --quick --only indicators,signals
+    python -m benchmarks.run --compare benchmarks/results/<earlier>.json
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+
+from sqlalchemy import func, insert, select, update
+
+from benchmarks.fakes import FAKE_EXCHANGES, install_fakes, synthetic_ohlcv
+from benchmarks.harness import Result, compare, measure, print_result, write_results
+from benchmarks.startup import bench_startup
+from database import db, Asset, Signal
+from services.candle_cache import candle_cache
+from services.indicator_engine import IndicatorEngine
+from services.market_service import (
+    CANDLE_LIMIT,
+    MarketSnapshot,
+    _compute_indicators_python,
+    compute_indicators,
+    compute_indicators_batch,
+    generate_auto_signal,
+)
+from services.outcome_resolver import resolve_open_signals
+from services.signal_rollups import record_signals
+
+GROUPS = ("startup", "indicators", "signals", "routes", "lists", "outcomes", "ai")
+
+
+def _closes(count: int) -> List[float]:
+    # synthetic_ohlcv serves at most what one call asks for; walk back in 1000-candle windows.
+    windows: List[List[float]] = []
+    remaining = count
+    end = 1_700_000_000_000
+    while remaining > 0:
+        window = synthetic_ohlcv("BENCH", "1m", min(1000, remaining), end_ms=end)
+        windows.append([row[4] for row in window])
+        remaining -= len(window)
+        end = int(window[0][0]) - 60_000
+    return [close for window in reversed(windows) for close in window]
+
+
+def bench_indicators(quick: bool) -> List[Result]:
+    results = []
+    sizes = (100, 10_000) if quick else (100, 10_000, 1_000_000)
+    for size in sizes:
+        closes = _closes(size)
+        big = size >= 1_000_000
+        results.append(measure(
+            f"compute_indicators[{size}]", "indicators", lambda: compute_indicators(closes, CANDLE_LIMIT - 1),
+            {"candles": size}, items_per_call=size, min_calls=1 if big else 5,
+        ))
+        results.append(measure(
+            f"python_indicators[{size}]", "indicators", lambda: _compute_indicators_python(closes, CANDLE_LIMIT - 1),
+            {"candles": size}, items_per_call=size, min_calls=1 if big else 5, min_seconds=0 if big else 1.0,
+            warmup=0 if big else 1,
+        ))
+
+    batch = [_closes(CANDLE_LIMIT) for _ in range(50)] * 10
+    results.append(measure(
+        "compute_indicators_batch[500x100]", "indicators", lambda: compute_indicators_batch(batch, CANDLE_LIMIT - 1),
+        {"series": len(batch), "candles": CANDLE_LIMIT}, items_per_call=len(batch),
+    ))
+
+    rows = synthetic_ohlcv("BENCH", "5m", 1000, end_ms=1_700_000_000_000)
+    windows = [rows[max(0, i - CANDLE_LIMIT + 1): i + 1] for i in range(CANDLE_LIMIT, len(rows))]
+
+    def replay_engine():
+        engine = IndicatorEngine(CANDLE_LIMIT - 1)
+        for window in windows:
+            engine.update("BENCH", window)
+
+    results.append(measure(
+        "engine_update_per_candle", "indicators", replay_engine, {"updates": len(windows)}, items_per_call=len(windows),
+    ))
+    return results
+
+
+def bench_signals(quick: bool) -> List[Result]:
+    rng = random.Random(7)
+    snapshots = [
+        MarketSnapshot("BTC/USDT", "5m", rng.uniform(10, 100_000), rng.uniform(0, 100), rng.gauss(0, 2),
+                       rng.gauss(0, 2), rng.uniform(0, 0.05))
+        for _ in range(10_000)
+    ]
+
+    def run():
+        for snapshot in snapshots:
+            generate_auto_signal(snapshot)
+
+    return [measure("generate_auto_signal", "signals", run, {"snapshots": len(snapshots)}, items_per_call=len(snapshots))]
+
+
+def _seed_assets(count: int) -> List[int]:
+    existing = db.session.execute(select(Asset.id).order_by(Asset.id)).scalars().all()
+    if len(existing) < count:
+        db.session.execute(insert(Asset), [
+            {"symbol": f"B{i}USDT", "name": f"Bench {i}", "exchange": "binance"} for i in range(len(existing), count)
+        ])
+        db.session.commit()
+    return db.session.execute(select(Asset.id).order_by(Asset.id)).scalars().all()
+
+
+def _seed_signals(asset_ids: List[int], total: int) -> None:
+    current = db.session.execute(select(func.count(Signal.id))).scalar()
+    rng = random.Random(11)
+    start = datetime(2026, 1, 1)
+    for offset in range(current, total, 10_000):
+        rows = [
+            {
+                "asset_id": rng.choice(asset_ids),
+                "side": rng.choice(("buy", "sell", "hold")),
+                "timeframe": rng.choice(("5m", "15m", "1h")),
+                "confidence": rng.random(),
+                "entry_price": rng.uniform(1, 1000),
+                "created_at": start + timedelta(seconds=30 * i),
+            }
+            for i in range(offset, min(offset + 10_000, total))
+        ]
+        db.session.execute(insert(Signal), rows)
+        record_signals(rows)
+        db.session.commit()
+
+
+def _seed_open_signals(asset_ids: List[int], total: int) -> None:
+    # 5m buy/sell signals over the last two days, with levels around the synthetic price (~100).
+    rng = random.Random(13)
+    now = datetime.utcnow()
+    rows = []
+    for _ in range(total):
+        direction = rng.choice((1, -1))
+        entry = rng.uniform(90, 110)
+        distance = entry * rng.uniform(0.002, 0.01)
+        rows.append({
+            "asset_id": rng.choice(asset_ids),
+            "side": "buy" if direction > 0 else "sell",
+            "timeframe": "5m",
+            "confidence": rng.random(),
+            "entry_price": entry,
+            "stop_loss": entry - direction * distance,
+            "take_profit": entry + direction * 1.5 * distance,
+            "created_at": now - timedelta(minutes=rng.uniform(0, 2 * 24 * 60)),
+        })
+    db.session.execute(insert(Signal), rows)
+    record_signals(rows)
+    db.session.commit()
+
+
+def _get(client, url: str) -> Callable[[], Any]:
+    def call():
+        response = client.get(url)
+        response.get_data()
+        assert response.status_code == 200, (url, response.status_code)
+
+    return call
+
+
+def bench_app(groups: List[str], quick: bool) -> List[Result]:
+    # app.py builds the app at import time from the environment, so the temporary database and
+    # quiet settings have to be in place before it is imported.
+    workdir = tempfile.mkdtemp(prefix="crypto-bench-")
+    os.environ.update(
+        DATABASE_PATH=os.path.join(workdir, "bench.db"),
+        DATABASE_URL="",
+        LOG_FILE=os.path.join(workdir, "app.log"),
+        LOG_LEVEL="WARNING",
+        EXCHANGE_LOCK_DIR="",
+        STREAM_ENABLED="0",
+        SCHEDULER_ENABLED="0",
+        PROFILING_ENABLED="0",
+        GEMINI_API_KEY="benchmark",
+        FLASK_DEBUG="0",
+    )
+    install_fakes()
+    from app import app
+
+    client = app.test_client()
+    results: List[Result] = []
+    with app.app_context():
+        asset_ids = _seed_assets(100)
+
+    if "routes" in groups:
+        results.append(measure(
+            "POST /api/signals/auto warm", "routes",
+            lambda: client.post("/api/signals/auto", json={"asset_id": asset_ids[0], "timeframe": "5m"}),
+        ))
+
+        def cold_auto():
+            candle_cache.invalidate()
+            client.post("/api/signals/auto", json={"asset_id": asset_ids[0], "timeframe": "5m"})
+
+        results.append(measure("POST /api/signals/auto cold cache", "routes", cold_auto))
+        results.append(measure(
+            "POST /api/market/snapshot 4 timeframes", "routes",
+            lambda: client.post("/api/market/snapshot", json={
+                "asset_id": asset_ids[1], "timeframes": ["5m", "15m", "30m", "1h"],
+            }),
+        ))
+        results.append(measure(
+            "POST /api/market/aggregate 3 venues", "routes",
+            lambda: client.post("/api/market/aggregate", json={"asset_id": asset_ids[0], "exchanges": list(FAKE_EXCHANGES)}),
+        ))
+        results.append(measure(
+            "POST /api/signals/scan 100 assets", "routes",
+            lambda: client.post("/api/signals/scan", json={"timeframes": ["5m"]}), items_per_call=len(asset_ids),
+        ))
+
+    if "lists" in groups:
+        for total in (10_000,) if quick else (10_000, 100_000):
+            with app.app_context():
+                _seed_signals(asset_ids, total)
+            params = {"signals": total}
+            for label, url in (
+                ("GET /api/signals/?limit=100", "/api/signals/?limit=100"),
+                ("GET /api/signals/?limit=1000", "/api/signals/?limit=1000"),
+                ("GET /api/signals/?side=buy&limit=100", "/api/signals/?side=buy&limit=100"),
+                ("GET /api/signals/latest", "/api/signals/latest"),
+                ("GET /api/assets/", "/api/assets/"),
+                ("GET /api/signals/analytics?group_by=asset,side", "/api/signals/analytics?group_by=asset,side"),
+                ("GET /api/signals/analytics?group_by=day,timeframe", "/api/signals/analytics?group_by=day,timeframe"),
+            ):
+                results.append(measure(f"{label} [{total}]", "lists", _get(client, url), params))
+            results.append(measure(
+                f"GET /api/signals/export [{total}]", "lists", _get(client, "/api/signals/export"), params,
+                items_per_call=total, min_calls=1, min_seconds=0, warmup=0,
+            ))
+
+    if "outcomes" in groups:
+        total = 10_000 if quick else 100_000
+        with app.app_context():
+            _seed_open_signals(asset_ids, total)
+            resolve_open_signals()  # backfills the candle store, so the timed runs read stored candles only
+
+        def resolve_all():
+            with app.app_context():
+                db.session.execute(update(Signal).values(outcome=None))
+                db.session.commit()
+                resolve_open_signals()
+
+        results.append(measure(
+            f"resolve_open_signals [{total} open, 100 assets]", "outcomes", resolve_all, {"signals": total},
+            items_per_call=total, min_calls=3, min_seconds=0,
+        ))
+
+    if "ai" in groups:
+        with app.app_context():
+            _seed_signals(asset_ids, 10_000)
+            signal_ids = itertools.cycle(db.session.execute(select(Signal.id).order_by(Signal.id.desc())).scalars().all())
+        # A fresh signal per call: each one gets its own prompt and its own stored insight.
+        results.append(measure(
+            "POST /api/ai/summary uncached", "ai",
+            lambda: client.post("/api/ai/summary", json={"signal_id": next(signal_ids), "market": {"rsi": 50}}),
+            max_calls=5_000,
+        ))
+        cached_id = next(signal_ids)
+        results.append(measure(
+            "POST /api/ai/summary cached", "ai",
+            lambda: client.post("/api/ai/summary", json={"signal_id": cached_id, "market": {"rsi": 50}}),
+        ))
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="skip the 1M-candle and 100k-row cases")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"comma-separated groups from {', '.join(GROUPS)}")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold for --compare")
+    args = parser.parse_args(argv)
+
+    groups = [group.strip() for group in args.only.split(",") if group.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+
+    results: List[Result] = []
+    runners: Dict[str, Callable[[bool], List[Result]]] = {
+        "startup": bench_startup, "indicators": bench_indicators, "signals": bench_signals,
+    }
+    for group in groups:
+        if group in runners:
+            for result in runners[group](args.quick):
+                print_result(result)
+                results.append(result)
+    if set(groups) & {"routes", "lists", "outcomes", "ai"}:
+        for result in bench_app(groups, args.quick):
+            print_result(result)
+            results.append(result)
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    output = args.output or os.path.join(os.path.dirname(__file__), "results", f"{stamp}.json")
+    write_results(output, results, {"quick": args.quick, "groups": groups})
+    print(f"\nWrote {output}")
+    if args.compare:
+        return 1 if compare(args.compare, results, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
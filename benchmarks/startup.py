@@ -0,0 +1,117 @@
+"""Worker cold-start time: `import app` in a fresh interpreter, with an import-time budget.
+
+    python -m benchmarks.startup                  # exit code 1 over budget or if a lazy backend loads at boot
+    python -m benchmarks.startup --budget-ms 800 --runs 10
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.harness import Result, measure
+
+# Loaded on first use, never while a worker boots (see services/exchange_client.py and services/ai_service.py).
+LAZY_MODULES = ("ccxt", "google.generativeai", "requests")
+
+DEFAULT_BUDGET_MS = 1000.0
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+print(json.dumps({"import_ms": elapsed * 1000, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def _environment(workdir: str, auto_migrate: bool) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        DATABASE_PATH=os.path.join(workdir, "startup.db"),
+        DATABASE_URL="",
+        LOG_FILE=os.path.join(workdir, "app.log"),
+        LOG_LEVEL="WARNING",
+        EXCHANGE_LOCK_DIR="",
+        STREAM_ENABLED="0",
+        SCHEDULER_ENABLED="0",
+        PROFILING_ENABLED="0",
+        DB_AUTO_MIGRATE="1" if auto_migrate else "0",
+    )
+    return env
+
+
+def probe(workdir: str, auto_migrate: bool = False, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", _PROBE]
+    return subprocess.run(
+        command, cwd=ROOT, env=_environment(workdir, auto_migrate), capture_output=True, text=True, check=True
+    )
+
+
+def slowest_imports(stderr: str, top: int = 10) -> List[Dict[str, Any]]:
+    """Import time per top-level package from `python -X importtime` output.
+
+    Self times are summed per package, so nested imports are not counted twice.
+    """
+    totals: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        if own.strip().isdigit():
+            package = name.strip().split(".")[0]
+            totals[package] = totals.get(package, 0) + int(own)
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"module": package, "self_ms": micros / 1000} for package, micros in ranked]
+
+
+def bench_startup(quick: bool) -> List[Result]:
+    workdir = tempfile.mkdtemp(prefix="crypto-startup-")
+    probe(workdir, auto_migrate=True)  # create the schema once so both cases boot against the same database
+    results = []
+    for label, auto_migrate in (("cold start, DB_AUTO_MIGRATE=0", False), ("cold start, DB_AUTO_MIGRATE=1", True)):
+        results.append(measure(
+            label, "startup", lambda: probe(workdir, auto_migrate), {"auto_migrate": auto_migrate},
+            min_calls=3 if quick else 10, min_seconds=0,
+        ))
+    loaded = json.loads(probe(workdir).stdout)["loaded"]
+    results[0].extra["lazy_modules_loaded_at_boot"] = loaded
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="median `import app` budget")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="crypto-startup-")
+    probe(workdir, auto_migrate=True)
+    samples = [json.loads(probe(workdir).stdout) for _ in range(args.runs)]
+    median_ms = statistics.median(sample["import_ms"] for sample in samples)
+    loaded = sorted({module for sample in samples for module in sample["loaded"]})
+
+    print(f"import app: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("slowest packages:")
+    for entry in slowest_imports(probe(workdir, importtime=True).stderr):
+        print(f"  {entry['module']:<32} {entry['self_ms']:8.1f} ms")
+
+    failed = False
+    if median_ms > args.budget_ms:
+        print(f"FAIL: import time is over budget by {median_ms - args.budget_ms:.1f} ms")
+        failed = True
+    if loaded:
+        print(f"FAIL: imported at boot instead of on first use: {', '.join(loaded)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
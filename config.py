@@ -1,22 +1,93 @@
 import os
 
 
+def _engine_options(database_url: str) -> dict:
+    """Connection pool settings for server databases; SQLite is tuned with pragmas in database.init_db."""
+    if database_url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+    }
+
+
 def get_config() -> dict:
     db_path = os.getenv("DATABASE_PATH", "./instance/crypto_intel.db")
     db_path = os.path.abspath(db_path)
     database_url = os.getenv("DATABASE_URL")
     if not database_url:
         database_url = f"sqlite:///{db_path}"
+    elif database_url.startswith("postgres://"):
+        # Heroku-style URLs use a scheme SQLAlchemy no longer accepts.
+        database_url = "postgresql://" + database_url[len("postgres://"):]
     return {
         "ENV": os.getenv("FLASK_ENV", "development"),
         "DEBUG": os.getenv("FLASK_DEBUG", "1") == "1",
         "DATABASE_PATH": db_path,
         "SQLALCHEMY_DATABASE_URI": database_url,
         "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "SQLALCHEMY_ENGINE_OPTIONS": _engine_options(database_url),
+        "DB_AUTO_MIGRATE": os.getenv("DB_AUTO_MIGRATE", "1") == "1",
+        "SQLITE_BUSY_TIMEOUT_MS": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "SQLITE_WAL": os.getenv("SQLITE_WAL", "1") == "1",
         "AI_PROVIDER": os.getenv("AI_PROVIDER", "gemini"),
         "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", ""),
         "GEMINI_MODEL": os.getenv("GEMINI_MODEL", "gemini-1.5-flash-002"),
+        "AI_MAX_CONCURRENCY": int(os.getenv("AI_MAX_CONCURRENCY", "4")),
+        "AI_JOB_TIMEOUT_SECONDS": float(os.getenv("AI_JOB_TIMEOUT_SECONDS", "900")),
+        "AI_BATCH_SIZE": int(os.getenv("AI_BATCH_SIZE", "10")),
+        "AI_JOB_WAIT_MAX_SECONDS": float(os.getenv("AI_JOB_WAIT_MAX_SECONDS", "30")),
+        "AI_CACHE_TTL_SECONDS": int(os.getenv("AI_CACHE_TTL_SECONDS", "3600")),
+        "AI_CACHE_SIZE": int(os.getenv("AI_CACHE_SIZE", "1024")),
         "BINANCE_BASE_URL": os.getenv("BINANCE_BASE_URL", "https://api.binance.com"),
+        "EXCHANGE_RATE_LIMIT_MS": int(os.getenv("EXCHANGE_RATE_LIMIT_MS", "0")),
+        "EXCHANGE_LOCK_DIR": os.getenv("EXCHANGE_LOCK_DIR", "./instance/locks"),
+        "EXCHANGE_POOL_SIZE": int(os.getenv("EXCHANGE_POOL_SIZE", "10")),
+        "EXCHANGE_TIMEOUT_MS": int(os.getenv("EXCHANGE_TIMEOUT_MS", "10000")),
+        "SINGLEFLIGHT_LOCK_DIR": os.getenv("SINGLEFLIGHT_LOCK_DIR", ""),
+        "SINGLEFLIGHT_LOCK_WAIT_SECONDS": float(os.getenv("SINGLEFLIGHT_LOCK_WAIT_SECONDS", "30")),
+        "AGGREGATE_EXCHANGES": os.getenv("AGGREGATE_EXCHANGES", "binance,kraken,coinbase"),
+        "AGGREGATE_TIMEOUT_SECONDS": float(os.getenv("AGGREGATE_TIMEOUT_SECONDS", "3.0")),
+        "AGGREGATE_MAX_WORKERS": int(os.getenv("AGGREGATE_MAX_WORKERS", "16")),
+        "CANDLE_CACHE_SIZE": int(os.getenv("CANDLE_CACHE_SIZE", "512")),
+        "CANDLE_CACHE_MAX_CANDLES": int(os.getenv("CANDLE_CACHE_MAX_CANDLES", "1000")),
+        "RESAMPLE_BASE_TIMEFRAME": os.getenv("RESAMPLE_BASE_TIMEFRAME", "5m"),
+        "RESAMPLE_MAX_BASE_CANDLES": int(os.getenv("RESAMPLE_MAX_BASE_CANDLES", "1000")),
+        "STREAM_ENABLED": os.getenv("STREAM_ENABLED", "0") == "1",
+        "STREAM_WS_URL": os.getenv("STREAM_WS_URL", "wss://stream.binance.com:9443"),
+        "STREAM_TIMEFRAMES": os.getenv("STREAM_TIMEFRAMES", "5m"),
+        "STREAM_BUFFER_SIZE": int(os.getenv("STREAM_BUFFER_SIZE", "1000")),
+        "STREAM_STALE_SECONDS": float(os.getenv("STREAM_STALE_SECONDS", "30")),
+        "SCAN_MAX_WORKERS": int(os.getenv("SCAN_MAX_WORKERS", "16")),
+        "SCHEDULER_ENABLED": os.getenv("SCHEDULER_ENABLED", "0") == "1",
+        "SCHEDULER_TIMEFRAMES": os.getenv("SCHEDULER_TIMEFRAMES", "5m,15m,1h"),
+        "SCHEDULER_MAX_WORKERS": int(os.getenv("SCHEDULER_MAX_WORKERS", "8")),
+        "SCHEDULER_JITTER_SECONDS": float(os.getenv("SCHEDULER_JITTER_SECONDS", "5")),
+        "SCHEDULER_LOCK_FILE": os.getenv("SCHEDULER_LOCK_FILE", "./instance/locks/scheduler.lock"),
+        "OUTCOME_RESOLVE_ENABLED": os.getenv("OUTCOME_RESOLVE_ENABLED", "1") == "1",
+        "OUTCOME_HORIZON_BARS": int(os.getenv("OUTCOME_HORIZON_BARS", "288")),
+        "SSE_POLL_SECONDS": float(os.getenv("SSE_POLL_SECONDS", "2")),
+        "SSE_HEARTBEAT_SECONDS": float(os.getenv("SSE_HEARTBEAT_SECONDS", "15")),
+        "SSE_MAX_SECONDS": float(os.getenv("SSE_MAX_SECONDS", "300")),
+        "SSE_MAX_STREAMS": int(os.getenv("SSE_MAX_STREAMS", "24")),
+        "SSE_GAP_GRACE_SECONDS": float(os.getenv("SSE_GAP_GRACE_SECONDS", "5")),
+        "BACKTEST_MAX_DAYS": float(os.getenv("BACKTEST_MAX_DAYS", "365")),
+        "BACKTEST_MAX_COMBINATIONS": int(os.getenv("BACKTEST_MAX_COMBINATIONS", "256")),
+        "BACKTEST_MAX_PROCESSES": int(os.getenv("BACKTEST_MAX_PROCESSES", "2")),
+        "BACKTEST_MAX_FETCH_PAGES": int(os.getenv("BACKTEST_MAX_FETCH_PAGES", "2")),
+        "PAGE_SIZE_DEFAULT": int(os.getenv("PAGE_SIZE_DEFAULT", "100")),
+        "PAGE_SIZE_MAX": int(os.getenv("PAGE_SIZE_MAX", "1000")),
+        "PROFILING_ENABLED": os.getenv("PROFILING_ENABLED", "0") == "1",
+        "PROFILING_TOKEN": os.getenv("PROFILING_TOKEN", ""),
+        "PROFILING_DIR": os.getenv("PROFILING_DIR", "./instance/profiles"),
         "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO"),
         "LOG_FILE": os.getenv("LOG_FILE", "./logs/app.log"),
+        "LOG_FORMAT": os.getenv("LOG_FORMAT", "json"),
+        "LOG_MAX_BYTES": int(os.getenv("LOG_MAX_BYTES", "2000000")),
+        "LOG_BACKUP_COUNT": int(os.getenv("LOG_BACKUP_COUNT", "3")),
+        "LOG_QUEUE_SIZE": int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+        "LOG_DEBUG_SAMPLE_RATE": float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0")),
     }
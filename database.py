@@ -1,23 +1,143 @@
 from datetime import datetime
+from typing import List
 import os
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
+from sqlalchemy.schema import CreateColumn, CreateTable
 
 
 db = SQLAlchemy()  # This creates the main database object that you will use to define models and execute queries.
 
 
+def upsert_statement(model, index_elements, update_columns):
+    """INSERT ... ON CONFLICT DO UPDATE for SQLite/PostgreSQL; None on other dialects (callers fall back to merge)."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    stmt = insert(model)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: getattr(stmt.excluded, column) for column in update_columns},
+    )
+
+
+def _install_sqlite_pragmas(engine, busy_timeout_ms: int, wal: bool) -> None:
+    """Run on every new SQLite connection, before any statement.
+
+    WAL lets readers proceed while one writer commits, busy_timeout makes competing gunicorn workers
+    wait for the write lock instead of failing with "database is locked", and synchronous=NORMAL is
+    durable under WAL while skipping an fsync per commit.
+    """
+    file_backed = engine.url.database not in (None, "", ":memory:")
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        if wal and file_backed:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.close()
+
+
+def _rebuild_with_autoincrement(connection, table) -> None:
+    """Recreate a SQLite table as AUTOINCREMENT, keeping its rows, so deleted ids are never reused.
+
+    SQLite cannot add AUTOINCREMENT in place; this is the one migration step that rewrites a table.
+    """
+    preparer = connection.dialect.identifier_preparer
+    name = preparer.format_table(table)
+    staging = preparer.quote(f"{table.name}__rebuild")
+    columns = ", ".join(preparer.quote(column.name) for column in table.columns)
+    ddl = str(CreateTable(table).compile(dialect=connection.dialect)).strip()
+    connection.execute(text(ddl.replace(f"CREATE TABLE {name}", f"CREATE TABLE {staging}", 1)))
+    connection.execute(text(f"INSERT INTO {staging} ({columns}) SELECT {columns} FROM {name}"))
+    connection.execute(text(f"DROP TABLE {name}"))
+    connection.execute(text(f"ALTER TABLE {staging} RENAME TO {name}"))
+    for index in table.indexes:
+        index.create(connection)
+
+
+def _lacks_autoincrement(connection, table) -> bool:
+    if connection.dialect.name != "sqlite" or not table.dialect_options["sqlite"]["autoincrement"]:
+        return False
+    sql = connection.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table.name}
+    ).scalar()
+    return sql is not None and "AUTOINCREMENT" not in sql.upper()
+
+
+def migrate_schema() -> List[str]:
+    """Bring the database up to the models, additively; returns the changes made.
+
+    Missing tables are created, and existing tables get the columns and indexes they lack. Nothing
+    else is dropped or altered, so a new NOT NULL column needs a server default. The exception is
+    SQLite tables declared sqlite_autoincrement, which are rebuilt once to gain it. A newly created
+    signal_rollups table is filled from the existing signals. Run inside an app context.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    changes = [f"create table {table.name}" for table in db.metadata.sorted_tables if table.name not in existing_tables]
+    db.create_all()
+
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in columns:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    raise RuntimeError(f"{table.name}.{column.name} is NOT NULL without a server default")
+                spec = CreateColumn(column).compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {spec}"))
+                changes.append(f"add column {table.name}.{column.name}")
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(connection)
+                    changes.append(f"create index {index.name}")
+            if _lacks_autoincrement(connection, table):
+                _rebuild_with_autoincrement(connection, table)
+                changes.append(f"rebuild table {table.name} with AUTOINCREMENT")
+
+    if "signals" in existing_tables and "signal_rollups" not in existing_tables:
+        # Rollups only track writes made after the table exists, so count the existing history once.
+        from services.signal_rollups import rebuild_rollups
+
+        changes.append(f"backfill signal_rollups ({rebuild_rollups()} rows)")
+    return changes
+
+
 def init_db(app) -> None:     # a helper function to initialize the database with the Flask app context. This is where you will create tables and link the db object to your app.  
-    """Initialize SQLAlchemy and create tables."""
+    """Initialize SQLAlchemy and, unless DB_AUTO_MIGRATE is off, bring the schema up to date."""
     db_path = app.config.get("DATABASE_PATH", "./instance/crypto_intel.db")
     db_path = os.path.abspath(db_path)
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
     db.init_app(app)          # Links db object to our specific flask application
     with app.app_context():
-        db.create_all()       # This "magic" command reads all the classes below and automatically creates the tables in SQLite if they don't exist yet.
+        if db.engine.dialect.name == "sqlite":
+            _install_sqlite_pragmas(
+                db.engine,
+                busy_timeout_ms=app.config.get("SQLITE_BUSY_TIMEOUT_MS", 5000),
+                wal=app.config.get("SQLITE_WAL", True),
+            )
+        # Reads all the classes below and creates missing tables, columns and indexes. With DB_AUTO_MIGRATE=0
+        # workers boot without touching the schema and `python manage.py migrate` runs this once per deploy.
+        if app.config.get("DB_AUTO_MIGRATE", True):
+            migrate_schema()
 
 
 class Asset(db.Model):
     __tablename__ = "assets"
+    __table_args__ = (db.Index("ix_assets_exchange_id", "exchange", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     symbol = db.Column(db.String(20), unique=True, nullable=False)
@@ -30,6 +150,17 @@ class Asset(db.Model):
 
 class Signal(db.Model):
     __tablename__ = "signals"
+    # Keyset pagination walks (created_at, id); each filter column gets its own composite prefix.
+    __table_args__ = (
+        db.Index("ix_signals_created_at_id", "created_at", "id"),
+        db.Index("ix_signals_asset_created_at_id", "asset_id", "created_at", "id"),
+        db.Index("ix_signals_side_created_at_id", "side", "created_at", "id"),
+        db.Index("ix_signals_timeframe_created_at_id", "timeframe", "created_at", "id"),
+        db.Index("ix_signals_asset_timeframe_id", "asset_id", "timeframe", "id"),
+        db.Index("ix_signals_outcome_asset_timeframe_id", "outcome", "asset_id", "timeframe", "id"),
+        # /api/stream/events resumes after the highest id a client saw, so a deleted id must not be reused.
+        {"sqlite_autoincrement": True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     asset_id = db.Column(db.Integer, db.ForeignKey("assets.id"), nullable=False)
@@ -40,6 +171,12 @@ class Signal(db.Model):
     stop_loss = db.Column(db.Float)
     take_profit = db.Column(db.Float)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Set by services/outcome_resolver.py; outcome is NULL while the signal is open.
+    outcome = db.Column(db.String(10))  # target/stop/expired
+    exit_price = db.Column(db.Float)
+    realized_return = db.Column(db.Float)  # fraction of entry_price, positive for a win on either side
+    time_to_hit = db.Column(db.Integer)  # seconds from created_at to the close of the exit candle
+    resolved_at = db.Column(db.DateTime)
 
     asset = db.relationship("Asset", back_populates="signals")
     insight = db.relationship(
@@ -47,8 +184,26 @@ class Signal(db.Model):
     )
 
 
+class SignalRollup(db.Model):
+    __tablename__ = "signal_rollups"
+    __table_args__ = (db.Index("ix_signal_rollups_day", "day"),)
+
+    # Per asset/day/timeframe/side signal counts, maintained by services/signal_rollups.py as signals are
+    # written. Derived data, so asset_id has no foreign key: rows are removed as their signals are.
+    asset_id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    timeframe = db.Column(db.String(20), primary_key=True)
+    side = db.Column(db.String(10), primary_key=True)
+    signal_count = db.Column(db.Integer, nullable=False, default=0)
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+
 class AIInsight(db.Model):
     __tablename__ = "ai_insights"
+    __table_args__ = (
+        db.Index("ix_ai_insights_signal_id_id", "signal_id", "id"),
+        {"sqlite_autoincrement": True},  # see Signal
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     signal_id = db.Column(db.Integer, db.ForeignKey("signals.id"), nullable=False)
@@ -58,3 +213,41 @@ class AIInsight(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     signal = db.relationship("Signal", back_populates="insight")
+
+
+class Candle(db.Model):
+    __tablename__ = "candles"
+
+    # One row per closed (or still forming) candle; open_time is the exchange timestamp in epoch milliseconds.
+    asset_id = db.Column(db.Integer, db.ForeignKey("assets.id"), primary_key=True)
+    timeframe = db.Column(db.String(20), primary_key=True)
+    open_time = db.Column(db.BigInteger, primary_key=True)
+    open = db.Column(db.Float, nullable=False)
+    high = db.Column(db.Float, nullable=False)
+    low = db.Column(db.Float, nullable=False)
+    close = db.Column(db.Float, nullable=False)
+    volume = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class AIJob(db.Model):
+    __tablename__ = "ai_jobs"
+
+    # Queued AI summaries live here rather than in worker memory, so any gunicorn worker can answer a poll.
+    id = db.Column(db.String(32), primary_key=True)
+    status = db.Column(db.String(20), default="queued", nullable=False)  # queued/running/done/failed
+    result = db.Column(db.Text)  # JSON list of per-signal insight payloads
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+
+class AIInsightCache(db.Model):
+    __tablename__ = "ai_insight_cache"
+    __table_args__ = (db.Index("ix_ai_insight_cache_expires_at", "expires_at"),)
+
+    # sha256 of the model name and the canonical prompt; see services/insight_cache.py.
+    key = db.Column(db.String(64), primary_key=True)
+    model = db.Column(db.String(120), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
@@ -1,6 +1,112 @@
+from datetime import datetime, timezone
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
+import queue
+import random
+import uuid
+
+from flask import g, has_request_context, request
+from flask.logging import default_handler
+
+from metrics import counter
+
+
+# Log calls on request threads only format the message and put the record on a queue; a
+# QueueListener thread does the file and console I/O, including rotation. When the queue is full
+# records are dropped (and counted) rather than making the request wait.
+
+LOG_RECORDS_DROPPED = counter("log_records_dropped_total", "Log records dropped because the log queue was full.")
+
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request's correlation id ("-" outside a request)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = g.get("request_id", "-") if has_request_context() else "-"
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep only a `rate` fraction of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render the traceback here, where exc_info is still valid, but leave the
+        # final formatting to the listener's handlers.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields are included as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def _stop_listener(listener: QueueListener) -> None:
+    if listener._thread is not None:
+        listener.stop()
+
+
+def _formatter(app) -> logging.Formatter:
+    if app.config.get("LOG_FORMAT", "json") == "json":
+        return JsonFormatter()
+    return logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(request_id)s | %(message)s")
+
+
+def _register_request_ids(app) -> None:
+    @app.before_request
+    def assign_request_id():
+        incoming = request.headers.get("X-Request-ID", "")
+        g.request_id = incoming[:64] if incoming else uuid.uuid4().hex
+
+    @app.after_request
+    def echo_request_id(response):
+        if "request_id" in g:
+            response.headers["X-Request-ID"] = g.request_id
+        return response
 
 
 def configure_logging(app) -> None:
@@ -8,14 +114,36 @@ def configure_logging(app) -> None:
     log_level = getattr(logging, log_level_name.upper(), logging.INFO)
     app.logger.setLevel(log_level)
 
+    if any(isinstance(h, QueueHandler) for h in app.logger.handlers):
+        return
+
     log_file = app.config.get("LOG_FILE", "./logs/app.log")
     log_dir = os.path.dirname(log_file) or "."
     os.makedirs(log_dir, exist_ok=True)
 
-    handler = RotatingFileHandler(log_file, maxBytes=2_000_000, backupCount=3)
-    handler.setLevel(log_level)
-    formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
-    handler.setFormatter(formatter)
+    formatter = _formatter(app)
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=app.config.get("LOG_MAX_BYTES", 2_000_000),
+        backupCount=app.config.get("LOG_BACKUP_COUNT", 3),
+    )
+    console_handler = logging.StreamHandler()
+    for handler in (file_handler, console_handler):
+        handler.setLevel(log_level)
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=app.config.get("LOG_QUEUE_SIZE", 10_000))
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter(app.config.get("LOG_DEBUG_SAMPLE_RATE", 1.0)))
+    queue_handler.addFilter(RequestIdFilter())
+
+    # Flask's stderr handler would write on the request thread; the listener's console handler replaces it.
+    app.logger.removeHandler(default_handler)
+    app.logger.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(_stop_listener, listener)  # flush what is still queued on shutdown
+    app.extensions["log_listener"] = listener
 
-    if not any(isinstance(h, RotatingFileHandler) for h in app.logger.handlers):
-        app.logger.addHandler(handler)
+    _register_request_ids(app)
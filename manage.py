@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import sys
+
+# Commands run against the database only: no market stream or scheduler threads in this process.
+os.environ["APP_START_BACKGROUND"] = "0"
+if sys.argv[1:2] == ["migrate"]:
+    # migrate reports the changes it makes, so the app must not apply them itself while booting.
+    os.environ["DB_AUTO_MIGRATE"] = "0"
+
+from app import app
+from database import Asset, migrate_schema
+from services.backtest import parse_grid, rules_from, run_backtest, sweep
+from services.market_service import load_history
+from services.outcome_resolver import resolve_open_signals
+from services.signal_rollups import rebuild_rollups
+
+# Command line entry points that run against the app's database: `python manage.py <command> --help`.
+
+
+def backtest(args: argparse.Namespace) -> int:
+    with app.app_context():
+        asset = Asset.query.filter_by(symbol=args.symbol.upper()).first()
+        if asset is None:
+            print(f"Unknown asset: {args.symbol}", file=sys.stderr)
+            return 1
+        ohlcv = load_history(asset.id, asset.symbol, args.timeframe, args.days, asset.exchange)
+
+    rules = rules_from({name: values[-1] for name, values in parse_grid(args.rule).items()})
+    if args.sweep:
+        # --rule fixes the parameters the sweep does not vary.
+        results = sweep(ohlcv, parse_grid(args.sweep), args.horizon, args.fee, processes=args.processes, base=rules)
+        output = {"candles": len(ohlcv), "results": results[: args.top]}
+    else:
+        output = run_backtest(ohlcv, rules, args.horizon, args.fee).to_dict()
+    print(json.dumps(output, indent=2))
+    return 0
+
+
+def migrate(args: argparse.Namespace) -> int:
+    with app.app_context():
+        changes = migrate_schema()
+        for change in changes:
+            print(change)
+        print(f"{len(changes)} change(s)" if changes else "Schema is up to date")
+    return 0
+
+
+def rebuild(args: argparse.Namespace) -> int:
+    with app.app_context():
+        print(f"Rebuilt {rebuild_rollups()} signal rollup rows")
+    return 0
+
+
+def resolve_outcomes(args: argparse.Namespace) -> int:
+    with app.app_context():
+        report = resolve_open_signals(args.horizon or app.config["OUTCOME_HORIZON_BARS"])
+    print(json.dumps(report.to_dict(), indent=2))
+    return 1 if report.errors else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Crypto signal intelligence management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bt = commands.add_parser("backtest", help="replay the auto-signal rules over stored candles")
+    bt.add_argument("symbol", help="asset symbol as stored, e.g. BTCUSDT")
+    bt.add_argument("--timeframe", default="5m")
+    bt.add_argument("--days", type=float, default=30, help="history to replay (gaps are backfilled)")
+    bt.add_argument("--horizon", type=int, default=288, help="bars before an open trade expires")
+    bt.add_argument("--fee", type=float, default=0.0, help="fee per side as a fraction")
+    bt.add_argument("--rule", action="append", default=[], metavar="NAME=VALUE", help="override one rule")
+    bt.add_argument("--sweep", action="append", default=[], metavar="NAME=V1,V2", help="sweep a rule")
+    bt.add_argument("--processes", type=int, default=None, help="sweep worker processes (default: CPUs)")
+    bt.add_argument("--top", type=int, default=10, help="sweep results to print")
+    bt.set_defaults(handler=backtest)
+
+    mg = commands.add_parser("migrate", help="create missing tables, columns and indexes")
+    mg.set_defaults(handler=migrate)
+
+    rb = commands.add_parser("rebuild-rollups", help="recompute signal_rollups from the signals table")
+    rb.set_defaults(handler=rebuild)
+
+    ro = commands.add_parser("resolve-outcomes", help="mark open signals hit or expired from stored candles")
+    ro.add_argument("--horizon", type=int, default=None, help="bars before an open signal expires (default: OUTCOME_HORIZON_BARS)")
+    ro.set_defaults(handler=resolve_outcomes)
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_parser().parse_args()
+    sys.exit(arguments.handler(arguments))
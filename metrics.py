@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import bisect
+import cProfile
+import math
+import os
+import pstats
+import threading
+import time
+
+from flask import Response, g, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import db
+
+
+# In-process metrics in the Prometheus text format. Counters and histograms are plain dicts behind
+# a lock, so recording costs a dict update; GET /metrics renders them. Each gunicorn worker keeps
+# its own numbers, and Prometheus tells them apart by the instance it scrapes.
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+_registry: Dict[str, "_Metric"] = {}
+_registry_lock = threading.Lock()
+_session_hooks_installed = False
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, values))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{self._format_labels(key)} {value:g}" for key, value in items)
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, +Inf last), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, seconds)  # len(buckets) is the +Inf bucket
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1][0] += seconds
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {total:.6f}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return _register(Counter(name, documentation, labelnames))
+
+
+def histogram(
+    name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+) -> Histogram:
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+def timed(metric: Histogram, **labels: str) -> Callable:
+    """Decorator form of `metric.time(**labels)`."""
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with metric.time(**labels):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def render() -> str:
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines: List[str] = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Metrics shared by the services. Defined here so /metrics lists them even before the first call.
+
+REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds", "Flask request latency.", ("method", "route", "status")
+)
+MARKET_SNAPSHOT_SECONDS = histogram(
+    "market_snapshot_seconds", "fetch_market_snapshots latency, all requested timeframes of one symbol."
+)
+EXCHANGE_FETCH_SECONDS = histogram(
+    "exchange_fetch_seconds", "Exchange REST call latency, excluding rate-limit waits.", ("exchange", "call")
+)
+RATE_LIMIT_WAIT_SECONDS = histogram(
+    "exchange_rate_limit_wait_seconds", "Time spent waiting for the shared exchange rate limiter.", ("exchange",)
+)
+INDICATOR_SECONDS = histogram(
+    "indicator_compute_seconds",
+    "Indicator computation time.",
+    ("mode",),
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5),
+)
+AI_SECONDS = histogram("ai_generate_seconds", "Gemini call latency.", ("call",))
+DB_COMMIT_SECONDS = histogram("db_commit_seconds", "Session commit time, including the final flush.")
+DB_QUERY_SECONDS = histogram("db_query_seconds", "Time per executed SQL statement.")
+CACHE_REQUESTS = counter("cache_requests_total", "Cache lookups by cache and result.", ("cache", "result"))
+SINGLE_FLIGHT_CALLS = counter(
+    "single_flight_calls_total", "Coalesced calls; followers reused a leader's in-flight result.", ("name", "role")
+)
+AGGREGATE_VENUE_RESULTS = counter(
+    "aggregate_venue_results_total", "Per-venue outcomes of aggregate snapshots.", ("exchange", "status")
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("query_start")
+    if starts:
+        DB_QUERY_SECONDS.observe(time.perf_counter() - starts.pop())
+
+
+def _before_commit(session: Session) -> None:
+    session.info["commit_start"] = time.perf_counter()
+
+
+def _after_commit(session: Session) -> None:
+    start = session.info.pop("commit_start", None)
+    if start is not None:
+        DB_COMMIT_SECONDS.observe(time.perf_counter() - start)
+
+
+def _install_db_hooks(engine) -> None:
+    global _session_hooks_installed
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    if not _session_hooks_installed:
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _after_commit)
+        _session_hooks_installed = True
+
+
+def _profile_requested(app) -> bool:
+    if not app.config.get("PROFILING_ENABLED"):
+        return False
+    token = app.config.get("PROFILING_TOKEN")
+    value = request.headers.get("X-Profile")
+    return bool(value) and (not token or value == token)
+
+
+def register_metrics(app) -> None:
+    """Time every request, expose GET /metrics and, when PROFILING_ENABLED, profile requests sent with X-Profile."""
+    with app.app_context():
+        _install_db_hooks(db.engine)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        if _profile_requested(app):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler is active on this interpreter
+                return
+            g.profiler = profiler
+
+    @app.after_request
+    def record_request(response):
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            profile_dir = os.path.abspath(app.config.get("PROFILING_DIR", "./instance/profiles"))
+            os.makedirs(profile_dir, exist_ok=True)
+            name = f"{int(time.time() * 1000)}-{request.endpoint or 'unknown'}.prof"
+            path = os.path.join(profile_dir, name)
+            pstats.Stats(profiler).dump_stats(path)
+            response.headers["X-Profile-Output"] = name
+        started = g.pop("request_started", None)
+        if started is not None and request.endpoint != "metrics":
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started, method=request.method, route=route, status=str(response.status_code)
+            )
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(render(), mimetype="text/plain; version=0.0.4")
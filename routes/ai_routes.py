@@ -1,36 +1,19 @@
 from flask import Blueprint, jsonify, request, current_app
-from database import db, Signal, Asset, AIInsight
-from services.ai_service import generate_insight
+from database import Signal, Asset
+from services.ai_jobs import job_to_dict, submit_job, summarize_signal, wait_for_job
 
 ai_bp = Blueprint("ai", __name__)
 
 # This file manages the communication with Gemini.
 # The /summary endpoint takes a signal ID and market data, retrieves the relevant signal and asset information from the database, 
 # and then calls the generate_insight function to get an AI-generated summary and recommendation. The results are stored in the AIInsight table and returned as a JSON response.
+# With "async": true (and always for /summary/batch) the work is queued instead and the caller polls /jobs/<job_id>.
 
 
-def _signal_to_dict(signal: Signal) -> dict:
-    return {
-        "id": signal.id,
-        "asset_id": signal.asset_id,
-        "side": signal.side,
-        "timeframe": signal.timeframe,
-        "confidence": signal.confidence,
-        "entry_price": signal.entry_price,
-        "stop_loss": signal.stop_loss,
-        "take_profit": signal.take_profit,
-        "created_at": signal.created_at.isoformat(),
-    }
-
-
-def _asset_to_dict(asset: Asset) -> dict:
-    return {
-        "id": asset.id,
-        "symbol": asset.symbol,
-        "name": asset.name,
-        "exchange": asset.exchange,
-        "created_at": asset.created_at.isoformat(),
-    }
+def _job_accepted(job):
+    response = jsonify({"job_id": job.id, "status": job.status})
+    response.headers["Location"] = f"/api/ai/jobs/{job.id}"
+    return response, 202
 
 
 @ai_bp.route("/summary", methods=["POST"])
@@ -45,30 +28,49 @@ def ai_summary():
     signal = Signal.query.get_or_404(signal_id)
     asset = Asset.query.get_or_404(signal.asset_id)
 
-    ai_payload = generate_insight(
-        api_key=current_app.config.get("GEMINI_API_KEY", ""),
-        model_name=current_app.config.get("GEMINI_MODEL", "gemini-1.5-flash"),
-        signal=_signal_to_dict(signal),
-        asset=_asset_to_dict(asset),
-        market=market,
-    )
+    if payload.get("async"):
+        job = submit_job(current_app._get_current_object(), [signal.id], {signal.id: market})
+        return _job_accepted(job)
 
-    insight = AIInsight(
-        signal_id=signal.id,
-        provider="gemini",
-        summary=ai_payload.get("summary", ""),
-        recommendation=ai_payload.get("recommendation", ""),
+    return jsonify(
+        summarize_signal(
+            signal,
+            asset,
+            market,
+            api_key=current_app.config.get("GEMINI_API_KEY", ""),
+            model_name=current_app.config.get("GEMINI_MODEL", "gemini-1.5-flash"),
+        )
     )
-    db.session.add(insight)
-    db.session.commit()
 
-    return jsonify(
-        {
-            "signal_id": signal.id,
-            "provider": insight.provider,
-            "summary": insight.summary,
-            "recommendation": insight.recommendation,
-            "confidence": ai_payload.get("confidence", 0.0),
-            "risks": ai_payload.get("risks", []),
-        }
+
+@ai_bp.route("/summary/batch", methods=["POST"])
+def ai_summary_batch():
+    payload = request.get_json(silent=True) or {}
+    signal_ids = payload.get("signal_ids")
+    markets = payload.get("markets", {})
+
+    if not isinstance(signal_ids, list) or not signal_ids or not all(
+        isinstance(i, int) and not isinstance(i, bool) for i in signal_ids
+    ):
+        return jsonify({"error": "signal_ids must be a non-empty list of integers"}), 400
+    if not isinstance(markets, dict):
+        return jsonify({"error": "markets must be an object keyed by signal_id"}), 400
+
+    markets = {int(key): value for key, value in markets.items() if str(key).isdigit()}
+    job = submit_job(
+        current_app._get_current_object(),
+        signal_ids,
+        markets,
+        batch_size=current_app.config.get("AI_BATCH_SIZE", 10),
     )
+    return _job_accepted(job)
+
+
+@ai_bp.route("/jobs/<job_id>", methods=["GET"])
+def ai_job_status(job_id: str):
+    wait = request.args.get("wait", 0.0, type=float)
+    wait = max(0.0, min(wait, current_app.config.get("AI_JOB_WAIT_MAX_SECONDS", 30.0)))
+    job = wait_for_job(job_id, wait)
+    if job is None:
+        return jsonify({"error": "job not found"}), 404
+    return jsonify(job_to_dict(job))
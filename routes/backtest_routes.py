@@ -0,0 +1,54 @@
+from flask import Blueprint, current_app, jsonify, request
+from database import Asset
+from services.backtest import rule_grid, rules_from, run_backtest, sweep
+from services.market_service import load_history
+
+backtest_bp = Blueprint("backtest", __name__)
+
+
+@backtest_bp.route("/", methods=["POST"])
+def create_backtest():
+    payload = request.get_json(silent=True) or {}
+    asset_id = payload.get("asset_id")
+    timeframe = payload.get("timeframe", "5m")
+    grid = payload.get("sweep")
+
+    if not asset_id:
+        return jsonify({"error": "asset_id is required"}), 400
+    try:
+        days = float(payload.get("days", 30))
+        horizon = int(payload.get("horizon", 288))
+        fee = float(payload.get("fee", 0.0))
+        rules = rules_from(payload.get("rules"))
+        combinations = rule_grid(grid) if grid is not None else []
+    except (TypeError, ValueError) as exc:
+        return jsonify({"error": str(exc)}), 400
+    if days <= 0 or days > current_app.config["BACKTEST_MAX_DAYS"] or horizon < 1:
+        return jsonify({"error": "days or horizon out of range"}), 400
+    if len(combinations) > current_app.config["BACKTEST_MAX_COMBINATIONS"]:
+        return jsonify({"error": "sweep has too many combinations"}), 400
+    # With a sweep, `rules` fixes the parameters the grid does not vary.
+    overlap = set(payload.get("rules") or {}) & set(grid or {})
+    if overlap:
+        return jsonify({"error": f"Rules both fixed and swept: {', '.join(sorted(overlap))}"}), 400
+
+    asset = Asset.query.get_or_404(asset_id)
+    try:
+        # Long histories are backfilled by `python manage.py backtest`, not inside a web request.
+        ohlcv = load_history(
+            asset.id, asset.symbol, timeframe, days, asset.exchange,
+            max_pages=current_app.config["BACKTEST_MAX_FETCH_PAGES"],
+        )
+    except ValueError as exc:
+        return jsonify({"error": f"{exc}; run `python manage.py backtest {asset.symbol}` to backfill it"}), 400
+    if not ohlcv:
+        return jsonify({"error": "No market data returned"}), 400
+
+    response = {"asset_id": asset.id, "timeframe": timeframe, "candles": len(ohlcv)}
+    if grid is not None:
+        response["results"] = sweep(
+            ohlcv, grid, horizon, fee, processes=current_app.config["BACKTEST_MAX_PROCESSES"], base=rules
+        )
+    else:
+        response["result"] = run_backtest(ohlcv, rules, horizon, fee).to_dict()
+    return jsonify(response)
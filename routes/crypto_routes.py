@@ -1,21 +1,16 @@
 from flask import Blueprint, jsonify, request
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
 from database import db, Asset
+from routes.pagination import decode_cursor, encode_cursor, page_response, parse_limit
+from serializers import ASSET_COLUMNS, asset_to_dict
+from services.bulk_io import import_assets, iter_records
+from services.candle_store import delete_candles
 
 crypto_bp = Blueprint("assets", __name__)
 
 
-def _asset_to_dict(asset: Asset) -> dict:
-    return {
-        "id": asset.id,
-        "symbol": asset.symbol,
-        "name": asset.name,
-        "exchange": asset.exchange,
-        "created_at": asset.created_at.isoformat(),
-    }
-
-
 @crypto_bp.route("/", methods=["POST"])
 def create_asset():
     payload = request.get_json(silent=True) or {}
@@ -34,19 +29,47 @@ def create_asset():
         db.session.rollback()
         return jsonify({"error": "symbol already exists"}), 409
 
-    return jsonify(_asset_to_dict(asset)), 201
+    return jsonify(asset_to_dict(asset)), 201
+
+
+@crypto_bp.route("/bulk", methods=["POST"])
+def bulk_create_assets():
+    """NDJSON (default) or CSV body with symbol, name and optional exchange per row; existing symbols are skipped."""
+    fmt = request.args.get("format") or ("csv" if request.mimetype == "text/csv" else "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    report = import_assets(iter_records(request.stream, fmt))
+    return jsonify(report.to_dict()), 201
 
 
 @crypto_bp.route("/", methods=["GET"])
 def list_assets():
-    assets = Asset.query.all()
-    return jsonify([_asset_to_dict(asset) for asset in assets])
+    """Ordered by id, keyset-paginated; see routes/pagination.py."""
+    limit = parse_limit()
+    cursor = decode_cursor(request.args.get("cursor"), 1)
+
+    query = select(*ASSET_COLUMNS)
+    if request.args.get("exchange"):
+        query = query.where(Asset.exchange == request.args["exchange"])
+    if request.args.get("symbol"):
+        query = query.where(Asset.symbol.startswith(request.args["symbol"].upper(), autoescape=True))
+    if cursor is not None:
+        if not isinstance(cursor[0], int):
+            return jsonify({"error": "invalid cursor"}), 400
+        query = query.where(Asset.id > cursor[0])
+
+    rows = db.session.execute(query.order_by(Asset.id).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    return page_response(rows, asset_to_dict, next_cursor)
 
 
 @crypto_bp.route("/<int:asset_id>", methods=["GET"])
 def get_asset(asset_id: int):
     asset = Asset.query.get_or_404(asset_id)
-    return jsonify(_asset_to_dict(asset))
+    return jsonify(asset_to_dict(asset))
 
 
 @crypto_bp.route("/<int:asset_id>", methods=["PUT", "PATCH"])
@@ -67,12 +90,13 @@ def update_asset(asset_id: int):
         db.session.rollback()
         return jsonify({"error": "symbol already exists"}), 409
 
-    return jsonify(_asset_to_dict(asset))
+    return jsonify(asset_to_dict(asset))
 
 
 @crypto_bp.route("/<int:asset_id>", methods=["DELETE"])
 def delete_asset(asset_id: int):
     asset = Asset.query.get_or_404(asset_id)
+    delete_candles(asset.id)
     db.session.delete(asset)
     db.session.commit()
     return jsonify({"status": "deleted"})
@@ -1,6 +1,9 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from database import Asset
-from services.market_service import fetch_market_snapshot
+from services.exchange_client import is_supported_exchange
+from services.market_service import fetch_market_snapshot, fetch_market_snapshots
+from services.multi_exchange import fetch_aggregate_snapshot
+from services.signal_scanner import parse_timeframes
 
 market_bp = Blueprint("market", __name__)
 
@@ -17,5 +20,43 @@ def market_snapshot():
     asset = Asset.query.get_or_404(asset_id)
     symbol = asset.symbol
 
-    snapshot = fetch_market_snapshot(symbol, timeframe)
+    if "timeframes" in payload:
+        timeframes = parse_timeframes(payload)
+        if timeframes is None:
+            return jsonify({"error": "timeframes must be a non-empty list of strings"}), 400
+        snapshots = fetch_market_snapshots(symbol, timeframes, asset_id=asset.id, exchange_id=asset.exchange)
+        return jsonify({tf: snapshot.to_dict() for tf, snapshot in snapshots.items()})
+
+    snapshot = fetch_market_snapshot(symbol, timeframe, asset_id=asset.id, exchange_id=asset.exchange)
+    return jsonify(snapshot.to_dict())
+
+
+@market_bp.route("/aggregate", methods=["POST"])
+def aggregate_snapshot():
+    """One symbol on several exchanges at once: median price, volume-weighted close and per-venue spreads."""
+    payload = request.get_json(silent=True) or {}
+    asset_id = payload.get("asset_id")
+    timeframe = payload.get("timeframe", "5m")
+
+    if not asset_id:
+        return jsonify({"error": "asset_id is required"}), 400
+    asset = Asset.query.get_or_404(asset_id)
+
+    exchanges = payload.get("exchanges")
+    if exchanges is None:
+        configured = current_app.config["AGGREGATE_EXCHANGES"].split(",")
+        exchanges = [asset.exchange] + [name.strip() for name in configured if name.strip()]
+    elif not isinstance(exchanges, list) or not exchanges or not all(isinstance(name, str) for name in exchanges):
+        return jsonify({"error": "exchanges must be a non-empty list of strings"}), 400
+    unsupported = [name for name in exchanges if not is_supported_exchange(name)]
+    if unsupported:
+        return jsonify({"error": f"unsupported exchanges: {', '.join(unsupported)}"}), 400
+
+    timeout = payload.get("timeout_seconds")
+    if timeout is not None and (
+        isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not 0 < timeout <= 30
+    ):
+        return jsonify({"error": "timeout_seconds must be a number in (0, 30]"}), 400
+
+    snapshot = fetch_aggregate_snapshot(asset.symbol, exchanges, timeframe, timeout_seconds=timeout)
     return jsonify(snapshot.to_dict())
@@ -0,0 +1,58 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional
+from urllib.parse import urlencode
+
+from flask import abort, current_app, request
+
+from routes.serializers import json_array_response
+
+
+# Keyset pagination shared by the list endpoints. The body stays a plain JSON array; the cursor
+# for the next page is returned in the X-Next-Cursor header (and a Link rel="next" header).
+
+
+def parse_limit() -> int:
+    default = current_app.config.get("PAGE_SIZE_DEFAULT", 100)
+    maximum = current_app.config.get("PAGE_SIZE_MAX", 1000)
+    limit = request.args.get("limit", default, type=int)
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        abort(400, description="invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        abort(400, description="invalid cursor")
+    return values
+
+
+def parse_datetime_arg(name: str) -> Optional[datetime]:
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        abort(400, description=f"{name} must be an ISO 8601 datetime")
+
+
+def page_response(rows: List[Any], to_dict: Callable[[Any], dict], next_cursor: Optional[str]):
+    response = json_array_response(rows, to_dict)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        args = request.args.to_dict()
+        args["cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+    return response
@@ -0,0 +1,38 @@
+from typing import Any, Callable, Iterable, Iterator, List
+
+from flask import Response, stream_with_context
+
+from serializers import dumps
+
+
+# JSON responses for list endpoints: one buffered body, or a streamed array encoded chunk by chunk.
+
+STREAM_CHUNK_SIZE = 500
+
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    return Response(dumps(payload), status=status, mimetype="application/json")
+
+
+def _array_chunks(rows: Iterable[Any], to_dict: Callable[[Any], dict]) -> Iterator[bytes]:
+    yield b"["
+    chunk: List[dict] = []
+    first = True
+    for row in rows:
+        chunk.append(to_dict(row))
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            encoded = dumps(chunk)[1:-1]
+            yield encoded if first else b"," + encoded
+            first = False
+            chunk = []
+    if chunk:
+        encoded = dumps(chunk)[1:-1]
+        yield encoded if first else b"," + encoded
+    yield b"]"
+
+
+def json_array_response(rows: Iterable[Any], to_dict: Callable[[Any], dict], stream: bool = False) -> Response:
+    """Encode `rows` as a JSON array, chunk by chunk; with `stream` the chunks are sent as they are encoded."""
+    if stream:
+        return Response(stream_with_context(_array_chunks(rows, to_dict)), mimetype="application/json")
+    return Response(b"".join(_array_chunks(rows, to_dict)), mimetype="application/json")
@@ -1,24 +1,20 @@
-from flask import Blueprint, jsonify, request
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import func, select, tuple_
 from database import db, Signal, Asset
+from routes.pagination import decode_cursor, encode_cursor, page_response, parse_datetime_arg, parse_limit
+from routes.serializers import json_array_response
+from serializers import SIGNAL_COLUMNS, dumps, signal_to_dict
+from services.bulk_io import encode_csv, import_signals, iter_records, iter_signal_exports
 from services.market_service import fetch_market_snapshot, generate_auto_signal
+from services.outcome_resolver import OUTCOME_INPUTS, OUTCOME_NAMES, clear_outcome
+from services.signal_rollups import GROUP_COLUMNS, signal_analytics
+from services.signal_scanner import parse_timeframes, scan_assets
 
 signal_bp = Blueprint("signals", __name__)
 
 
-def _signal_to_dict(signal: Signal) -> dict:
-    return {
-        "id": signal.id,
-        "asset_id": signal.asset_id,
-        "side": signal.side,
-        "timeframe": signal.timeframe,
-        "confidence": signal.confidence,
-        "entry_price": signal.entry_price,
-        "stop_loss": signal.stop_loss,
-        "take_profit": signal.take_profit,
-        "created_at": signal.created_at.isoformat(),
-    }
-
-
 @signal_bp.route("/auto", methods=["POST"])
 def create_auto_signal():
     payload = request.get_json(silent=True) or {}
@@ -29,7 +25,7 @@ def create_auto_signal():
         return jsonify({"error": "asset_id is required"}), 400
 
     asset = Asset.query.get_or_404(asset_id)
-    snapshot = fetch_market_snapshot(asset.symbol, timeframe)
+    snapshot = fetch_market_snapshot(asset.symbol, timeframe, asset_id=asset.id, exchange_id=asset.exchange)
     auto_fields = generate_auto_signal(snapshot)
 
     signal = Signal(
@@ -44,19 +40,173 @@ def create_auto_signal():
     db.session.add(signal)
     db.session.commit()
 
-    return jsonify({"signal": _signal_to_dict(signal), "market": snapshot.to_dict()}), 201
+    return jsonify({"signal": signal_to_dict(signal), "market": snapshot.to_dict()}), 201
+
+
+@signal_bp.route("/scan", methods=["POST"])
+def scan_signals():
+    payload = request.get_json(silent=True) or {}
+    asset_ids = payload.get("asset_ids")
+    timeframes = parse_timeframes(payload)
+
+    if timeframes is None:
+        return jsonify({"error": "timeframes must be a non-empty list of strings"}), 400
+    if asset_ids is not None and (
+        not isinstance(asset_ids, list)
+        or not all(isinstance(i, int) and not isinstance(i, bool) for i in asset_ids)
+    ):
+        return jsonify({"error": "asset_ids must be a list of integers"}), 400
+
+    query = db.session.query(Asset.id, Asset.symbol, Asset.exchange)
+    if asset_ids is not None:
+        query = query.filter(Asset.id.in_(asset_ids))
+    assets = query.order_by(Asset.id).all()
+
+    result = scan_assets(
+        current_app._get_current_object(),
+        assets,
+        timeframes,
+        max_workers=current_app.config.get("SCAN_MAX_WORKERS", 16),
+    )
+    return (
+        jsonify(
+            {
+                "signals": [
+                    {"signal": signal_to_dict(signal), "market": snapshot.to_dict()}
+                    for signal, snapshot in result.signals
+                ],
+                "errors": result.errors,
+            }
+        ),
+        201,
+    )
+
+
+@signal_bp.route("/bulk", methods=["POST"])
+def bulk_create_signals():
+    """NDJSON (default) or CSV body; each row names its asset by asset_id or symbol."""
+    fmt = request.args.get("format") or ("csv" if request.mimetype == "text/csv" else "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    report = import_signals(iter_records(request.stream, fmt))
+    return jsonify(report.to_dict()), 201
+
+
+@signal_bp.route("/export", methods=["GET"])
+def export_signals():
+    """Stream every matching signal with its symbol and AI insight as NDJSON (default) or CSV."""
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    records = iter_signal_exports(
+        asset_id=request.args.get("asset_id", type=int),
+        since=parse_datetime_arg("since"),
+        until=parse_datetime_arg("until"),
+    )
+    if fmt == "csv":
+        body, mimetype = encode_csv(records), "text/csv"
+    else:
+        body, mimetype = (dumps(record) + b"\n" for record in records), "application/x-ndjson"
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=signals.{fmt}"
+    return response
+
+
+@signal_bp.route("/analytics", methods=["GET"])
+def analytics():
+    """Counts and average confidence per bucket, read from the signal_rollups table.
+
+    ?group_by= any of asset, day, timeframe, side (comma-separated, default side); filters: asset_id,
+    side, timeframe, since/until (inclusive days).
+    """
+    group_by = [name.strip() for name in request.args.get("group_by", "side").split(",") if name.strip()]
+    unknown = [name for name in group_by if name not in GROUP_COLUMNS]
+    if unknown:
+        return jsonify({"error": f"group_by must be any of {', '.join(GROUP_COLUMNS)}"}), 400
+    since = parse_datetime_arg("since")
+    until = parse_datetime_arg("until")
+    return jsonify(
+        signal_analytics(
+            list(dict.fromkeys(group_by)),
+            asset_id=request.args.get("asset_id", type=int),
+            side=request.args.get("side"),
+            timeframe=request.args.get("timeframe"),
+            since=since.date() if since else None,
+            until=until.date() if until else None,
+        )
+    )
+
+
+@signal_bp.route("/latest", methods=["GET"])
+def latest_signals():
+    """Most recent signal per (asset, timeframe), e.g. the ones precomputed by the scheduler."""
+    asset_id = request.args.get("asset_id", type=int)
+    timeframe = request.args.get("timeframe")
+
+    latest_ids = db.session.query(func.max(Signal.id)).group_by(Signal.asset_id, Signal.timeframe)
+    if asset_id is not None:
+        latest_ids = latest_ids.filter(Signal.asset_id == asset_id)
+    if timeframe:
+        latest_ids = latest_ids.filter(Signal.timeframe == timeframe)
+
+    rows = db.session.execute(
+        select(*SIGNAL_COLUMNS).where(Signal.id.in_(latest_ids)).order_by(Signal.asset_id, Signal.timeframe)
+    ).all()
+    return json_array_response(rows, signal_to_dict)
 
 
 @signal_bp.route("/", methods=["GET"])
 def list_signals():
-    signals = Signal.query.order_by(Signal.created_at.desc()).all()
-    return jsonify([_signal_to_dict(signal) for signal in signals])
+    """Newest first, keyset-paginated on (created_at, id); see routes/pagination.py."""
+    limit = parse_limit()
+    cursor = decode_cursor(request.args.get("cursor"), 2)
+
+    query = select(*SIGNAL_COLUMNS)
+    asset_id = request.args.get("asset_id", type=int)
+    if asset_id is not None:
+        query = query.where(Signal.asset_id == asset_id)
+    if request.args.get("side"):
+        query = query.where(Signal.side == request.args["side"])
+    if request.args.get("timeframe"):
+        query = query.where(Signal.timeframe == request.args["timeframe"])
+    outcome = request.args.get("outcome")
+    if outcome == "open":
+        query = query.where(Signal.outcome.is_(None))
+    elif outcome:
+        if outcome not in OUTCOME_NAMES.values():
+            return jsonify({"error": f"outcome must be open or any of {', '.join(OUTCOME_NAMES.values())}"}), 400
+        query = query.where(Signal.outcome == outcome)
+    min_confidence = request.args.get("min_confidence", type=float)
+    if min_confidence is not None:
+        query = query.where(Signal.confidence >= min_confidence)
+    max_confidence = request.args.get("max_confidence", type=float)
+    if max_confidence is not None:
+        query = query.where(Signal.confidence <= max_confidence)
+    since = parse_datetime_arg("since")
+    if since is not None:
+        query = query.where(Signal.created_at >= since)
+    until = parse_datetime_arg("until")
+    if until is not None:
+        query = query.where(Signal.created_at < until)
+    if cursor is not None:
+        try:
+            cursor_key = (datetime.fromisoformat(cursor[0]), int(cursor[1]))
+        except (TypeError, ValueError):
+            return jsonify({"error": "invalid cursor"}), 400
+        query = query.where(tuple_(Signal.created_at, Signal.id) < cursor_key)
+
+    rows = db.session.execute(query.order_by(Signal.created_at.desc(), Signal.id.desc()).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return page_response(rows, signal_to_dict, next_cursor)
 
 
 @signal_bp.route("/<int:signal_id>", methods=["GET"])
 def get_signal(signal_id: int):
     signal = Signal.query.get_or_404(signal_id)
-    return jsonify(_signal_to_dict(signal))
+    return jsonify(signal_to_dict(signal))
 
 
 @signal_bp.route("/<int:signal_id>", methods=["PUT", "PATCH"])
@@ -76,9 +226,11 @@ def update_signal(signal_id: int):
         signal.stop_loss = payload["stop_loss"]
     if "take_profit" in payload:
         signal.take_profit = payload["take_profit"]
+    if any(name in payload for name in OUTCOME_INPUTS):
+        clear_outcome(signal)
 
     db.session.commit()
-    return jsonify(_signal_to_dict(signal))
+    return jsonify(signal_to_dict(signal))
 
 
 @signal_bp.route("/<int:signal_id>", methods=["DELETE"])
@@ -0,0 +1,158 @@
+import threading
+import time
+
+from flask import Blueprint, Response, current_app, request, stream_with_context
+from sqlalchemy import func, select
+
+from database import db, AIInsight, Signal
+from serializers import INSIGHT_COLUMNS, SIGNAL_COLUMNS, dumps, insight_to_dict, signal_to_dict
+from services.event_bus import current_version, wait_for_change
+
+stream_bp = Blueprint("stream", __name__)
+
+# Server-sent events for newly committed signals and AI insights.
+# Every event id is "<last signal id>:<last insight id>", so a reconnecting EventSource sends it back as
+# Last-Event-ID and the stream resumes exactly after the last row the client saw.
+#
+# Ids are assigned at insert, not at commit: on PostgreSQL, id 11 can commit before id 10. A stream
+# therefore only moves past an id once every lower id has been seen, and waits up to
+# SSE_GAP_GRACE_SECONDS for a missing one (it may belong to a rolled-back or deleted row) before
+# skipping it. Event ids stay exact high-water marks.
+#
+# Each open stream holds a worker thread, so at most SSE_MAX_STREAMS run per process; the rest are
+# told to retry later and the remaining threads stay free for the API.
+
+_BATCH = 500
+_BUSY_RETRY_MS = 10000
+
+_slots_lock = threading.Lock()
+_open_streams = 0
+
+
+def _parse_event_id(raw):
+    try:
+        signal_id, insight_id = raw.split(":")
+        return int(signal_id), int(insight_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _latest_ids():
+    signal_id = db.session.execute(select(func.max(Signal.id))).scalar() or 0
+    insight_id = db.session.execute(select(func.max(AIInsight.id))).scalar() or 0
+    return signal_id, insight_id
+
+
+def _format(event_name, event_id, payload):
+    return b"id: " + event_id.encode() + b"\nevent: " + event_name.encode() + b"\ndata: " + dumps(payload) + b"\n\n"
+
+
+def _in_commit_order(rows, after_id, gap, grace_seconds):
+    """The prefix of `rows` (ordered by id) that continues `after_id` without holes.
+
+    `gap` is (first missing id, monotonic time first seen) from the previous poll; a hole that has
+    stayed open for `grace_seconds` is skipped. Returns (rows, gap).
+    """
+    ready = []
+    expected = after_id + 1
+    now = time.monotonic()
+    for row in rows:
+        if row.id != expected:
+            if gap is None or gap[0] != expected:
+                gap = (expected, now)
+            if now - gap[1] < grace_seconds:
+                break
+        ready.append(row)
+        expected = row.id + 1
+    return ready, gap
+
+
+def _new_events(signal_id, insight_id, gaps, grace_seconds):
+    signals = db.session.execute(
+        select(*SIGNAL_COLUMNS).where(Signal.id > signal_id).order_by(Signal.id).limit(_BATCH)
+    ).all()
+    insights = db.session.execute(
+        select(*INSIGHT_COLUMNS).where(AIInsight.id > insight_id).order_by(AIInsight.id).limit(_BATCH)
+    ).all()
+    # End the read transaction so the next poll sees rows committed since.
+    db.session.rollback()
+    signals, gaps["signal"] = _in_commit_order(signals, signal_id, gaps.get("signal"), grace_seconds)
+    insights, gaps["insight"] = _in_commit_order(insights, insight_id, gaps.get("insight"), grace_seconds)
+
+    chunks = []
+    for row in signals:
+        signal_id = row.id
+        chunks.append(_format("signal", f"{signal_id}:{insight_id}", signal_to_dict(row)))
+    for row in insights:
+        insight_id = row.id
+        chunks.append(_format("insight", f"{signal_id}:{insight_id}", insight_to_dict(row)))
+    return chunks, signal_id, insight_id
+
+
+def _claim_slot(limit):
+    global _open_streams
+    with _slots_lock:
+        if _open_streams >= limit:
+            return False
+        _open_streams += 1
+        return True
+
+
+def _release_slot():
+    global _open_streams
+    with _slots_lock:
+        _open_streams -= 1
+
+
+def _event_stream(body):
+    response = Response(body, mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@stream_bp.route("/events", methods=["GET"])
+def stream_events():
+    if not _claim_slot(current_app.config.get("SSE_MAX_STREAMS", 24)):
+        # An EventSource reconnects after a stream that ends cleanly, but gives up on an error status.
+        return _event_stream(f"retry: {_BUSY_RETRY_MS}\n\n")
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            _release_slot()
+
+    try:
+        resume = _parse_event_id(request.headers.get("Last-Event-ID") or request.args.get("last_event_id"))
+        signal_id, insight_id = resume if resume is not None else _latest_ids()
+    except Exception:
+        release()
+        raise
+    poll_seconds = current_app.config.get("SSE_POLL_SECONDS", 2.0)
+    heartbeat_seconds = current_app.config.get("SSE_HEARTBEAT_SECONDS", 15.0)
+    max_seconds = current_app.config.get("SSE_MAX_SECONDS", 300.0)
+    grace_seconds = current_app.config.get("SSE_GAP_GRACE_SECONDS", 5.0)
+
+    def generate():
+        nonlocal signal_id, insight_id
+        started = last_sent = time.monotonic()
+        version = current_version()
+        gaps = {}
+        # The client reconnects (with Last-Event-ID) after each bounded session, freeing the worker thread.
+        yield f"retry: {int(poll_seconds * 1000)}\n\n".encode()
+        while (remaining := max_seconds - (time.monotonic() - started)) > 0:
+            chunks, signal_id, insight_id = _new_events(signal_id, insight_id, gaps, grace_seconds)
+            if chunks:
+                yield b"".join(chunks)
+                last_sent = time.monotonic()
+                continue
+            if time.monotonic() - last_sent >= heartbeat_seconds:
+                yield b": keepalive\n\n"
+                last_sent = time.monotonic()
+            version = wait_for_change(version, min(poll_seconds, remaining))
+
+    response = _event_stream(stream_with_context(generate()))
+    response.call_on_close(release)
+    return response
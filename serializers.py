@@ -0,0 +1,95 @@
+import json
+from typing import Any
+
+from database import AIInsight, Asset, Signal
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+
+# Shared row -> dict converters and a fast JSON encoder, used by the routes and the services alike
+# (HTTP response helpers live in routes/serializers.py). The converters only use attribute access,
+# so they accept ORM objects and the Row tuples of column-only select()s alike; selecting
+# SIGNAL_COLUMNS / ASSET_COLUMNS skips ORM identity-map hydration on large listings.
+
+SIGNAL_COLUMNS = (
+    Signal.id,
+    Signal.asset_id,
+    Signal.side,
+    Signal.timeframe,
+    Signal.confidence,
+    Signal.entry_price,
+    Signal.stop_loss,
+    Signal.take_profit,
+    Signal.created_at,
+    Signal.outcome,
+    Signal.exit_price,
+    Signal.realized_return,
+    Signal.time_to_hit,
+    Signal.resolved_at,
+)
+
+ASSET_COLUMNS = (
+    Asset.id,
+    Asset.symbol,
+    Asset.name,
+    Asset.exchange,
+    Asset.created_at,
+)
+
+INSIGHT_COLUMNS = (
+    AIInsight.id,
+    AIInsight.signal_id,
+    AIInsight.provider,
+    AIInsight.summary,
+    AIInsight.recommendation,
+    AIInsight.created_at,
+)
+
+
+def signal_to_dict(signal: Any) -> dict:
+    return {
+        "id": signal.id,
+        "asset_id": signal.asset_id,
+        "side": signal.side,
+        "timeframe": signal.timeframe,
+        "confidence": signal.confidence,
+        "entry_price": signal.entry_price,
+        "stop_loss": signal.stop_loss,
+        "take_profit": signal.take_profit,
+        "created_at": signal.created_at.isoformat(),
+        "outcome": signal.outcome,
+        "exit_price": signal.exit_price,
+        "realized_return": signal.realized_return,
+        "time_to_hit": signal.time_to_hit,
+        "resolved_at": signal.resolved_at.isoformat() if signal.resolved_at else None,
+    }
+
+
+def asset_to_dict(asset: Any) -> dict:
+    return {
+        "id": asset.id,
+        "symbol": asset.symbol,
+        "name": asset.name,
+        "exchange": asset.exchange,
+        "created_at": asset.created_at.isoformat(),
+    }
+
+
+def insight_to_dict(insight: Any) -> dict:
+    return {
+        "id": insight.id,
+        "signal_id": insight.signal_id,
+        "provider": insight.provider,
+        "summary": insight.summary,
+        "recommendation": insight.recommendation,
+        "created_at": insight.created_at.isoformat(),
+    }
+
+
+def dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode()
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import threading
+import time
+import uuid
+
+from sqlalchemy import update
+
+from database import db, AIInsight, AIJob, Asset, Signal
+from serializers import asset_to_dict, signal_to_dict
+from services.insight_cache import cached_generate_batch_insights, cached_generate_insight
+
+
+# AI summaries off the request thread. A job row is written up front, the provider calls run on a
+# small in-process pool, and the result is written back to the row, so the submitting request
+# returns immediately and polls can be answered by any worker.
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_max_workers = 4
+_job_timeout_seconds = 900.0
+_local_jobs: Dict[str, threading.Event] = {}
+
+_INTERRUPTED = "Interrupted: the worker running this job stopped before it finished"
+
+
+def configure_ai_jobs(max_workers: int = 4, job_timeout_seconds: float = 900.0) -> None:
+    global _max_workers, _job_timeout_seconds
+    _max_workers = max(1, max_workers)
+    _job_timeout_seconds = job_timeout_seconds
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="ai-job")
+    return _executor
+
+
+def _insight_response(signal: Signal, insight: AIInsight, payload: Dict[str, Any], cached: bool) -> Dict[str, Any]:
+    # The answer always comes from `payload`; `insight` is only the row it is stored in.
+    return {
+        "signal_id": signal.id,
+        "provider": insight.provider,
+        "summary": payload.get("summary", ""),
+        "recommendation": payload.get("recommendation", ""),
+        "confidence": payload.get("confidence", 0.0),
+        "risks": payload.get("risks", []),
+        "cached": cached,
+    }
+
+
+def _new_insight(signal: Signal, payload: Dict[str, Any]) -> AIInsight:
+    return AIInsight(
+        signal_id=signal.id,
+        provider="gemini",
+        summary=payload.get("summary", ""),
+        recommendation=payload.get("recommendation", ""),
+    )
+
+
+def _insight_for(signal: Signal, payload: Dict[str, Any], cached: bool) -> Tuple[AIInsight, bool]:
+    """The AIInsight row holding `payload`, and whether it is new.
+
+    A cache hit reuses the signal's stored insight when it already holds this answer.
+    """
+    stored = signal.insight
+    if (
+        cached
+        and stored is not None
+        and stored.summary == payload.get("summary", "")
+        and stored.recommendation == payload.get("recommendation", "")
+    ):
+        return stored, False
+    return _new_insight(signal, payload), True
+
+
+def summarize_signal(signal: Signal, asset: Asset, market: Dict[str, Any], api_key: str, model_name: str) -> Dict[str, Any]:
+    """Generate, store and return the insight for one signal (the synchronous /summary path)."""
+    payload, cached = cached_generate_insight(
+        api_key=api_key,
+        model_name=model_name,
+        signal=signal_to_dict(signal),
+        asset=asset_to_dict(asset),
+        market=market,
+    )
+    insight, is_new = _insight_for(signal, payload, cached)
+    if is_new:
+        db.session.add(insight)
+        db.session.commit()
+    return _insight_response(signal, insight, payload, cached)
+
+
+def summarize_signals(
+    signal_ids: List[int],
+    markets: Dict[int, Dict[str, Any]],
+    api_key: str,
+    model_name: str,
+    batch_size: int = 10,
+) -> List[Dict[str, Any]]:
+    """Insights for many signals, `batch_size` signals per provider prompt; stored with one commit."""
+    signals = Signal.query.filter(Signal.id.in_(signal_ids)).all()
+    assets = {asset.id: asset for asset in Asset.query.filter(Asset.id.in_({s.asset_id for s in signals})).all()}
+    by_id = {signal.id: signal for signal in signals}
+    ordered = [by_id[signal_id] for signal_id in dict.fromkeys(signal_ids) if signal_id in by_id]
+
+    responses = []
+    insights = []
+    for start in range(0, len(ordered), max(1, batch_size)):
+        batch = ordered[start:start + batch_size]
+        items = [
+            {
+                "signal": signal_to_dict(signal),
+                "asset": asset_to_dict(assets[signal.asset_id]),
+                "market": markets.get(signal.id, {}),
+            }
+            for signal in batch
+        ]
+        payloads, hits = cached_generate_batch_insights(api_key, model_name, items)
+        for signal in batch:
+            cached = signal.id in hits
+            insight, is_new = _insight_for(signal, payloads[signal.id], cached)
+            if is_new:
+                insights.append(insight)
+            responses.append((signal, insight, payloads[signal.id], cached))
+
+    db.session.add_all(insights)
+    db.session.commit()
+    return [_insight_response(*response) for response in responses]
+
+
+def _run_job(app, job_id: str, signal_ids: List[int], markets: Dict[int, Dict[str, Any]], batch_size: int) -> None:
+    with app.app_context():
+        job = db.session.get(AIJob, job_id)
+        job.status = "running"
+        db.session.commit()
+        try:
+            results = summarize_signals(
+                signal_ids,
+                markets,
+                api_key=app.config.get("GEMINI_API_KEY", ""),
+                model_name=app.config.get("GEMINI_MODEL", "gemini-1.5-flash"),
+                batch_size=batch_size,
+            )
+            job.status = "done"
+            job.result = json.dumps(results)
+        except Exception as exc:
+            db.session.rollback()
+            app.logger.exception("AI job %s failed", job_id)
+            job = db.session.get(AIJob, job_id)
+            job.status = "failed"
+            job.error = str(exc)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    event = _local_jobs.pop(job_id, None)
+    if event is not None:
+        event.set()
+
+
+def submit_job(app, signal_ids: List[int], markets: Dict[int, Dict[str, Any]], batch_size: int = 10) -> AIJob:
+    job = AIJob(id=uuid.uuid4().hex, status="queued")
+    db.session.add(job)
+    db.session.commit()
+    _local_jobs[job.id] = threading.Event()
+    _get_executor().submit(_run_job, app, job.id, list(signal_ids), markets, batch_size)
+    return job
+
+
+def fail_interrupted_jobs() -> int:
+    """Fail jobs still queued or running AI_JOB_TIMEOUT_SECONDS after submission; returns how many.
+
+    Jobs run on in-process threads, so a restarted worker loses its jobs without updating their rows.
+    Their inputs are not stored, so they cannot be requeued; the age limit leaves jobs that other,
+    live workers are still running alone.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=_job_timeout_seconds)
+    result = db.session.execute(
+        update(AIJob)
+        .where(AIJob.status.in_(("queued", "running")), AIJob.created_at < cutoff)
+        .values(status="failed", error=_INTERRUPTED, finished_at=datetime.utcnow())
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def wait_for_job(job_id: str, timeout: float) -> Optional[AIJob]:
+    """Return the job row, waiting up to `timeout` seconds for it to finish."""
+    deadline = time.monotonic() + max(timeout, 0.0)
+    event = _local_jobs.get(job_id)
+    if event is not None:
+        event.wait(timeout)
+    while True:
+        db.session.expire_all()
+        job = db.session.get(AIJob, job_id)
+        if job is not None and job.status in ("queued", "running") and job_id not in _local_jobs:
+            if job.created_at < datetime.utcnow() - timedelta(seconds=_job_timeout_seconds):
+                fail_interrupted_jobs()
+                continue
+        if job is None or job.status in ("done", "failed") or time.monotonic() >= deadline:
+            return job
+        # Submitted by another worker: poll the row instead.
+        time.sleep(min(0.25, max(deadline - time.monotonic(), 0.0)))
+
+
+def job_to_dict(job: AIJob) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "results": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
@@ -1,10 +1,64 @@
+import hashlib
 import json
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, List, Optional
 
-try:
-    import google.generativeai as genai
-except ImportError:  # pragma: no cover - handled at runtime
-    genai = None
+from metrics import AI_SECONDS, timed
+
+
+# One configured client per process. genai.configure() is global, so it only runs again when the
+# API key changes; models are built once per name and reused. The semaphore caps in-flight
+# provider calls from this process, sync requests and background jobs combined.
+_client_lock = threading.Lock()
+_configured_key: Optional[str] = None
+_models: Dict[str, Any] = {}
+_provider_slots = threading.BoundedSemaphore(4)
+
+# google-generativeai is imported on the first AI call, not at boot; see _load_genai.
+genai: Any = None
+_genai_import_attempted = False
+
+
+def _load_genai() -> Any:
+    global genai, _genai_import_attempted
+    if genai is None and not _genai_import_attempted:
+        _genai_import_attempted = True
+        try:
+            import google.generativeai as module
+        except ImportError:  # pragma: no cover - handled at runtime
+            module = None
+        genai = module
+    return genai
+
+
+def configure_ai_client(max_concurrency: int = 4) -> None:
+    global _provider_slots
+    _provider_slots = threading.BoundedSemaphore(max(1, max_concurrency))
+
+
+def _get_model(api_key: str, model_name: str) -> Any:
+    global _configured_key
+    model = _models.get(model_name) if _configured_key == api_key else None
+    if model is not None:
+        return model
+    with _client_lock:
+        if _configured_key != api_key:
+            genai.configure(api_key=api_key)
+            _configured_key = api_key
+            _models.clear()
+        model = _models.get(model_name)
+        if model is None:
+            model = genai.GenerativeModel(model_name=model_name)
+            _models[model_name] = model
+    return model
+
+
+def _call_model(api_key: str, model_name: str, prompt: str) -> str:
+    model = _get_model(api_key, model_name)
+    with _provider_slots:
+        response = model.generate_content(prompt)
+    text = getattr(response, "text", "") or ""  # This line tries to get the "text" attribute from the response object. If for some reason the response doesn't have a "text" attribute or it's None, it defaults to an empty string. This is a safety measure to prevent errors when processing the response.
+    return _strip_code_fences(text)  # Some AI models return their output wrapped in markdown code fences (```), especially when they are asked to return JSON. This function removes those fences so that you can parse the text as JSON without issues.
 
 
 def _build_prompt(signal: Dict[str, Any], asset: Dict[str, Any], market: Dict[str, Any]) -> str:
@@ -13,12 +67,21 @@ def _build_prompt(signal: Dict[str, Any], asset: Dict[str, Any], market: Dict[st
         "Return a raw JSON object only (no code fences, no markdown) with keys: "
         "summary, recommendation, confidence, risks. "
         "confidence must be a number between 0 and 1. risks must be a list of strings.\n\n"
-        f"Signal: {json.dumps(signal)}\n"
-        f"Asset: {json.dumps(asset)}\n"
-        f"Market: {json.dumps(market)}\n"
+        f"Signal: {json.dumps(signal, sort_keys=True)}\n"
+        f"Asset: {json.dumps(asset, sort_keys=True)}\n"
+        f"Market: {json.dumps(market, sort_keys=True)}\n"
     )
 
 
+def prompt_fingerprint(model_name: str, signal: Dict[str, Any], asset: Dict[str, Any], market: Dict[str, Any]) -> str:
+    """Stable hash of everything that determines a single-signal answer: the model and the canonical prompt."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode())
+    digest.update(b"\0")
+    digest.update(_build_prompt(signal, asset, market).encode())
+    return digest.hexdigest()
+
+
 def _strip_code_fences(text: str) -> str:
     if "```" not in text:
         return text
@@ -30,13 +93,8 @@ def _strip_code_fences(text: str) -> str:
     return cleaned.strip()
 
 
-def generate_insight(
-    api_key: str,
-    model_name: str,
-    signal: Dict[str, Any],
-    asset: Dict[str, Any],
-    market: Dict[str, Any],
-) -> Dict[str, Any]:
+def unavailable_payload(api_key: str) -> Optional[Dict[str, Any]]:
+    """The fallback answer when no model can be called (no key or no library), else None."""
     if not api_key:
         return {
             "summary": "Missing GEMINI_API_KEY.",
@@ -45,24 +103,46 @@ def generate_insight(
             "risks": ["AI provider not configured"],
         }
 
-    if genai is None:
+    if _load_genai() is None:
         return {
             "summary": "google-generativeai is not installed.",
             "recommendation": "Install dependencies from requirements.txt.",
             "confidence": 0.0,
             "risks": ["AI provider library missing"],
         }
+    return None
+
+
+def _with_defaults(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # The AI might return incomplete data, so we set defaults to ensure the payload always has the expected structure.
+    # If the key is already there, setdefault does absolutely nothing. It leaves the AI's original data alone.
+    payload.setdefault("summary", "")
+    payload.setdefault("recommendation", "")
+    payload.setdefault("confidence", 0.0)
+    payload.setdefault("risks", [])
+    return payload
+
+
+@timed(AI_SECONDS, call="insight")
+def generate_insight(
+    api_key: str,
+    model_name: str,
+    signal: Dict[str, Any],
+    asset: Dict[str, Any],
+    market: Dict[str, Any],
+) -> Dict[str, Any]:
+    unavailable = unavailable_payload(api_key)
+    if unavailable is not None:
+        return unavailable
 
-    genai.configure(api_key=api_key) # Before you can use the AI, you have to prove you have permission. This line sends your unique API Key to Google's servers. It’s like swiping a badge at the entrance of a lab so you can use their equipment.
-    model = genai.GenerativeModel(model_name=model_name)  # This line creates an instance of the AI model you want to use. It’s like choosing which machine you want to work with in the lab. The model_name should match one of the available Gemini models, such as "gemini-1.5-flash".
     prompt = _build_prompt(signal, asset, market)
-    response = model.generate_content(prompt)
-    text = getattr(response, "text", "") or ""  # This line tries to get the "text" attribute from the response object. If for some reason the response doesn't have a "text" attribute or it's None, it defaults to an empty string. This is a safety measure to prevent errors when processing the response.
-    text = _strip_code_fences(text)  # Some AI models return their output wrapped in markdown code fences (```), especially when they are asked to return JSON. This function removes those fences so that you can parse the text as JSON without issues.
+    text = _call_model(api_key, model_name, prompt)
 
     try:
         payload = json.loads(text)
     except json.JSONDecodeError:
+        payload = None
+    if not isinstance(payload, dict):
         payload = {
             "summary": text.strip() or "No response.",
             "recommendation": "Review summary.",
@@ -70,11 +150,61 @@ def generate_insight(
             "risks": ["Model did not return JSON"],
         }
 
-    # The AI might return incomplete data, so we set defaults to ensure the payload always has the expected structure.
-    # If the key is already there, setdefault does absolutely nothing. It leaves the AI's original data alone.
-    payload.setdefault("summary", "")
-    payload.setdefault("recommendation", "")
-    payload.setdefault("confidence", 0.0)
-    payload.setdefault("risks", [])
+    return _with_defaults(payload)
 
-    return payload
+
+def _build_batch_prompt(items: List[Dict[str, Any]]) -> str:
+    lines = [
+        "You are a crypto trading analyst. Analyze each intraday signal with its market snapshot. "
+        "Return a raw JSON array only (no code fences, no markdown) with one object per signal and keys: "
+        "signal_id, summary, recommendation, confidence, risks. "
+        "confidence must be a number between 0 and 1. risks must be a list of strings.\n"
+    ]
+    for item in items:
+        lines.append(
+            f"Signal: {json.dumps(item['signal'], sort_keys=True)}\n"
+            f"Asset: {json.dumps(item['asset'], sort_keys=True)}\n"
+            f"Market: {json.dumps(item['market'], sort_keys=True)}\n"
+        )
+    return "\n".join(lines)
+
+
+@timed(AI_SECONDS, call="batch")
+def generate_batch_insights(
+    api_key: str,
+    model_name: str,
+    items: List[Dict[str, Any]],
+) -> Dict[int, Dict[str, Any]]:
+    """One provider call for several signals. `items` hold signal/asset/market dicts; keyed by signal id."""
+    unavailable = unavailable_payload(api_key)
+    if unavailable is not None:
+        return {item["signal"]["id"]: dict(unavailable) for item in items}
+    if len(items) == 1:
+        item = items[0]
+        return {item["signal"]["id"]: generate_insight(api_key, model_name, item["signal"], item["asset"], item["market"])}
+
+    text = _call_model(api_key, model_name, _build_batch_prompt(items))
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        parsed = None
+
+    by_id: Dict[int, Dict[str, Any]] = {}
+    if isinstance(parsed, list):
+        for entry in parsed:
+            if isinstance(entry, dict) and "signal_id" in entry:
+                try:
+                    by_id[int(entry.pop("signal_id"))] = _with_defaults(entry)
+                except (TypeError, ValueError):
+                    continue
+
+    results = {}
+    for item in items:
+        signal_id = item["signal"]["id"]
+        results[signal_id] = by_id.get(signal_id) or {
+            "summary": "No response for this signal.",
+            "recommendation": "Review summary.",
+            "confidence": 0.0,
+            "risks": ["Model did not return JSON"],
+        }
+    return results
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import itertools
+import multiprocessing
+import os
+
+from services import vector_indicators
+from services.market_service import CANDLE_LIMIT, DEFAULT_RULES, SignalRules
+from services.vector_indicators import np
+
+
+# Replays generate_auto_signal over stored OHLCV. Indicators are computed once as full arrays,
+# every bar that would have produced a buy/sell becomes a trade entered at that bar's close, and
+# the stop-loss / take-profit of all trades is resolved with array comparisons over the following
+# `horizon` bars. Each signal is evaluated on its own, as the live system emits them regardless
+# of open positions.
+
+OUTCOME_TARGET = 1
+OUTCOME_STOP = -1
+OUTCOME_EXPIRED = 0
+
+_CHUNK_CELLS = 4_000_000  # trades x horizon bars compared per chunk
+
+
+@dataclass
+class IndicatorSeries:
+    close: "np.ndarray"
+    rsi: "np.ndarray"
+    macd: "np.ndarray"
+    signal: "np.ndarray"
+    volatility: "np.ndarray"
+
+
+@dataclass
+class BacktestReport:
+    rules: Dict[str, float]
+    candles: int
+    trades: int
+    wins: int
+    losses: int
+    expired: int
+    win_rate: float
+    total_return: float
+    average_return: float
+    max_drawdown: float
+    average_bars_held: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("numpy is required for backtesting")
+
+
+def as_ohlcv_array(ohlcv: Any) -> "np.ndarray":
+    """Candles as a contiguous (n, 6) float64 array in the ccxt column order."""
+    _require_numpy()
+    array = np.ascontiguousarray(ohlcv, dtype=np.float64)
+    if array.ndim != 2 or array.shape[1] < 5:
+        raise ValueError("ohlcv must be rows of [time, open, high, low, close, volume]")
+    return array
+
+
+def compute_series(ohlcv: "np.ndarray", volatility_window: int = CANDLE_LIMIT - 1) -> IndicatorSeries:
+    close = ohlcv[:, 4]
+    macd_series, signal_series = vector_indicators.macd(close)
+    return IndicatorSeries(
+        close=close,
+        rsi=vector_indicators.rsi(close),
+        macd=macd_series,
+        signal=signal_series,
+        volatility=vector_indicators.rolling_volatility(close, volatility_window),
+    )
+
+
+def entry_arrays(series: IndicatorSeries, rules: SignalRules, warmup: int = CANDLE_LIMIT - 1):
+    """Vectorized generate_auto_signal: (entry indexes, side +1/-1, stop, target)."""
+    buy = (series.rsi < rules.rsi_buy) & (series.macd > series.signal)
+    sell = (series.rsi > rules.rsi_sell) & (series.macd < series.signal)
+    side = np.where(buy, 1, np.where(sell, -1, 0))
+    side[:warmup] = 0
+    index = np.flatnonzero(side)
+    side = side[index]
+
+    entry = series.close[index]
+    vol = np.maximum(series.volatility[index], rules.min_volatility)
+    stop = entry * (1 - side * rules.stop_mult * vol)
+    target = entry * (1 + side * rules.target_mult * vol)
+    return index, side, stop, target
+
+
+def resolve_exits(
+    highs: "np.ndarray",
+    lows: "np.ndarray",
+    closes: "np.ndarray",
+    entry_index: "np.ndarray",
+    side: "np.ndarray",
+    stop: "np.ndarray",
+    target: "np.ndarray",
+    horizon: Optional[int] = None,
+):
+    """First stop/target touch after each entry bar.
+
+    Looks at bars entry+1 .. entry+horizon (to the end of the data when `horizon` is None). A bar
+    that touches both levels counts as a stop, since the intrabar order is unknown. Returns
+    (outcome, exit index, exit price); unresolved trades exit at the last bar's close as expired.
+    """
+    count = len(entry_index)
+    last = len(closes) - 1
+    outcome = np.full(count, OUTCOME_EXPIRED, dtype=np.int8)
+    exit_index = np.full(count, last, dtype=np.int64)
+    exit_price = np.empty(count)
+    if count == 0:
+        return outcome, exit_index, exit_price
+
+    span = horizon if horizon is not None else max(last - int(entry_index.min()), 1)
+    steps = np.arange(1, span + 1)
+    chunk = max(1, _CHUNK_CELLS // span)
+    for start in range(0, count, chunk):
+        part = slice(start, start + chunk)
+        bars = entry_index[part, None] + steps[None, :]
+        in_range = bars <= last
+        bars = np.minimum(bars, last)
+        high = highs[bars]
+        low = lows[bars]
+        is_long = side[part, None] > 0
+        stop_hit = in_range & np.where(is_long, low <= stop[part, None], high >= stop[part, None])
+        target_hit = in_range & np.where(is_long, high >= target[part, None], low <= target[part, None])
+
+        first_stop = np.where(stop_hit.any(axis=1), stop_hit.argmax(axis=1), span)
+        first_target = np.where(target_hit.any(axis=1), target_hit.argmax(axis=1), span)
+        stopped = (first_stop < span) & (first_stop <= first_target)
+        targeted = (first_target < span) & ~stopped
+
+        chunk_outcome = np.where(stopped, OUTCOME_STOP, np.where(targeted, OUTCOME_TARGET, OUTCOME_EXPIRED))
+        first = np.minimum(first_stop, first_target)
+        expired_index = np.minimum(entry_index[part] + span, last)
+        chunk_exit = np.where(chunk_outcome != OUTCOME_EXPIRED, entry_index[part] + 1 + first, expired_index)
+        outcome[part] = chunk_outcome
+        exit_index[part] = chunk_exit
+        exit_price[part] = np.where(
+            stopped, stop[part], np.where(targeted, target[part], closes[chunk_exit])
+        )
+    return outcome, exit_index, exit_price
+
+
+def simulate(
+    ohlcv: "np.ndarray",
+    series: IndicatorSeries,
+    rules: SignalRules = DEFAULT_RULES,
+    horizon: Optional[int] = 288,
+    fee: float = 0.0,
+) -> BacktestReport:
+    index, side, stop, target = entry_arrays(series, rules)
+    outcome, exit_index, exit_price = resolve_exits(
+        ohlcv[:, 2], ohlcv[:, 3], ohlcv[:, 4], index, side, stop, target, horizon
+    )
+    entry = series.close[index]
+    returns = side * (exit_price - entry) / entry - 2 * fee
+
+    order = np.argsort(exit_index, kind="stable")
+    equity = np.cumsum(returns[order])
+    peak = np.maximum.accumulate(np.concatenate([[0.0], equity]))[1:]
+    drawdown = float((peak - equity).max()) if len(equity) else 0.0
+
+    trades = len(index)
+    wins = int((returns > 0).sum())
+    return BacktestReport(
+        rules=asdict(rules),
+        candles=len(ohlcv),
+        trades=trades,
+        wins=wins,
+        losses=int((returns <= 0).sum()),
+        expired=int((outcome == OUTCOME_EXPIRED).sum()),
+        win_rate=round(wins / trades, 4) if trades else 0.0,
+        total_return=round(float(returns.sum()), 6),
+        average_return=round(float(returns.mean()), 6) if trades else 0.0,
+        max_drawdown=round(drawdown, 6),
+        average_bars_held=round(float((exit_index - index).mean()), 2) if trades else 0.0,
+    )
+
+
+def run_backtest(
+    ohlcv: Any,
+    rules: SignalRules = DEFAULT_RULES,
+    horizon: Optional[int] = 288,
+    fee: float = 0.0,
+) -> BacktestReport:
+    array = as_ohlcv_array(ohlcv)
+    return simulate(array, compute_series(array), rules, horizon, fee)
+
+
+# Parameter sweeps. Indicators do not depend on the rules, so each worker process computes them
+# once in its initializer and every combination only redoes the entry and exit arrays.
+
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(ohlcv: "np.ndarray", horizon: Optional[int], fee: float, base: SignalRules = DEFAULT_RULES) -> None:
+    _worker_state.update(ohlcv=ohlcv, series=compute_series(ohlcv), horizon=horizon, fee=fee, base=base)
+
+
+def _run_combination(overrides: Dict[str, float]) -> Dict[str, Any]:
+    state = _worker_state
+    rules = replace(state["base"], **overrides)
+    return simulate(state["ohlcv"], state["series"], rules, state["horizon"], state["fee"]).to_dict()
+
+
+def _rule_value(name: str, value: Any) -> float:
+    # bool is an int subclass; JSON strings would otherwise reach numpy comparisons.
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} values must be numbers")
+    return float(value)
+
+
+def rule_grid(grid: Dict[str, Sequence[float]]) -> List[Dict[str, float]]:
+    """Every combination of `grid` ({rule name: [values]}); raises ValueError for bad names or values."""
+    if not isinstance(grid, dict):
+        raise ValueError("sweep must be an object of rule name to a list of values")
+    allowed = {field.name for field in fields(SignalRules)}
+    unknown = set(grid) - allowed
+    if unknown:
+        raise ValueError(f"Unknown rule parameters: {', '.join(sorted(unknown))}")
+    names = sorted(grid)
+    values = []
+    for name in names:
+        if not isinstance(grid[name], (list, tuple)) or not grid[name]:
+            raise ValueError(f"{name} must be a non-empty list of numbers")
+        values.append([_rule_value(name, value) for value in grid[name]])
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def sweep(
+    ohlcv: Any,
+    grid: Dict[str, Sequence[float]],
+    horizon: Optional[int] = 288,
+    fee: float = 0.0,
+    processes: Optional[int] = None,
+    base: SignalRules = DEFAULT_RULES,
+) -> List[Dict[str, Any]]:
+    """Backtest every combination in `grid`, applied on top of `base`, across a process pool; best total return first."""
+    array = as_ohlcv_array(ohlcv)
+    combinations = rule_grid(grid)
+    processes = processes or os.cpu_count() or 1
+    if processes <= 1 or len(combinations) <= 1:
+        _init_worker(array, horizon, fee, base)
+        results = [_run_combination(combo) for combo in combinations]
+    else:
+        # spawn, not fork: the caller may be a multi-threaded web worker holding locks and sockets.
+        with ProcessPoolExecutor(
+            max_workers=min(processes, len(combinations)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(array, horizon, fee, base),
+        ) as pool:
+            results = list(pool.map(_run_combination, combinations, chunksize=max(1, len(combinations) // (processes * 4))))
+    return sorted(results, key=lambda report: report["total_return"], reverse=True)
+
+
+def parse_grid(specs: Iterable[str]) -> Dict[str, List[float]]:
+    """CLI form of a grid: ["rsi_buy=40,45,50", "stop_mult=1.5,2"]."""
+    grid: Dict[str, List[float]] = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if not values:
+            raise ValueError(f"Invalid sweep spec: {spec!r}")
+        grid[name.strip()] = [float(value) for value in values.split(",") if value.strip()]
+    return grid
+
+
+def rules_from(overrides: Optional[Dict[str, Any]]) -> SignalRules:
+    """DEFAULT_RULES with `overrides` applied; unknown names raise ValueError."""
+    if not overrides:
+        return DEFAULT_RULES
+    if not isinstance(overrides, dict):
+        raise ValueError("rules must be an object of rule name to value")
+    (combination,) = rule_grid({name: [value] for name, value in overrides.items()})
+    return replace(DEFAULT_RULES, **combination)
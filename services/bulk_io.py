@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import csv
+import io
+import json
+
+from sqlalchemy import func, insert, select
+
+from database import db, AIInsight, Asset, Signal
+from services.event_bus import publish_after_commit
+from services.exchange_client import is_supported_exchange
+from services.signal_rollups import record_signals
+from services.timeframes import is_calendar_timeframe, timeframe_to_ms
+
+
+# Bulk import and export. Uploads are read line by line from the request stream and written in
+# batches (one executemany INSERT and one commit per batch); exports walk the signals table in
+# keyset-ordered chunks, so neither side holds the whole data set in memory.
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+SIDES = ("buy", "sell", "hold")
+
+EXPORT_FIELDS = (
+    "id",
+    "asset_id",
+    "symbol",
+    "side",
+    "timeframe",
+    "confidence",
+    "entry_price",
+    "stop_loss",
+    "take_profit",
+    "created_at",
+    "outcome",
+    "exit_price",
+    "realized_return",
+    "time_to_hit",
+    "resolved_at",
+    "insight_provider",
+    "insight_summary",
+    "insight_recommendation",
+    "insight_created_at",
+)
+
+
+class ImportReport:
+    def __init__(self) -> None:
+        self.inserted = 0
+        self.skipped = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def error(self, line: int, message: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"inserted": self.inserted, "skipped": self.skipped, "errors": self.errors}
+
+
+_READ_CHUNK = 64 * 1024
+
+
+def _byte_lines(stream: IO[bytes]) -> Iterator[bytes]:
+    pending = b""
+    while True:
+        chunk = stream.read(_READ_CHUNK)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + b"\n"
+    if pending:
+        yield pending
+
+
+def _decoded_lines(stream: IO[bytes], undecodable: List[int]) -> Iterator[str]:
+    # Lines are decoded one at a time so a bad byte sequence costs one line, not the upload; the
+    # line is replaced by a blank one and its number left in `undecodable` for the caller to report.
+    for line_no, line in enumerate(_byte_lines(stream), start=1):
+        try:
+            yield line.decode("utf-8")
+        except UnicodeDecodeError:
+            undecodable.append(line_no)
+            yield "\n"
+
+
+def _iter_csv(lines: Iterator[str], undecodable: List[int]) -> Iterator[Tuple[int, Any]]:
+    reader = csv.reader(lines)
+    header: Optional[List[str]] = None
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            values = None
+        except csv.Error as exc:
+            values = ValueError(f"invalid CSV: {exc}")
+        while undecodable:
+            yield undecodable.pop(0), ValueError("invalid UTF-8")
+        if values is None:
+            return
+        if isinstance(values, Exception):
+            yield reader.line_num, values
+        elif not values:
+            continue
+        elif header is None:
+            header = values
+        else:
+            yield reader.line_num, {
+                key: value for key, value in zip(header, values) if value not in ("", None)
+            }
+
+
+def iter_records(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """(line number, record) pairs from an NDJSON or CSV byte stream, decoded incrementally.
+
+    Malformed lines (bad JSON or CSV, invalid UTF-8) are yielded as a ValueError instead of a dict
+    so callers can report them and carry on with the rest of the upload.
+    """
+    undecodable: List[int] = []
+    lines = _decoded_lines(stream, undecodable)
+    if fmt == "csv":
+        yield from _iter_csv(lines, undecodable)
+        return
+    for line_no, line in enumerate(lines, start=1):
+        if undecodable:
+            yield undecodable.pop(), ValueError("invalid UTF-8")
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, ValueError(f"invalid JSON: {exc}")
+            continue
+        yield line_no, record if isinstance(record, dict) else ValueError("each line must be a JSON object")
+
+
+def _batches(records: Iterable[Tuple[int, Any]], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    batch: List[Tuple[int, Any]] = []
+    for item in records:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_assets(records: Iterable[Tuple[int, Any]], batch_size: int = BATCH_SIZE) -> ImportReport:
+    """Insert new assets; rows whose symbol already exists (in the table or earlier in the upload) are skipped."""
+    report = ImportReport()
+    for batch in _batches(records, batch_size):
+        rows: Dict[str, Dict[str, Any]] = {}
+        for line, record in batch:
+            if isinstance(record, Exception):
+                report.error(line, str(record))
+                continue
+            symbol = str(record.get("symbol") or "").strip().upper()
+            name = str(record.get("name") or "").strip()
+            exchange = str(record.get("exchange") or "binance").strip().lower()
+            if not symbol or not name:
+                report.error(line, "symbol and name are required")
+            elif len(symbol) > 20:
+                report.error(line, "symbol is too long")
+            elif not is_supported_exchange(exchange):
+                report.error(line, f"unsupported exchange {exchange}")
+            elif symbol in rows:
+                report.error(line, "duplicate symbol")
+            else:
+                rows[symbol] = {"symbol": symbol, "name": name, "exchange": exchange}
+
+        existing = set(db.session.execute(select(Asset.symbol).where(Asset.symbol.in_(list(rows)))).scalars())
+        report.skipped += len(existing)
+        new_rows = [row for symbol, row in rows.items() if symbol not in existing]
+        if new_rows:
+            db.session.execute(insert(Asset), new_rows)
+            db.session.commit()
+            report.inserted += len(new_rows)
+    return report
+
+
+def _optional_float(record: Dict[str, Any], key: str) -> Optional[float]:
+    value = record.get(key)
+    return None if value is None else float(value)
+
+
+def _timeframe(record: Dict[str, Any]) -> str:
+    timeframe = str(record.get("timeframe") or "5m").strip()
+    if not is_calendar_timeframe(timeframe):
+        timeframe_to_ms(timeframe)  # raises ValueError for anything ccxt would not accept
+    return timeframe
+
+
+def _signal_row(record: Dict[str, Any], symbols: Dict[str, int]) -> Dict[str, Any]:
+    if record.get("asset_id") is not None:
+        asset_id = int(record["asset_id"])
+    elif record.get("symbol"):
+        asset_id = symbols.get(str(record["symbol"]).upper())
+        if asset_id is None:
+            raise ValueError(f"unknown symbol {record['symbol']}")
+    else:
+        raise ValueError("asset_id or symbol is required")
+    side = record.get("side")
+    if side not in SIDES:
+        raise ValueError("side must be buy, sell or hold")
+    created_at = record.get("created_at")
+    return {
+        "asset_id": asset_id,
+        "side": side,
+        "timeframe": _timeframe(record),
+        "confidence": float(record.get("confidence") or 0.0),
+        "entry_price": _optional_float(record, "entry_price"),
+        "stop_loss": _optional_float(record, "stop_loss"),
+        "take_profit": _optional_float(record, "take_profit"),
+        "created_at": datetime.fromisoformat(created_at) if created_at else datetime.utcnow(),
+    }
+
+
+def import_signals(records: Iterable[Tuple[int, Any]], batch_size: int = BATCH_SIZE) -> ImportReport:
+    """Insert signals referencing existing assets by `asset_id` or `symbol`."""
+    report = ImportReport()
+    for batch in _batches(records, batch_size):
+        wanted = {
+            str(record["symbol"]).upper()
+            for _, record in batch
+            if isinstance(record, dict) and record.get("asset_id") is None and record.get("symbol")
+        }
+        symbols = dict(db.session.execute(select(Asset.symbol, Asset.id).where(Asset.symbol.in_(wanted))).all())
+
+        parsed: List[Tuple[int, Dict[str, Any]]] = []
+        for line, record in batch:
+            if isinstance(record, Exception):
+                report.error(line, str(record))
+                continue
+            try:
+                parsed.append((line, _signal_row(record, symbols)))
+            except (TypeError, ValueError) as exc:
+                report.error(line, str(exc))
+
+        asset_ids = {row["asset_id"] for _, row in parsed}
+        known = set(db.session.execute(select(Asset.id).where(Asset.id.in_(asset_ids))).scalars())
+        rows = []
+        for line, row in parsed:
+            if row["asset_id"] in known:
+                rows.append(row)
+            else:
+                report.error(line, f"unknown asset_id {row['asset_id']}")
+        if rows:
+            db.session.execute(insert(Signal), rows)
+            record_signals(rows)
+            publish_after_commit(db.session)
+            db.session.commit()
+            report.inserted += len(rows)
+    return report
+
+
+_latest_insight_id = (
+    select(func.max(AIInsight.id)).where(AIInsight.signal_id == Signal.id).correlate(Signal).scalar_subquery()
+)
+
+
+def iter_signal_exports(
+    asset_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    chunk_size: int = BATCH_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Signals joined with their asset symbol and insight, oldest first, read `chunk_size` rows at a time."""
+    query = (
+        select(
+            Signal.id,
+            Signal.asset_id,
+            Asset.symbol,
+            Signal.side,
+            Signal.timeframe,
+            Signal.confidence,
+            Signal.entry_price,
+            Signal.stop_loss,
+            Signal.take_profit,
+            Signal.created_at,
+            Signal.outcome,
+            Signal.exit_price,
+            Signal.realized_return,
+            Signal.time_to_hit,
+            Signal.resolved_at,
+            AIInsight.provider.label("insight_provider"),
+            AIInsight.summary.label("insight_summary"),
+            AIInsight.recommendation.label("insight_recommendation"),
+            AIInsight.created_at.label("insight_created_at"),
+        )
+        .join(Asset, Asset.id == Signal.asset_id)
+        # Only the newest insight: every summarize call adds one, and the export has a row per signal.
+        .outerjoin(AIInsight, AIInsight.id == _latest_insight_id)
+    )
+    if asset_id is not None:
+        query = query.where(Signal.asset_id == asset_id)
+    if since is not None:
+        query = query.where(Signal.created_at >= since)
+    if until is not None:
+        query = query.where(Signal.created_at < until)
+
+    last_id = 0
+    while True:
+        rows = db.session.execute(query.where(Signal.id > last_id).order_by(Signal.id).limit(chunk_size)).all()
+        for row in rows:
+            record = row._asdict()
+            for key in ("created_at", "resolved_at", "insight_created_at"):
+                if record[key] is not None:
+                    record[key] = record[key].isoformat()
+            yield record
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1].id
+
+
+def encode_csv(records: Iterable[Dict[str, Any]], fields: Tuple[str, ...] = EXPORT_FIELDS) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    for count, record in enumerate(records, start=1):
+        writer.writerow(record)
+        if count % BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, List, Optional
+import threading
+import time
+
+from metrics import CACHE_REQUESTS
+from services.timeframes import next_boundary_ms, timeframe_to_ms
+
+
+# In-process OHLCV cache. An entry is valid until the candle that was forming when it was fetched
+# closes; after that only the tail from the last cached candle onward is fetched again.
+
+Fetcher = Callable[[Optional[int], int], List[List[float]]]
+
+
+@dataclass
+class _Entry:
+    rows: List[List[float]]
+    expires_at: int
+    limit: int  # largest limit this entry answers, even if the exchange had fewer candles
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _merge(cached: List[List[float]], fresh: List[List[float]]) -> List[List[float]]:
+    if not fresh:
+        return cached
+    first_fresh = fresh[0][0]
+    keep = len(cached)
+    while keep > 0 and cached[keep - 1][0] >= first_fresh:
+        keep -= 1
+    return cached[:keep] + fresh
+
+
+class CandleCache:
+    """LRU of candle lists keyed by (exchange, symbol, timeframe), bounded in entries and rows."""
+
+    def __init__(self, max_entries: int = 512, max_candles: int = 1000):
+        self.max_entries = max_entries
+        self.max_candles = max_candles
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_candles(self, key: Hashable, timeframe: str, limit: int, fetch: Fetcher) -> List[List[float]]:
+        """Return the latest `limit` candles, calling `fetch(since, limit)` only when stale."""
+        now = _now_ms()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if now < entry.expires_at and entry.limit >= limit:
+                    self.hits += 1
+                    CACHE_REQUESTS.inc(cache="candle", result="hit")
+                    return entry.rows[-limit:]
+            self.misses += 1
+        CACHE_REQUESTS.inc(cache="candle", result="miss")
+
+        step = timeframe_to_ms(timeframe)
+        if entry is not None and entry.rows and entry.limit >= limit and (now - entry.rows[-1][0]) // step < limit:
+            # Refetch from the last cached candle: it was still forming when cached.
+            since = int(entry.rows[-1][0])
+            rows = _merge(entry.rows, fetch(since, limit))
+            # The merged rows still cover every earlier, larger read; a small read must not forget that.
+            limit_covered = max(entry.limit, limit)
+        else:
+            rows = fetch(None, limit)
+            limit_covered = limit
+        if not rows:
+            return rows
+
+        rows = rows[-max(self.max_candles, limit_covered):]
+        expires_at = max(next_boundary_ms(int(rows[-1][0]), timeframe), now + 1)
+        with self._lock:
+            self._entries[key] = _Entry(rows=rows, expires_at=expires_at, limit=limit_covered)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return rows[-limit:]
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+candle_cache = CandleCache()
+
+
+def configure_candle_cache(max_entries: int = 512, max_candles: int = 1000) -> None:
+    candle_cache.max_entries = max_entries
+    candle_cache.max_candles = max_candles
+    candle_cache.invalidate()
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+import threading
+import time
+
+from sqlalchemy import delete, func, select
+
+from database import db, Candle, upsert_statement
+from services.exchange_client import get_exchange_client
+from services.timeframes import candle_open_ms, timeframe_to_ms
+
+
+# Persistent OHLCV history in the `candles` table. Rows use the ccxt layout
+# [open_time_ms, open, high, low, close, volume] on the way in and out.
+
+Fetcher = Callable[[Optional[int], int], List[List[float]]]
+
+_UPSERT_BATCH = 1000
+_EXCHANGE_PAGE = 1000
+
+_deferred = threading.local()
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _row_dicts(asset_id: int, timeframe: str, rows: Iterable[Sequence[float]]) -> List[dict]:
+    return [
+        {
+            "asset_id": asset_id,
+            "timeframe": timeframe,
+            "open_time": int(row[0]),
+            "open": float(row[1]),
+            "high": float(row[2]),
+            "low": float(row[3]),
+            "close": float(row[4]),
+            "volume": float(row[5] or 0.0),
+        }
+        for row in rows
+    ]
+
+
+def upsert_candles(asset_id: int, timeframe: str, rows: Iterable[Sequence[float]], commit: bool = True) -> int:
+    """Insert or overwrite candles in batched executemany calls and commit. Returns the row count."""
+    records = _row_dicts(asset_id, timeframe, rows)
+    if not records:
+        return 0
+    stmt = upsert_statement(
+        Candle,
+        index_elements=[Candle.asset_id, Candle.timeframe, Candle.open_time],
+        update_columns=["open", "high", "low", "close", "volume"],
+    )
+    for start in range(0, len(records), _UPSERT_BATCH):
+        batch = records[start:start + _UPSERT_BATCH]
+        if stmt is not None:
+            db.session.execute(stmt, batch)
+        else:
+            for record in batch:
+                db.session.merge(Candle(**record))
+    if commit:
+        db.session.commit()
+    return len(records)
+
+
+@contextmanager
+def deferred_candle_writes() -> Iterator[List[Tuple[int, str, List[List[float]]]]]:
+    """Within the block, store-backed fetches on this thread collect (asset_id, timeframe, rows) instead
+    of upserting them, so a caller fanning out over threads can write them all with one commit."""
+    writes: List[Tuple[int, str, List[List[float]]]] = []
+    previous = getattr(_deferred, "writes", None)
+    _deferred.writes = writes
+    try:
+        yield writes
+    finally:
+        _deferred.writes = previous
+
+
+def _store_fetched(asset_id: int, timeframe: str, rows: List[List[float]]) -> None:
+    writes = getattr(_deferred, "writes", None)
+    if writes is None:
+        upsert_candles(asset_id, timeframe, rows)
+    elif rows:
+        writes.append((asset_id, timeframe, rows))
+
+
+def load_candles(
+    asset_id: int,
+    timeframe: str,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> List[List[float]]:
+    """Stored candles in ascending open_time. With `limit`, the latest `limit` rows of the range."""
+    query = select(
+        Candle.open_time, Candle.open, Candle.high, Candle.low, Candle.close, Candle.volume
+    ).where(Candle.asset_id == asset_id, Candle.timeframe == timeframe)
+    if since is not None:
+        query = query.where(Candle.open_time >= since)
+    if until is not None:
+        query = query.where(Candle.open_time <= until)
+    if limit is not None:
+        query = query.order_by(Candle.open_time.desc()).limit(limit)
+        rows = [list(row) for row in db.session.execute(query)]
+        rows.reverse()
+        return rows
+    query = query.order_by(Candle.open_time)
+    return [list(row) for row in db.session.execute(query)]
+
+
+def latest_open_time(asset_id: int, timeframe: str) -> Optional[int]:
+    query = select(func.max(Candle.open_time)).where(
+        Candle.asset_id == asset_id, Candle.timeframe == timeframe
+    )
+    return db.session.execute(query).scalar()
+
+
+def delete_candles(asset_id: int) -> None:
+    db.session.execute(delete(Candle).where(Candle.asset_id == asset_id))
+
+
+def store_backed_fetcher(asset_id: int, timeframe: str, fetch: Fetcher) -> Fetcher:
+    """Wrap an exchange fetcher so reads come from the store and only the missing tail hits the exchange."""
+    step = timeframe_to_ms(timeframe)
+
+    def fetch_through_store(since: Optional[int], limit: int) -> List[List[float]]:
+        now = candle_open_ms(_now_ms(), timeframe)
+        # A stored forming candle was fetched during the current candle (by this or another worker),
+        # so the stored tail is as fresh as a candle cache entry would be and needs no exchange call.
+        if since is not None:
+            stored = load_candles(asset_id, timeframe, since=since)
+            if stored and stored[-1][0] >= now and len(stored) > (now - since) // step:
+                return stored
+            fresh = fetch(since, limit)
+            _store_fetched(asset_id, timeframe, fresh)
+            return fresh
+
+        stored = load_candles(asset_id, timeframe, limit=limit)
+        if len(stored) >= limit and stored[-1][0] >= now and (now - stored[0][0]) // step < limit:
+            return stored
+        # A shorter stored window (e.g. a larger limit than before) needs the full fetch to reach further back.
+        if len(stored) >= limit and (now - stored[-1][0]) // step < limit:
+            # The last stored candle may have been saved while still forming, so refetch from it.
+            fresh = fetch(int(stored[-1][0]), limit)
+            _store_fetched(asset_id, timeframe, fresh)
+            if fresh:
+                stored = [row for row in stored if row[0] < fresh[0][0]] + fresh
+            return stored[-limit:]
+
+        fresh = fetch(None, limit)
+        _store_fetched(asset_id, timeframe, fresh)
+        return fresh
+
+    return fetch_through_store
+
+
+def _missing_ranges(open_times: Sequence[int], start: int, end: int, step: int) -> List[Tuple[int, int]]:
+    ranges = []
+    expected = start
+    for open_time in open_times:
+        if open_time > expected:
+            ranges.append((expected, open_time - step))
+        expected = max(expected, open_time + step)
+    if expected <= end:
+        ranges.append((expected, end))
+    return ranges
+
+
+def ensure_history(
+    asset_id: int,
+    symbol: str,
+    timeframe: str,
+    start_ms: int,
+    end_ms: Optional[int] = None,
+    exchange_id: str = "binance",
+    max_pages: Optional[int] = None,
+) -> List[List[float]]:
+    """Backfill only the gaps in [start_ms, end_ms] from the exchange, then return the stored range.
+
+    With `max_pages`, raises ValueError before fetching anything if the gaps need more exchange pages.
+    """
+    step = timeframe_to_ms(timeframe)
+    start = candle_open_ms(start_ms, timeframe)
+    end = candle_open_ms(end_ms if end_ms is not None else _now_ms(), timeframe)
+    stored_times = db.session.execute(
+        select(Candle.open_time)
+        .where(
+            Candle.asset_id == asset_id,
+            Candle.timeframe == timeframe,
+            Candle.open_time >= start,
+            Candle.open_time <= end,
+        )
+        .order_by(Candle.open_time)
+    ).scalars().all()
+
+    gaps = _missing_ranges(stored_times, start, end, step)
+    if max_pages is not None:
+        pages = sum(-(-((gap_end - gap_start) // step + 1) // _EXCHANGE_PAGE) for gap_start, gap_end in gaps)
+        if pages > max_pages:
+            raise ValueError(f"{pages} pages of {timeframe} history are not stored (at most {max_pages} are fetched here)")
+
+    client = None
+    for gap_start, gap_end in gaps:
+        if client is None:
+            client = get_exchange_client(exchange_id)
+        since = gap_start
+        while since <= gap_end:
+            page = client.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=_EXCHANGE_PAGE)
+            page = [row for row in page if since <= row[0] <= gap_end]
+            if not page:
+                break
+            upsert_candles(asset_id, timeframe, page)
+            since = int(page[-1][0]) + step
+
+    return load_candles(asset_id, timeframe, since=start, until=end)
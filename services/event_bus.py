@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import AIInsight, Signal
+
+
+# Wake-ups for server-sent event streams. Commits that insert signals or insights bump a version
+# counter and wake every waiting stream in this process; streams then read the new rows from the
+# database, so events committed by other workers still arrive on the stream's next poll.
+
+_condition = threading.Condition()
+_version = 0
+_hooks_installed = False
+
+
+def current_version() -> int:
+    return _version
+
+
+def notify() -> None:
+    global _version
+    with _condition:
+        _version += 1
+        _condition.notify_all()
+
+
+def wait_for_change(seen_version: int, timeout: float) -> int:
+    """Block until the version moves past `seen_version` or `timeout` elapses; returns the version."""
+    with _condition:
+        _condition.wait_for(lambda: _version != seen_version, timeout)
+        return _version
+
+
+def publish_after_commit(session: Session) -> None:
+    """Notify streams when `session` next commits; for Core inserts, which the flush hook cannot see."""
+    session.info["publish_events"] = True
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    if any(isinstance(obj, (Signal, AIInsight)) for obj in session.new):
+        publish_after_commit(session)
+
+
+def _after_commit(session: Session) -> None:
+    if session.info.pop("publish_events", False):
+        notify()
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("publish_events", None)
+
+
+def install_commit_hooks() -> None:
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _hooks_installed = True
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from metrics import EXCHANGE_FETCH_SECONDS, RATE_LIMIT_WAIT_SECONDS
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+# One ccxt client per exchange id per process. Building a client is expensive: it owns the
+# HTTP session (keep-alive TLS connections), the loaded market metadata and the throttle state,
+# so routes borrow the shared instance from here instead of constructing their own.
+
+_settings: Dict[str, Any] = {
+    "rate_limit_ms": 0,  # 0 means "use the exchange's own rateLimit"
+    "lock_dir": None,  # directory for cross-process limiter files; None keeps limiting per process
+    "pool_size": 10,
+    "timeout_ms": 10_000,
+}
+_clients: Dict[str, "ExchangeClient"] = {}
+_registry_lock = threading.Lock()
+
+# ccxt (and requests, which it uses) take a large share of worker boot time, so they are imported
+# on the first exchange call rather than at module load. Assigning `ccxt` beforehand (as the
+# benchmark fakes do) skips the import.
+ccxt: Any = None
+_ccxt_import_attempted = False
+
+
+def _load_ccxt() -> Any:
+    global ccxt, _ccxt_import_attempted
+    if ccxt is None and not _ccxt_import_attempted:
+        _ccxt_import_attempted = True
+        try:
+            import ccxt as module
+        except ImportError:  # pragma: no cover - handled at runtime
+            module = None
+        ccxt = module
+    return ccxt
+
+
+class SharedRateLimiter:
+    """Spaces calls at least `interval` seconds apart.
+
+    Threads reserve the next free slot under a lock and sleep outside it. When a lock file is
+    given, the next free slot is stored in that file and guarded with ``flock`` so every
+    gunicorn worker on the host draws from the same budget.
+    """
+
+    def __init__(self, interval: float, lock_path: Optional[str] = None):
+        self.interval = max(interval, 0.0)
+        self.lock_path = lock_path if fcntl is not None else None
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def acquire(self) -> float:
+        """Block until the caller may hit the exchange. Returns the seconds spent waiting."""
+        if self.interval <= 0:
+            return 0.0
+        with self._lock:
+            if self.lock_path:
+                wait = self._reserve_shared()
+            else:
+                now = time.monotonic()
+                slot = max(now, self._next_allowed)
+                self._next_allowed = slot + self.interval
+                wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    def _reserve_shared(self) -> float:
+        with open(self.lock_path, "a+") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                raw = handle.read().strip()
+                try:
+                    next_allowed = float(raw) if raw else 0.0
+                except ValueError:
+                    next_allowed = 0.0
+                now = time.time()
+                slot = max(now, next_allowed)
+                handle.seek(0)
+                handle.truncate()
+                handle.write(repr(slot + self.interval))
+                handle.flush()
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+        return slot - now
+
+
+class ExchangeClient:
+    """A shared ccxt exchange plus the limiter every call to it goes through."""
+
+    def __init__(self, exchange_id: str, exchange: Any, limiter: SharedRateLimiter):
+        self.exchange_id = exchange_id
+        self.exchange = exchange
+        self.limiter = limiter
+        self._markets_lock = threading.Lock()
+        self._markets_loaded = False
+
+    def load_markets(self) -> Dict[str, Any]:
+        if not self._markets_loaded:
+            with self._markets_lock:
+                if not self._markets_loaded:
+                    self._throttle()
+                    with EXCHANGE_FETCH_SECONDS.time(exchange=self.exchange_id, call="load_markets"):
+                        self.exchange.load_markets()
+                    self._markets_loaded = True
+        return self.exchange.markets
+
+    def fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = "5m",
+        since: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[List[float]]:
+        self.load_markets()
+        self._throttle()
+        with EXCHANGE_FETCH_SECONDS.time(exchange=self.exchange_id, call="fetch_ohlcv"):
+            return self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+
+    def fetch_ticker(self, symbol: str) -> Dict[str, Any]:
+        self.load_markets()
+        self._throttle()
+        with EXCHANGE_FETCH_SECONDS.time(exchange=self.exchange_id, call="fetch_ticker"):
+            return self.exchange.fetch_ticker(symbol)
+
+    def _throttle(self) -> None:
+        RATE_LIMIT_WAIT_SECONDS.observe(self.limiter.acquire(), exchange=self.exchange_id)
+
+
+def configure_exchange_clients(
+    rate_limit_ms: int = 0,
+    lock_dir: Optional[str] = None,
+    pool_size: int = 10,
+    timeout_ms: int = 10_000,
+) -> None:
+    """Set registry options. Clients created before this call are dropped."""
+    if lock_dir:
+        os.makedirs(lock_dir, exist_ok=True)
+    with _registry_lock:
+        _settings.update(
+            rate_limit_ms=rate_limit_ms,
+            lock_dir=lock_dir,
+            pool_size=pool_size,
+            timeout_ms=timeout_ms,
+        )
+        _clients.clear()
+
+
+def _build_session() -> Any:
+    try:
+        import requests
+        from requests.adapters import HTTPAdapter
+    except ImportError:  # pragma: no cover - ccxt pulls requests in, so this only happens without ccxt
+        return None
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=_settings["pool_size"], pool_maxsize=_settings["pool_size"])
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _build_client(exchange_id: str) -> ExchangeClient:
+    exchange_class = getattr(ccxt, exchange_id, None)
+    if exchange_class is None:
+        raise RuntimeError(f"Unsupported exchange: {exchange_id}")
+
+    options: Dict[str, Any] = {
+        # Throttling is done by SharedRateLimiter so it can be shared between threads and workers.
+        "enableRateLimit": False,
+        "timeout": _settings["timeout_ms"],
+    }
+    session = _build_session()
+    if session is not None:
+        options["session"] = session
+    exchange = exchange_class(options)
+
+    interval_ms = _settings["rate_limit_ms"] or getattr(exchange, "rateLimit", 0) or 0
+    lock_path = None
+    if _settings["lock_dir"]:
+        lock_path = os.path.join(_settings["lock_dir"], f"{exchange_id}.ratelimit")
+    limiter = SharedRateLimiter(interval_ms / 1000.0, lock_path)
+    return ExchangeClient(exchange_id, exchange, limiter)
+
+
+def is_supported_exchange(exchange_id: str) -> bool:
+    """Whether `exchange_id` names a ccxt exchange class (not just any attribute of the module)."""
+    if _load_ccxt() is None or not exchange_id:
+        return False
+    names = getattr(ccxt, "exchanges", None)
+    if names is not None:
+        return exchange_id.lower() in names
+    return hasattr(ccxt, exchange_id.lower())
+
+
+def get_exchange_client(exchange_id: str = "binance") -> ExchangeClient:
+    """Return the process-wide client for `exchange_id`, creating it on first use."""
+    if _load_ccxt() is None:
+        raise RuntimeError("ccxt is not installed")
+
+    exchange_id = (exchange_id or "binance").lower()
+    client = _clients.get(exchange_id)
+    if client is not None:
+        return client
+    with _registry_lock:
+        client = _clients.get(exchange_id)
+        if client is None:
+            client = _build_client(exchange_id)
+            _clients[exchange_id] = client
+    return client
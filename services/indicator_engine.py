@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+import math
+import threading
+
+
+# Streaming versions of the indicators in market_service. Each (symbol, timeframe) keeps the
+# running EMA / Wilder RSI / rolling-variance state of its closed candles, so a new candle costs a
+# constant amount of work instead of a pass over the whole close list.
+
+FAST_PERIOD = 12
+SLOW_PERIOD = 26
+SIGNAL_PERIOD = 9
+RSI_PERIOD = 14
+
+
+@dataclass
+class IndicatorValues:
+    last_price: float
+    rsi: float
+    macd: float
+    signal: float
+    volatility: float
+
+
+@dataclass
+class IndicatorState:
+    volatility_window: int
+    last_open_time: Optional[int] = None
+    last_close: Optional[float] = None
+    count: int = 0
+    ema_fast: float = 0.0
+    ema_slow: float = 0.0
+    macd_signal: float = 0.0
+    changes: int = 0
+    avg_gain: float = 0.0
+    avg_loss: float = 0.0
+    returns: Deque[float] = field(default_factory=deque)
+    returns_sum: float = 0.0
+    returns_sumsq: float = 0.0
+    since_resum: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+def _ema_step(previous: float, value: float, period: int, first: bool) -> float:
+    if first:
+        return value
+    k = 2 / (period + 1)
+    return value * k + previous * (1 - k)
+
+
+def _step(state: IndicatorState, close: float) -> Tuple[float, ...]:
+    """Compute the state fields after folding in `close`, without mutating `state`."""
+    first = state.count == 0
+    ema_fast = _ema_step(state.ema_fast, close, FAST_PERIOD, first)
+    ema_slow = _ema_step(state.ema_slow, close, SLOW_PERIOD, first)
+    macd_signal = _ema_step(state.macd_signal, ema_fast - ema_slow, SIGNAL_PERIOD, first)
+
+    changes = state.changes
+    avg_gain = state.avg_gain
+    avg_loss = state.avg_loss
+    returns_sum = state.returns_sum
+    returns_sumsq = state.returns_sumsq
+    new_return = None
+    if state.last_close is not None:
+        change = close - state.last_close
+        gain = change if change >= 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        changes += 1
+        if changes <= RSI_PERIOD:
+            # Seed with the simple average of the first RSI_PERIOD changes.
+            avg_gain += gain / RSI_PERIOD
+            avg_loss += loss / RSI_PERIOD
+        else:
+            avg_gain = (avg_gain * (RSI_PERIOD - 1) + gain) / RSI_PERIOD
+            avg_loss = (avg_loss * (RSI_PERIOD - 1) + loss) / RSI_PERIOD
+
+        if state.last_close != 0:
+            new_return = (close - state.last_close) / state.last_close
+            returns_sum += new_return
+            returns_sumsq += new_return * new_return
+            if len(state.returns) >= state.volatility_window:
+                oldest = state.returns[0]
+                returns_sum -= oldest
+                returns_sumsq -= oldest * oldest
+
+    return ema_fast, ema_slow, macd_signal, changes, avg_gain, avg_loss, new_return, returns_sum, returns_sumsq
+
+
+def _values(close: float, step: Tuple[float, ...], window_len: int) -> IndicatorValues:
+    ema_fast, ema_slow, macd_signal, changes, avg_gain, avg_loss, _, returns_sum, returns_sumsq = step
+
+    if changes < RSI_PERIOD:
+        rsi = 50.0
+    elif avg_loss == 0:
+        rsi = 100.0
+    else:
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+    volatility = 0.0
+    if window_len >= 2:
+        mean = returns_sum / window_len
+        volatility = math.sqrt(max(returns_sumsq / window_len - mean * mean, 0.0))
+
+    return IndicatorValues(
+        last_price=close,
+        rsi=rsi,
+        macd=ema_fast - ema_slow,
+        signal=macd_signal,
+        volatility=volatility,
+    )
+
+
+def _current(state: IndicatorState) -> Tuple[float, ...]:
+    return (
+        state.ema_fast,
+        state.ema_slow,
+        state.macd_signal,
+        state.changes,
+        state.avg_gain,
+        state.avg_loss,
+        None,
+        state.returns_sum,
+        state.returns_sumsq,
+    )
+
+
+def _window_len(state: IndicatorState, new_return: Optional[float]) -> int:
+    if new_return is None:
+        return len(state.returns)
+    return min(len(state.returns) + 1, state.volatility_window)
+
+
+def _commit(state: IndicatorState, open_time: int, close: float) -> None:
+    step = _step(state, close)
+    (
+        state.ema_fast,
+        state.ema_slow,
+        state.macd_signal,
+        state.changes,
+        state.avg_gain,
+        state.avg_loss,
+        new_return,
+        state.returns_sum,
+        state.returns_sumsq,
+    ) = step
+    if new_return is not None:
+        if len(state.returns) >= state.volatility_window:
+            state.returns.popleft()
+        state.returns.append(new_return)
+        state.since_resum += 1
+        if state.since_resum >= state.volatility_window:
+            # Re-sum once per window so add/subtract rounding error cannot accumulate (amortised O(1)).
+            state.returns_sum = math.fsum(state.returns)
+            state.returns_sumsq = math.fsum(r * r for r in state.returns)
+            state.since_resum = 0
+    state.count += 1
+    state.last_close = close
+    state.last_open_time = open_time
+
+
+class IndicatorEngine:
+    """Keeps indicator state per key and folds in candles as they close.
+
+    `update` takes the latest OHLCV window from the exchange. Candles older than the newest one
+    are treated as closed and folded into the state once; the newest candle is still forming, so
+    it is applied on top of the state for the returned values without being stored.
+    """
+
+    def __init__(self, volatility_window: int = 99):
+        self.volatility_window = volatility_window
+        self._states: Dict[Hashable, IndicatorState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, key: Hashable) -> IndicatorState:
+        state = self._states.get(key)
+        if state is None:
+            with self._lock:
+                state = self._states.setdefault(key, IndicatorState(self.volatility_window))
+        return state
+
+    def update(self, key: Hashable, ohlcv: List[List[float]]) -> IndicatorValues:
+        if not ohlcv:
+            raise RuntimeError("No market data returned")
+
+        state = self._state(key)
+        with state.lock:
+            closed = ohlcv[:-1]
+            start = self._first_new_index(state, closed)
+            if start is None:
+                # The window no longer overlaps what we have seen (gap or restart): rebuild.
+                state = IndicatorState(self.volatility_window, lock=state.lock)
+                with self._lock:
+                    self._states[key] = state
+                start = 0
+            for candle in closed[start:]:
+                _commit(state, int(candle[0]), float(candle[4]))
+
+            live_close = float(ohlcv[-1][4])
+            if state.last_open_time is not None and int(ohlcv[-1][0]) <= state.last_open_time:
+                # Nothing newer than the state: report the last closed candle as-is.
+                return _values(state.last_close, _current(state), len(state.returns))
+            step = _step(state, live_close)
+            return _values(live_close, step, _window_len(state, step[6]))
+
+    @staticmethod
+    def _first_new_index(state: IndicatorState, closed: List[List[float]]) -> Optional[int]:
+        if state.last_open_time is None:
+            return 0
+        # Walk back from the end: only the handful of candles closed since the last update are new.
+        index = len(closed)
+        while index > 0 and int(closed[index - 1][0]) > state.last_open_time:
+            index -= 1
+        if index == 0 and closed and int(closed[0][0]) > state.last_open_time:
+            return None
+        if index > 0 and int(closed[index - 1][0]) != state.last_open_time:
+            return None
+        return index
+
+    def reset(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._states.clear()
+            else:
+                self._states.pop(key, None)
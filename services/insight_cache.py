@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import threading
+import time
+
+from sqlalchemy import delete
+
+from database import db, AIInsightCache, upsert_statement
+from metrics import CACHE_REQUESTS
+from services import ai_service
+from services.single_flight import SingleFlight
+
+
+# Two-tier cache for AI answers, keyed by ai_service.prompt_fingerprint. The in-process LRU answers
+# repeats from the same worker; the ai_insight_cache table shares answers between workers and
+# restarts. Only real model answers are cached, never the "not configured" / non-JSON fallbacks.
+
+_lock = threading.Lock()
+_memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_settings = {"ttl_seconds": 3600, "max_entries": 1024}
+_puts_since_prune = 0
+_insight_flight = SingleFlight("insight")
+
+
+def configure_insight_cache(ttl_seconds: int = 3600, max_entries: int = 1024) -> None:
+    with _lock:
+        _settings.update(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        _memory.clear()
+
+
+def _cacheable(api_key: str, payload: Dict[str, Any]) -> bool:
+    if ai_service.unavailable_payload(api_key) is not None:
+        return False
+    return "Model did not return JSON" not in payload.get("risks", [])
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    now = time.time()
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                _memory.move_to_end(key)
+                CACHE_REQUESTS.inc(cache="insight", result="memory_hit")
+                return dict(entry[1])
+            del _memory[key]
+
+    row = db.session.get(AIInsightCache, key)
+    if row is None or row.expires_at <= datetime.utcnow():
+        CACHE_REQUESTS.inc(cache="insight", result="miss")
+        return None
+    CACHE_REQUESTS.inc(cache="insight", result="db_hit")
+    payload = json.loads(row.payload)
+    remaining = (row.expires_at - datetime.utcnow()).total_seconds()
+    _remember(key, payload, now + remaining)
+    return dict(payload)
+
+
+def _remember(key: str, payload: Dict[str, Any], expires_at: float) -> None:
+    with _lock:
+        _memory[key] = (expires_at, payload)
+        _memory.move_to_end(key)
+        while len(_memory) > _settings["max_entries"]:
+            _memory.popitem(last=False)
+
+
+def put(key: str, model_name: str, payload: Dict[str, Any], commit: bool = True) -> None:
+    """Store `payload` in both tiers; the row is upserted so concurrent workers cannot collide on the key."""
+    global _puts_since_prune
+    ttl = _settings["ttl_seconds"]
+    if ttl <= 0:
+        return
+    _remember(key, dict(payload), time.time() + ttl)
+
+    now = datetime.utcnow()
+    record = {
+        "key": key,
+        "model": model_name,
+        "payload": json.dumps(payload),
+        "created_at": now,
+        "expires_at": now + timedelta(seconds=ttl),
+    }
+    stmt = upsert_statement(
+        AIInsightCache,
+        index_elements=[AIInsightCache.key],
+        update_columns=["model", "payload", "created_at", "expires_at"],
+    )
+    if stmt is not None:
+        db.session.execute(stmt, [record])
+    else:
+        db.session.merge(AIInsightCache(**record))
+    _puts_since_prune += 1
+    if _puts_since_prune >= 100:
+        _puts_since_prune = 0
+        db.session.execute(delete(AIInsightCache).where(AIInsightCache.expires_at <= now))
+    if commit:
+        db.session.commit()
+
+
+def cached_generate_insight(
+    api_key: str,
+    model_name: str,
+    signal: Dict[str, Any],
+    asset: Dict[str, Any],
+    market: Dict[str, Any],
+) -> Tuple[Dict[str, Any], bool]:
+    """generate_insight through the cache. Returns (payload, served_from_cache).
+
+    Concurrent misses for the same prompt share one model call; the callers that waited count as cached.
+    """
+    key = ai_service.prompt_fingerprint(model_name, signal, asset, market)
+    cached = get(key)
+    if cached is not None:
+        return cached, True
+    (payload, from_cache), shared = _insight_flight.do(
+        key, _generate_and_store, api_key, model_name, key, signal, asset, market
+    )
+    return dict(payload), from_cache or shared
+
+
+def _generate_and_store(
+    api_key: str, model_name: str, key: str, signal: Dict[str, Any], asset: Dict[str, Any], market: Dict[str, Any]
+) -> Tuple[Dict[str, Any], bool]:
+    # Another worker may have stored the answer while this one waited for the cross-worker lock.
+    cached = get(key)
+    if cached is not None:
+        return cached, True
+    payload = ai_service.generate_insight(api_key, model_name, signal, asset, market)
+    if _cacheable(api_key, payload):
+        put(key, model_name, payload)
+    return payload, False
+
+
+def cached_generate_batch_insights(
+    api_key: str,
+    model_name: str,
+    items: List[Dict[str, Any]],
+) -> Tuple[Dict[int, Dict[str, Any]], set]:
+    """generate_batch_insights for the items not already cached. Returns (payloads, ids served from cache).
+
+    New cache rows are left uncommitted for the caller's transaction.
+    """
+    payloads: Dict[int, Dict[str, Any]] = {}
+    hits = set()
+    keys = {}
+    misses = []
+    for item in items:
+        signal_id = item["signal"]["id"]
+        keys[signal_id] = ai_service.prompt_fingerprint(model_name, item["signal"], item["asset"], item["market"])
+        cached = get(keys[signal_id])
+        if cached is not None:
+            payloads[signal_id] = cached
+            hits.add(signal_id)
+        else:
+            misses.append(item)
+
+    if misses:
+        fresh = ai_service.generate_batch_insights(api_key, model_name, misses)
+        for signal_id, payload in fresh.items():
+            payloads[signal_id] = payload
+            if _cacheable(api_key, payload):
+                put(keys[signal_id], model_name, payload, commit=False)
+    return payloads, hits
@@ -1,14 +1,41 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List
-import math
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence
 import statistics
+import time
 
-try:
-    import ccxt
-except ImportError:  # pragma: no cover - handled at runtime
-    ccxt = None
+from database import Asset
+from metrics import CACHE_REQUESTS, INDICATOR_SECONDS, MARKET_SNAPSHOT_SECONDS, timed
+from services.candle_cache import candle_cache
+from services.candle_store import ensure_history, store_backed_fetcher
+from services.exchange_client import get_exchange_client
+from services.indicator_engine import IndicatorEngine
+from services.market_stream import MarketStream, get_market_stream, set_market_stream
+from services.resampler import can_resample, resample_ohlcv
+from services.single_flight import SingleFlight
+from services.timeframes import is_calendar_timeframe, timeframe_to_ms
+from services import vector_indicators
+
+
+CANDLE_LIMIT = 100
+
+# Indicator state per (exchange, symbol, timeframe); each refresh only folds in the candles closed since the last one.
+_engine = IndicatorEngine(volatility_window=CANDLE_LIMIT - 1)
+
+# Concurrent identical snapshot requests (e.g. every client right after a candle opens) share one fetch.
+_snapshot_flight = SingleFlight("market_snapshot")
+
+# Higher timeframes are resampled from one base series when it is long enough (see fetch_market_snapshots).
+_resample_settings: Dict[str, Any] = {"base_timeframe": None, "max_base_candles": 1000}
+
+
+def configure_resampling(base_timeframe: Optional[str] = None, max_base_candles: int = 1000) -> None:
+    """Serve timeframes that are multiples of `base_timeframe` from one fetch of at most `max_base_candles`."""
+    if base_timeframe:
+        timeframe_to_ms(base_timeframe)
+    _resample_settings.update(base_timeframe=base_timeframe or None, max_base_candles=max_base_candles)
 
 
 @dataclass
@@ -44,18 +71,21 @@ def _ema(values: List[float], period: int) -> List[float]:
 
 
 def _rsi(values: List[float], period: int = 14) -> float:
+    # Wilder smoothing over the whole series, the same RSI the incremental engine maintains.
     if len(values) < period + 1:
         return 50.0
-    gains = []
-    losses = []
-    for i in range(1, period + 1):
-        change = values[-i] - values[-i - 1]
-        if change >= 0:
-            gains.append(change)
+    average_gain = 0.0
+    average_loss = 0.0
+    for i in range(1, len(values)):
+        change = values[i] - values[i - 1]
+        gain = change if change >= 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if i <= period:
+            average_gain += gain / period
+            average_loss += loss / period
         else:
-            losses.append(abs(change))
-    average_gain = sum(gains) / period if gains else 0.0
-    average_loss = sum(losses) / period if losses else 0.0
+            average_gain = (average_gain * (period - 1) + gain) / period
+            average_loss = (average_loss * (period - 1) + loss) / period
     if average_loss == 0:
         return 100.0
     rs = average_gain / average_loss
@@ -75,39 +105,210 @@ def _volatility(values: List[float]) -> float:
     return float(statistics.pstdev(returns))
 
 
-def fetch_market_snapshot(symbol: str, timeframe: str = "5m") -> MarketSnapshot:
-    if ccxt is None:
-        raise RuntimeError("ccxt is not installed")
-
-    symbol = _normalize_symbol(symbol)
-
-    exchange = ccxt.binance({"enableRateLimit": True})
-    ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=100)
-    closes = [candle[4] for candle in ohlcv]
+def _compute_indicators_python(closes: Sequence[float], volatility_window: Optional[int] = None) -> Dict[str, float]:
+    closes = list(closes)
     if not closes:
         raise RuntimeError("No market data returned")
-
     ema_fast = _ema(closes, 12)
     ema_slow = _ema(closes, 26)
-    macd_series = [f - s for f, s in zip(ema_fast[-len(ema_slow):], ema_slow)]
-    signal_series = _ema(macd_series, 9) if macd_series else [0.0]
+    macd_series = [f - s for f, s in zip(ema_fast, ema_slow)]
+    signal_series = _ema(macd_series, 9)
+    vol_values = closes if volatility_window is None else closes[-(volatility_window + 1):]
+    return {
+        "last_price": closes[-1],
+        "rsi": _rsi(closes, 14),
+        "macd": macd_series[-1],
+        "signal": signal_series[-1],
+        "volatility": _volatility(vol_values),
+    }
+
+
+def compute_indicators(closes: Sequence[float], volatility_window: Optional[int] = None) -> Dict[str, float]:
+    """Full recompute of the snapshot indicators over `closes`, on NumPy when it is installed."""
+    with INDICATOR_SECONDS.time(mode="full"):
+        if vector_indicators.np is None:
+            return _compute_indicators_python(closes, volatility_window)
+        values = vector_indicators.compute_indicators(closes, volatility_window)
+        return {key: float(value) for key, value in values.items()}
+
+
+def compute_indicators_batch(
+    closes: Any, volatility_window: Optional[int] = None
+) -> List[Dict[str, float]]:
+    """Indicators for many equal-length series at once (rows of a symbols x candles matrix)."""
+    with INDICATOR_SECONDS.time(mode="batch"):
+        if vector_indicators.np is None:
+            return [_compute_indicators_python(row, volatility_window) for row in closes]
+        values = vector_indicators.compute_indicators(closes, volatility_window)
+        rows = len(values["last_price"])
+        return [{key: float(series[i]) for key, series in values.items()} for i in range(rows)]
+
+
+def load_ohlcv(
+    symbol: str,
+    timeframe: str = "5m",
+    limit: int = CANDLE_LIMIT,
+    exchange_id: str = "binance",
+    asset_id: Optional[int] = None,
+) -> List[List[float]]:
+    """Latest `limit` candles for `symbol`, served from the candle cache while the last one is still open.
+
+    With an `asset_id`, cache misses read the candle store first and only fetch (and persist) the missing tail.
+    A warm, connected market stream buffer (see start_market_stream) is used before either.
+    """
+    if is_calendar_timeframe(timeframe):
+        # Month candles vary in length, which the stream, cache and store arithmetic assumes they don't.
+        return get_exchange_client(exchange_id).fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
+
+    stream = get_market_stream()
+    if stream is not None:
+        rows = stream.candles((exchange_id, symbol, timeframe), limit)
+        CACHE_REQUESTS.inc(cache="stream", result="hit" if rows else "miss")
+        if rows:
+            return rows
+
+    client = get_exchange_client(exchange_id)
+
+    def fetch(since: Optional[int], count: int) -> List[List[float]]:
+        return client.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=count)
+
+    if asset_id is not None:
+        fetch = store_backed_fetcher(asset_id, timeframe, fetch)
+    return candle_cache.get_candles((exchange_id, symbol, timeframe), timeframe, limit, fetch)
+
 
-    macd = macd_series[-1] if macd_series else 0.0
-    signal = signal_series[-1] if signal_series else 0.0
+def load_history(
+    asset_id: int,
+    symbol: str,
+    timeframe: str,
+    days: float,
+    exchange_id: str = "binance",
+    max_pages: Optional[int] = None,
+) -> List[List[float]]:
+    """The last `days` of candles from the candle store, backfilling any gaps from the exchange."""
+    end_ms = int(time.time() * 1000)
+    start_ms = end_ms - int(days * 24 * 60 * 60 * 1000)
+    return ensure_history(asset_id, normalize_symbol(symbol), timeframe, start_ms, end_ms, exchange_id, max_pages)
 
-    snapshot = MarketSnapshot(
+
+def _stream_seed_limit(timeframe: str) -> int:
+    """Rows a stream buffer starts with: the base timeframe also serves the resampling plan's longer reads."""
+    if timeframe == _resample_settings["base_timeframe"]:
+        return max(CANDLE_LIMIT, _resample_settings["max_base_candles"])
+    return CANDLE_LIMIT
+
+
+def start_market_stream(app) -> MarketStream:
+    """Stream every stored asset on STREAM_TIMEFRAMES. Buffers are seeded over REST in the background,
+    so a worker boots without waiting for one REST read per asset and timeframe."""
+    exchange_id = "binance"
+
+    def backfill(symbol: str, timeframe: str, since: int, limit: int) -> List[List[float]]:
+        # Runs on the stream's REST threads: straight to the venue, no app context or candle cache.
+        return get_exchange_client(exchange_id).fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+
+    def seed(asset_id: int, symbol: str, timeframe: str, limit: int) -> List[List[float]]:
+        with app.app_context():
+            return load_ohlcv(symbol, timeframe, limit, exchange_id, asset_id=asset_id)
+
+    stream = MarketStream(
+        app.config["STREAM_WS_URL"],
+        buffer_size=app.config.get("STREAM_BUFFER_SIZE", 1000),
+        exchange_id=exchange_id,
+        stale_seconds=app.config.get("STREAM_STALE_SECONDS", 30.0),
+        backfill=backfill,
+        logger=app.logger,
+    )
+    timeframes = [tf.strip() for tf in app.config.get("STREAM_TIMEFRAMES", "5m").split(",") if tf.strip()]
+    with app.app_context():
+        # The stream speaks one venue's protocol; assets listed elsewhere keep using REST.
+        assets = Asset.query.with_entities(Asset.id, Asset.symbol).filter(Asset.exchange == stream.exchange_id).all()
+    subscriptions = [(asset_id, normalize_symbol(symbol), timeframe) for asset_id, symbol in assets for timeframe in timeframes]
+    for _, symbol, timeframe in subscriptions:
+        stream.subscribe(symbol, timeframe)
+    stream.start()
+    set_market_stream(stream)
+    for asset_id, symbol, timeframe in subscriptions:
+        limit = min(_stream_seed_limit(timeframe), stream.buffer_size)
+        stream.seed_async(symbol, timeframe, partial(seed, asset_id, symbol, timeframe, limit))
+    return stream
+
+
+def _snapshot(exchange_id: str, symbol: str, timeframe: str, ohlcv: List[List[float]]) -> MarketSnapshot:
+    with INDICATOR_SECONDS.time(mode="incremental"):
+        values = _engine.update((exchange_id, symbol, timeframe), ohlcv)
+    return MarketSnapshot(
         symbol=symbol,
         timeframe=timeframe,
-        last_price=closes[-1],
-        rsi=_rsi(closes, 14),
-        macd=macd,
-        signal=signal,
-        volatility=_volatility(closes),
+        last_price=values.last_price,
+        rsi=values.rsi,
+        macd=values.macd,
+        signal=values.signal,
+        volatility=values.volatility,
     )
-    return snapshot
 
 
-def _normalize_symbol(symbol: str) -> str:
+def _resample_plan(timeframes: Sequence[str]) -> Dict[str, int]:
+    """Base candles needed per timeframe that can be resampled within the configured base window."""
+    base = _resample_settings["base_timeframe"]
+    if base is None:
+        return {}
+    base_ms = timeframe_to_ms(base)
+    plan = {}
+    for timeframe in timeframes:
+        # The base timeframe itself is read directly; "resampling" it would only fetch an extra bucket.
+        if timeframe != base and can_resample(base, timeframe):
+            # One extra bucket covers the partial leading bucket that resample_ohlcv drops.
+            ratio = timeframe_to_ms(timeframe) // base_ms
+            needed = ratio * (CANDLE_LIMIT + 1)
+            if needed <= _resample_settings["max_base_candles"]:
+                plan[timeframe] = needed
+    return plan
+
+
+@timed(MARKET_SNAPSHOT_SECONDS)
+def fetch_market_snapshots(
+    symbol: str, timeframes: Sequence[str], asset_id: Optional[int] = None, exchange_id: str = "binance"
+) -> Dict[str, MarketSnapshot]:
+    """Snapshots for several timeframes of one symbol on `exchange_id`.
+
+    Timeframes covered by the resampling plan share a single fetch of the base timeframe; any
+    other timeframe, or one the base history is too short for, is fetched on its own. Identical
+    concurrent calls are coalesced into one.
+    """
+    symbol = normalize_symbol(symbol)
+    key = (exchange_id, symbol, tuple(sorted(set(timeframes))), asset_id)
+    snapshots, _ = _snapshot_flight.do(key, _fetch_market_snapshots, symbol, timeframes, asset_id, exchange_id)
+    return snapshots
+
+
+def _fetch_market_snapshots(
+    symbol: str, timeframes: Sequence[str], asset_id: Optional[int], exchange_id: str
+) -> Dict[str, MarketSnapshot]:
+    plan = _resample_plan(timeframes)
+    base = _resample_settings["base_timeframe"]
+    base_rows: List[List[float]] = []
+    if plan:
+        base_rows = load_ohlcv(symbol, base, max(plan.values()), exchange_id, asset_id=asset_id)
+
+    snapshots = {}
+    for timeframe in timeframes:
+        ohlcv: List[List[float]] = []
+        if timeframe in plan:
+            ohlcv = resample_ohlcv(base_rows, base, timeframe)[-CANDLE_LIMIT:]
+        if len(ohlcv) < CANDLE_LIMIT:
+            ohlcv = load_ohlcv(symbol, timeframe, CANDLE_LIMIT, exchange_id, asset_id=asset_id)
+        snapshots[timeframe] = _snapshot(exchange_id, symbol, timeframe, ohlcv)
+    return snapshots
+
+
+def fetch_market_snapshot(
+    symbol: str, timeframe: str = "5m", asset_id: Optional[int] = None, exchange_id: str = "binance"
+) -> MarketSnapshot:
+    return fetch_market_snapshots(symbol, [timeframe], asset_id=asset_id, exchange_id=exchange_id)[timeframe]
+
+
+def normalize_symbol(symbol: str) -> str:
     if "/" in symbol:
         return symbol
     upper = symbol.upper()
@@ -116,23 +317,37 @@ def _normalize_symbol(symbol: str) -> str:
     return upper
 
 
-def generate_auto_signal(snapshot: MarketSnapshot) -> Dict[str, float | str]:
+@dataclass(frozen=True)
+class SignalRules:
+    """Thresholds used by generate_auto_signal; the backtester sweeps over these."""
+
+    rsi_buy: float = 45.0
+    rsi_sell: float = 55.0
+    stop_mult: float = 2.0
+    target_mult: float = 3.0
+    min_volatility: float = 0.005
+
+
+DEFAULT_RULES = SignalRules()
+
+
+def generate_auto_signal(snapshot: MarketSnapshot, rules: SignalRules = DEFAULT_RULES) -> Dict[str, float | str]:
     side = "hold"
-    if snapshot.rsi < 45 and snapshot.macd > snapshot.signal:
+    if snapshot.rsi < rules.rsi_buy and snapshot.macd > snapshot.signal:
         side = "buy"
-    elif snapshot.rsi > 55 and snapshot.macd < snapshot.signal:
+    elif snapshot.rsi > rules.rsi_sell and snapshot.macd < snapshot.signal:
         side = "sell"
 
     confidence = min(1.0, max(0.1, abs(snapshot.rsi - 50) / 50 + abs(snapshot.macd) / 10))
 
     entry_price = snapshot.last_price
-    vol = max(snapshot.volatility, 0.005)
+    vol = max(snapshot.volatility, rules.min_volatility)
     if side == "buy":
-        stop_loss = entry_price * (1 - 2 * vol)
-        take_profit = entry_price * (1 + 3 * vol)
+        stop_loss = entry_price * (1 - rules.stop_mult * vol)
+        take_profit = entry_price * (1 + rules.target_mult * vol)
     elif side == "sell":
-        stop_loss = entry_price * (1 + 2 * vol)
-        take_profit = entry_price * (1 - 3 * vol)
+        stop_loss = entry_price * (1 + rules.stop_mult * vol)
+        take_profit = entry_price * (1 - rules.target_mult * vol)
     else:
         stop_loss = None
         take_profit = None
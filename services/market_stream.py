@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover - streaming is optional; REST polling keeps working
+    websockets = None
+
+from services.timeframes import is_calendar_timeframe, timeframe_to_ms
+
+# Streaming market data. A background thread holds one combined Binance kline WebSocket for every
+# subscribed (symbol, timeframe) and keeps a rolling candle buffer for each. load_ohlcv reads
+# these buffers first, so a warm symbol costs no REST call at all. Buffers are seeded over REST on
+# a small background pool, then kept current by the stream; candles missed while the socket was
+# down are re-fetched over REST before the buffer is read again.
+
+StreamKey = Tuple[str, str, str]  # (exchange, symbol, timeframe), the same key as the candle cache
+Backfill = Callable[[str, str, int, int], List[List[float]]]
+
+_REST_WORKERS = 2
+
+
+class CandleBuffer:
+    """Rolling OHLCV window. The newest row is replaced in place until its candle closes.
+
+    `missing_from` is set when the buffer may no longer match the exchange: candles were skipped
+    (a gap in open times), or the last row before a reconnect may never have received its final
+    update. The buffer answers nothing until `fill` has re-fetched from that open time.
+    """
+
+    def __init__(self, maxlen: int, step_ms: Optional[int] = None):
+        self.step_ms = step_ms
+        self.missing_from: Optional[int] = None
+        self.updated_at = 0.0  # monotonic time of the last seed, fill or stream update
+        self._rows: Deque[List[float]] = deque(maxlen=maxlen)
+        self._suspect = False
+        self._lock = threading.Lock()
+
+    def seed(self, rows: Iterable[List[float]]) -> None:
+        with self._lock:
+            for row in rows:
+                self._apply(row)
+            self.updated_at = time.monotonic()
+
+    def apply(self, row: List[float]) -> None:
+        with self._lock:
+            if self._rows and row[0] > self._rows[-1][0] and self.missing_from is None:
+                last = int(self._rows[-1][0])
+                if self._suspect:
+                    self.missing_from = last
+                elif self.step_ms and row[0] - last > self.step_ms:
+                    self.missing_from = last + self.step_ms
+            self._suspect = False
+            self._apply(row)
+            if self.missing_from is not None and self._rows[0][0] >= self.missing_from:
+                self.missing_from = None  # the gap has rotated out of the window
+            self.updated_at = time.monotonic()
+
+    def mark_suspect(self) -> None:
+        """Called on (re)connect: if the next update is for a newer candle, re-fetch from the last row."""
+        with self._lock:
+            self._suspect = bool(self._rows)
+
+    def fill(self, rows: List[List[float]]) -> None:
+        """Merge REST rows from `missing_from` onward; the stream's own newest row wins over REST."""
+        if not rows:
+            return
+        with self._lock:
+            newest = self._rows[-1][0] if self._rows else None
+            merged = {row[0]: row for row in self._rows}
+            for row in rows:
+                if newest is None or row[0] < newest:
+                    merged[row[0]] = row
+            self._rows = deque(sorted(merged.values(), key=lambda row: row[0]), maxlen=self._rows.maxlen)
+            self.missing_from = self._first_gap()
+            self.updated_at = time.monotonic()
+
+    def _first_gap(self) -> Optional[int]:
+        if not self.step_ms:
+            return None
+        previous = None
+        for row in self._rows:
+            if previous is not None and row[0] - previous > self.step_ms:
+                return int(previous + self.step_ms)
+            previous = row[0]
+        return None
+
+    def _apply(self, row: List[float]) -> None:
+        if self._rows and row[0] == self._rows[-1][0]:
+            self._rows[-1] = row
+        elif not self._rows or row[0] > self._rows[-1][0]:
+            self._rows.append(row)
+
+    def rows(self, limit: int) -> List[List[float]]:
+        with self._lock:
+            if len(self._rows) < limit or self.missing_from is not None:
+                return []
+            return list(self._rows)[-limit:]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+def parse_kline(message: Any) -> Optional[Tuple[str, str, List[float]]]:
+    """(stream symbol, interval, ccxt-style row) from a Binance kline event, raw or combined-stream."""
+    if isinstance(message, (str, bytes)):
+        message = json.loads(message)
+    data = message.get("data", message) if isinstance(message, dict) else None
+    if not isinstance(data, dict) or data.get("e") != "kline":
+        return None
+    kline = data["k"]
+    row = [
+        int(kline["t"]),
+        float(kline["o"]),
+        float(kline["h"]),
+        float(kline["l"]),
+        float(kline["c"]),
+        float(kline["v"]),
+    ]
+    return kline["s"].lower(), kline["i"], row
+
+
+def stream_name(symbol: str, timeframe: str) -> str:
+    return f"{symbol.replace('/', '').lower()}@kline_{timeframe}"
+
+
+class MarketStream:
+    """Owns the WebSocket consumer thread and the per-key candle buffers.
+
+    `backfill(symbol, timeframe, since, limit)` fetches candles over REST; it repairs buffers that
+    missed candles while the socket was down. Without it such buffers stay cold (REST fallback).
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        buffer_size: int = 1000,
+        exchange_id: str = "binance",
+        stale_seconds: float = 30.0,
+        backfill: Optional[Backfill] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.ws_url = ws_url.rstrip("/")
+        self.buffer_size = buffer_size
+        self.exchange_id = exchange_id
+        self.stale_seconds = stale_seconds
+        self.backfill = backfill
+        self.logger = logger or logging.getLogger(__name__)
+        self.connected = threading.Event()
+        self.last_message_at = 0.0
+        self._buffers: Dict[StreamKey, CandleBuffer] = {}
+        self._by_stream: Dict[Tuple[str, str], StreamKey] = {}
+        self._backfilling: Set[StreamKey] = set()
+        self._backfill_pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._resubscribe = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, symbol: str, timeframe: str, seed_rows: Optional[List[List[float]]] = None) -> None:
+        key = (self.exchange_id, symbol, timeframe)
+        with self._lock:
+            if key in self._buffers:
+                return
+            # Month candles vary in length, so their buffers cannot tell a gap from a long month.
+            step = None if is_calendar_timeframe(timeframe) else timeframe_to_ms(timeframe)
+            buffer = CandleBuffer(self.buffer_size, step)
+            self._buffers[key] = buffer
+            self._by_stream[(symbol.replace("/", "").lower(), timeframe)] = key
+        if seed_rows:
+            buffer.seed(seed_rows)
+        self._resubscribe.set()
+
+    def seed_async(self, symbol: str, timeframe: str, load: Callable[[], List[List[float]]]) -> None:
+        """Fill a subscribed buffer from `load()` on the REST pool instead of blocking the caller.
+
+        Rows the stream delivered meanwhile are kept; the buffer stays cold until the seed arrives.
+        """
+        key = (self.exchange_id, symbol, timeframe)
+        self._rest_pool().submit(self._run_seed, key, self._buffers[key], load)
+
+    def _run_seed(self, key: StreamKey, buffer: CandleBuffer, load: Callable[[], List[List[float]]]) -> None:
+        try:
+            buffer.fill(load())
+        except Exception as exc:
+            self.logger.warning("Stream seed failed for %s %s: %s", key[1], key[2], exc)
+
+    def candles(self, key: StreamKey, limit: int) -> List[List[float]]:
+        """The latest `limit` rows for `key`, or [] if not subscribed, not warm or the stream is down."""
+        buffer = self._buffers.get(key)
+        if buffer is None or not self.connected.is_set():
+            return []
+        # Per key: one busy symbol must not keep a silent one looking warm.
+        if time.monotonic() - buffer.updated_at > self.stale_seconds:
+            return []
+        return buffer.rows(limit)
+
+    def handle_message(self, message: Any) -> None:
+        parsed = parse_kline(message)
+        if parsed is None:
+            return
+        self.last_message_at = time.monotonic()
+        stream_symbol, interval, row = parsed
+        key = self._by_stream.get((stream_symbol, interval))
+        if key is None:
+            return
+        buffer = self._buffers[key]
+        buffer.apply(row)
+        if buffer.missing_from is not None and self.backfill is not None:
+            self._start_backfill(key, buffer)
+
+    def _rest_pool(self) -> ThreadPoolExecutor:
+        # Seeds and backfills share a small pool: the exchange client rate-limits them anyway.
+        with self._lock:
+            if self._backfill_pool is None:
+                self._backfill_pool = ThreadPoolExecutor(max_workers=_REST_WORKERS, thread_name_prefix="stream-rest")
+            return self._backfill_pool
+
+    def _start_backfill(self, key: StreamKey, buffer: CandleBuffer) -> None:
+        with self._lock:
+            if key in self._backfilling:
+                return
+            self._backfilling.add(key)
+        self._rest_pool().submit(self._run_backfill, key, buffer)
+
+    def _run_backfill(self, key: StreamKey, buffer: CandleBuffer) -> None:
+        # REST calls stay off the socket thread; a failed backfill is retried on the key's next message.
+        since = buffer.missing_from
+        try:
+            if since is not None:
+                buffer.fill(self.backfill(key[1], key[2], since, self.buffer_size))
+        except Exception as exc:
+            self.logger.warning("Stream backfill failed for %s %s since %s: %s", key[1], key[2], since, exc)
+        finally:
+            with self._lock:
+                self._backfilling.discard(key)
+
+    def _url(self) -> str:
+        with self._lock:
+            keys = list(self._buffers)
+        streams = "/".join(sorted(stream_name(key[1], key[2]) for key in keys))
+        return f"{self.ws_url}/stream?streams={streams}"
+
+    async def _consume(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            if not self._buffers:
+                await asyncio.sleep(0.5)
+                continue
+            self._resubscribe.clear()
+            try:
+                async with websockets.connect(self._url(), ping_interval=20, close_timeout=2) as socket:
+                    # Candles may have closed since the seed or the last connection.
+                    for buffer in list(self._buffers.values()):
+                        buffer.mark_suspect()
+                    self.connected.set()
+                    self.last_message_at = time.monotonic()
+                    backoff = 1.0
+                    while not self._stop.is_set() and not self._resubscribe.is_set():
+                        try:
+                            message = await asyncio.wait_for(socket.recv(), timeout=1.0)
+                        except asyncio.TimeoutError:
+                            continue
+                        self.handle_message(message)
+            except Exception:
+                # Reconnect with capped, jittered backoff; readers fall back to REST meanwhile.
+                self.connected.clear()
+                await asyncio.sleep(backoff + random.uniform(0, backoff / 2))
+                backoff = min(backoff * 2, 30.0)
+                continue
+            if not self._resubscribe.is_set():
+                self.connected.clear()
+
+    def start(self) -> None:
+        if websockets is None:
+            raise RuntimeError("websockets is not installed")
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self._consume()), name="market-stream", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._backfill_pool is not None:
+            self._backfill_pool.shutdown(wait=False)
+        self.connected.clear()
+
+
+_stream: Optional[MarketStream] = None
+
+
+def get_market_stream() -> Optional[MarketStream]:
+    return _stream
+
+
+def set_market_stream(stream: Optional[MarketStream]) -> None:
+    global _stream
+    _stream = stream
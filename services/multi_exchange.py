@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+import statistics
+import threading
+import time
+
+from metrics import AGGREGATE_VENUE_RESULTS
+from services.exchange_client import get_exchange_client
+from services.market_service import CANDLE_LIMIT, load_ohlcv, normalize_symbol
+
+
+# One symbol across several venues at once. Every venue is queried on a shared pool and the
+# response waits at most `timeout_seconds` in total: venues that have not answered by then are
+# reported as timed out and left out of the consolidated numbers. Their calls keep running in the
+# background (bounded by the ccxt client timeout) and still warm the candle cache for next time.
+
+_settings: Dict[str, Any] = {"max_workers": 16, "timeout_seconds": 3.0}
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def configure_aggregation(max_workers: int = 16, timeout_seconds: float = 3.0) -> None:
+    """Set the pool size and default per-venue timeout. A pool created before this call is replaced."""
+    global _executor
+    with _executor_lock:
+        _settings.update(max_workers=max(1, max_workers), timeout_seconds=timeout_seconds)
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_settings["max_workers"], thread_name_prefix="venue")
+        return _executor
+
+
+@dataclass
+class VenueQuote:
+    exchange: str
+    status: str  # "ok", "timeout" or "error"
+    last_price: Optional[float] = None
+    bid: Optional[float] = None
+    ask: Optional[float] = None
+    spread: Optional[float] = None
+    spread_bps: Optional[float] = None
+    close: Optional[float] = None  # last closed candle
+    volume: Optional[float] = None
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class AggregateSnapshot:
+    symbol: str
+    timeframe: str
+    price: Optional[float]  # median last price across venues
+    vwap_close: Optional[float]  # last closed candle's close, weighted by each venue's volume
+    best_bid: Optional[float] = None
+    best_bid_exchange: Optional[str] = None
+    best_ask: Optional[float] = None
+    best_ask_exchange: Optional[str] = None
+    venues: List[VenueQuote] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _as_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _quote(exchange_id: str, symbol: str, timeframe: str) -> VenueQuote:
+    started = time.perf_counter()
+    ticker = get_exchange_client(exchange_id).fetch_ticker(symbol)
+    # The same cache entry fetch_market_snapshot uses, so a venue's candles are fetched once for both.
+    rows = load_ohlcv(symbol, timeframe, CANDLE_LIMIT, exchange_id)
+    closed = rows[-2] if len(rows) > 1 else (rows[-1] if rows else None)
+
+    bid, ask = _as_float(ticker.get("bid")), _as_float(ticker.get("ask"))
+    last = _as_float(ticker.get("last"))
+    if last is None and rows:
+        last = float(rows[-1][4])
+    quote = VenueQuote(exchange=exchange_id, status="ok", last_price=last, bid=bid, ask=ask)
+    if bid and ask:
+        quote.spread = ask - bid
+        quote.spread_bps = quote.spread / ((ask + bid) / 2) * 10_000
+    if closed is not None:
+        quote.close, quote.volume = float(closed[4]), float(closed[5])
+    quote.latency_ms = (time.perf_counter() - started) * 1000
+    return quote
+
+
+def _consolidate(symbol: str, timeframe: str, quotes: List[VenueQuote]) -> AggregateSnapshot:
+    ok = [quote for quote in quotes if quote.status == "ok"]
+    prices = [quote.last_price for quote in ok if quote.last_price is not None]
+    weighted = [(quote.close, quote.volume) for quote in ok if quote.close is not None and quote.volume]
+    total_volume = sum(volume for _, volume in weighted)
+
+    snapshot = AggregateSnapshot(
+        symbol=symbol,
+        timeframe=timeframe,
+        price=statistics.median(prices) if prices else None,
+        vwap_close=sum(close * volume for close, volume in weighted) / total_volume if total_volume else None,
+        venues=quotes,
+    )
+    bids = [quote for quote in ok if quote.bid]
+    asks = [quote for quote in ok if quote.ask]
+    if bids:
+        best = max(bids, key=lambda quote: quote.bid)
+        snapshot.best_bid, snapshot.best_bid_exchange = best.bid, best.exchange
+    if asks:
+        best = min(asks, key=lambda quote: quote.ask)
+        snapshot.best_ask, snapshot.best_ask_exchange = best.ask, best.exchange
+    return snapshot
+
+
+def fetch_aggregate_snapshot(
+    symbol: str,
+    exchange_ids: Sequence[str],
+    timeframe: str = "5m",
+    timeout_seconds: Optional[float] = None,
+) -> AggregateSnapshot:
+    """Quote `symbol` on every venue in parallel and consolidate whatever answers within the timeout."""
+    symbol = normalize_symbol(symbol)
+    exchange_ids = list(dict.fromkeys(exchange_id.lower() for exchange_id in exchange_ids))
+    timeout = timeout_seconds if timeout_seconds is not None else _settings["timeout_seconds"]
+
+    executor = _get_executor()
+    futures: Dict[str, Future] = {
+        exchange_id: executor.submit(_quote, exchange_id, symbol, timeframe) for exchange_id in exchange_ids
+    }
+    wait(futures.values(), timeout=timeout)
+
+    quotes = []
+    for exchange_id, future in futures.items():
+        if not future.done():
+            future.cancel()
+            quote = VenueQuote(exchange=exchange_id, status="timeout", error=f"no answer within {timeout:g}s")
+        elif future.exception() is not None:
+            quote = VenueQuote(exchange=exchange_id, status="error", error=str(future.exception()))
+        else:
+            quote = future.result()
+        AGGREGATE_VENUE_RESULTS.inc(exchange=exchange_id, status=quote.status)
+        quotes.append(quote)
+    return _consolidate(symbol, timeframe, quotes)
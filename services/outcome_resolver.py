@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Dict, List, Sequence
+import time
+
+from sqlalchemy import bindparam, select, update
+
+from database import db, Asset, Signal
+from services.backtest import OUTCOME_EXPIRED, OUTCOME_STOP, OUTCOME_TARGET, resolve_exits
+from services.candle_store import ensure_history
+from services.market_service import normalize_symbol
+from services.timeframes import candle_open_ms, timeframe_to_ms
+from services.vector_indicators import np
+
+
+# Marks open buy/sell signals as hit (target or stop) or expired, using the candle store. Open
+# signals are grouped by (asset, timeframe); each group loads one candle range covering all of its
+# signals and resolves them together with backtest.resolve_exits, the kernel the backtester uses.
+# A signal enters at its own candle and is checked against the closed candles after it, for at
+# most `horizon` bars; one still inside its horizon stays open until the next run.
+
+OUTCOME_NAMES = {OUTCOME_TARGET: "target", OUTCOME_STOP: "stop", OUTCOME_EXPIRED: "expired"}
+
+# Editing any of these on a resolved signal puts it back in the open set.
+OUTCOME_INPUTS = ("side", "timeframe", "entry_price", "stop_loss", "take_profit")
+
+
+@dataclass
+class ResolveReport:
+    open_signals: int = 0
+    groups: int = 0
+    resolved: int = 0
+    outcomes: Dict[str, int] = field(default_factory=lambda: {name: 0 for name in OUTCOME_NAMES.values()})
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def clear_outcome(signal: Signal) -> None:
+    signal.outcome = None
+    signal.exit_price = None
+    signal.realized_return = None
+    signal.time_to_hit = None
+    signal.resolved_at = None
+
+
+def _open_signals() -> List[Any]:
+    query = (
+        select(
+            Signal.id,
+            Signal.asset_id,
+            Asset.symbol,
+            Asset.exchange,
+            Signal.timeframe,
+            Signal.side,
+            Signal.entry_price,
+            Signal.stop_loss,
+            Signal.take_profit,
+            Signal.created_at,
+        )
+        .join(Asset, Asset.id == Signal.asset_id)
+        .where(
+            Signal.outcome.is_(None),
+            Signal.side.in_(("buy", "sell")),
+            Signal.entry_price > 0,
+            Signal.stop_loss.is_not(None),
+            Signal.take_profit.is_not(None),
+            Signal.created_at.is_not(None),
+        )
+        .order_by(Signal.asset_id, Signal.timeframe, Signal.id)
+    )
+    return db.session.execute(query).all()
+
+
+def resolve_group(
+    signals: Sequence[Any], ohlcv: Sequence[Sequence[float]], step_ms: int, horizon: int
+) -> List[Dict[str, Any]]:
+    """Update parameters for the signals of one (asset, timeframe) that `ohlcv` (closed candles) resolves."""
+    if not signals or not len(ohlcv):
+        return []
+    candles = np.asarray(ohlcv, dtype=np.float64)
+    open_times = candles[:, 0].astype(np.int64)
+    created_ms = np.array([row.created_at for row in signals], dtype="datetime64[ms]").astype(np.int64)
+    entry_index = np.searchsorted(open_times, created_ms, side="right") - 1
+    side = np.array([1 if row.side == "buy" else -1 for row in signals], dtype=np.int8)
+    entry = np.array([row.entry_price for row in signals], dtype=np.float64)
+    stop = np.array([row.stop_loss for row in signals], dtype=np.float64)
+    target = np.array([row.take_profit for row in signals], dtype=np.float64)
+
+    # Signals older than the first stored candle cannot be placed; leave them open.
+    placed = entry_index >= 0
+    outcome, exit_index, exit_price = resolve_exits(
+        candles[:, 2], candles[:, 3], candles[:, 4], np.maximum(entry_index, 0), side, stop, target, horizon
+    )
+    last = len(candles) - 1
+    resolved = placed & ((outcome != OUTCOME_EXPIRED) | (entry_index + horizon <= last))
+
+    exit_close_ms = open_times[exit_index] + step_ms
+    time_to_hit = (exit_close_ms - created_ms) // 1000
+    realized_return = side * (exit_price - entry) / entry
+    resolved_at = datetime.utcnow()
+    return [
+        {
+            "b_id": signals[i].id,
+            "outcome": OUTCOME_NAMES[int(outcome[i])],
+            "exit_price": float(exit_price[i]),
+            "realized_return": float(realized_return[i]),
+            "time_to_hit": int(time_to_hit[i]),
+            "resolved_at": resolved_at,
+        }
+        for i in np.flatnonzero(resolved)
+    ]
+
+
+def _store(updates: List[Dict[str, Any]]) -> None:
+    if not updates:
+        return
+    table = Signal.__table__
+    # Only rows still open: a concurrent run or an edit may have touched them since they were read.
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"), table.c.outcome.is_(None))
+        .values(
+            outcome=bindparam("outcome"),
+            exit_price=bindparam("exit_price"),
+            realized_return=bindparam("realized_return"),
+            time_to_hit=bindparam("time_to_hit"),
+            resolved_at=bindparam("resolved_at"),
+        )
+    )
+    db.session.execute(stmt, updates)
+    db.session.commit()
+
+
+def resolve_open_signals(horizon: int = 288) -> ResolveReport:
+    """Resolve every open signal that its stored candles settle, in one executemany UPDATE. Commits."""
+    if np is None:
+        raise RuntimeError("numpy is required to resolve signal outcomes")
+    report = ResolveReport()
+    rows = _open_signals()
+    report.open_signals = len(rows)
+    now_ms = int(time.time() * 1000)
+
+    resolved: List[Dict[str, Any]] = []
+    for (asset_id, timeframe), group in groupby(rows, key=lambda row: (row.asset_id, row.timeframe)):
+        group = list(group)
+        report.groups += 1
+        try:
+            step = timeframe_to_ms(timeframe)
+            last_closed = candle_open_ms(now_ms, timeframe) - step
+            start = min(row.created_at for row in group)
+            end = max(row.created_at for row in group)
+            start_ms = int(np.datetime64(start, "ms").astype(np.int64))
+            end_ms = min(last_closed, int(np.datetime64(end, "ms").astype(np.int64)) + horizon * step)
+            if end_ms < candle_open_ms(start_ms, timeframe):
+                continue  # nothing has closed since these signals were created
+            ohlcv = ensure_history(
+                asset_id, normalize_symbol(group[0].symbol), timeframe, start_ms, end_ms, group[0].exchange
+            )
+            resolved.extend(resolve_group(group, ohlcv, step, horizon))
+        except Exception as exc:
+            db.session.rollback()
+            report.errors.append({"asset_id": asset_id, "timeframe": timeframe, "error": str(exc)})
+
+    _store(resolved)
+    report.resolved = len(resolved)
+    for entry in resolved:
+        report.outcomes[entry["outcome"]] += 1
+    return report
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import List, Sequence
+
+from services.timeframes import is_calendar_timeframe, timeframe_to_ms
+from services.vector_indicators import np
+
+
+# Builds higher-timeframe candles from a base series (e.g. 15m and 1h from 5m), so one exchange
+# fetch per symbol can serve every timeframe. Buckets are aligned to the epoch, which matches the
+# exchange for minute, hour and day candles; weekly candles open on Monday there and monthly ones
+# on the first of the month, so neither is resampled.
+
+
+def can_resample(base_timeframe: str, timeframe: str) -> bool:
+    """True when `timeframe` is a whole multiple of `base_timeframe` with epoch-aligned buckets."""
+    if timeframe.endswith("w") or base_timeframe.endswith("w"):
+        return False
+    if is_calendar_timeframe(timeframe) or is_calendar_timeframe(base_timeframe):
+        return False
+    base_ms = timeframe_to_ms(base_timeframe)
+    target_ms = timeframe_to_ms(timeframe)
+    return target_ms >= base_ms and target_ms % base_ms == 0
+
+
+def resample_ohlcv(rows: Sequence[Sequence[float]], base_timeframe: str, timeframe: str) -> List[List[float]]:
+    """Aggregate ascending ccxt rows into `timeframe` candles (first open, max high, min low, last close, summed volume).
+
+    A leading bucket that starts before the first base row is dropped, since its open is unknown.
+    The trailing bucket is kept even if incomplete: it is the still-forming candle, as on the exchange.
+    """
+    if not can_resample(base_timeframe, timeframe):
+        raise ValueError(f"Cannot resample {base_timeframe} candles into {timeframe}")
+    if not rows:
+        return []
+    step = timeframe_to_ms(timeframe)
+    if np is None:
+        return _resample_python(rows, step)
+
+    data = np.asarray(rows, dtype=np.float64)
+    open_times = data[:, 0].astype(np.int64)
+    buckets = open_times - open_times % step
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(data)])) - 1
+
+    columns = zip(
+        buckets[starts].tolist(),
+        data[starts, 1].tolist(),
+        np.maximum.reduceat(data[:, 2], starts).tolist(),
+        np.minimum.reduceat(data[:, 3], starts).tolist(),
+        data[ends, 4].tolist(),
+        np.add.reduceat(data[:, 5], starts).tolist(),
+    )
+    candles = [list(candle) for candle in columns]
+    if open_times[0] != buckets[0]:
+        candles = candles[1:]
+    return candles
+
+
+def _resample_python(rows: Sequence[Sequence[float]], step: int) -> List[List[float]]:
+    candles: List[List[float]] = []
+    for row in rows:
+        open_time = int(row[0])
+        bucket = open_time - open_time % step
+        if candles and candles[-1][0] == bucket:
+            candle = candles[-1]
+            candle[2] = max(candle[2], float(row[2]))
+            candle[3] = min(candle[3], float(row[3]))
+            candle[4] = float(row[4])
+            candle[5] += float(row[5] or 0.0)
+        else:
+            candles.append([bucket, float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5] or 0.0)])
+    if rows and int(rows[0][0]) != candles[0][0]:
+        candles = candles[1:]
+    return candles
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+import os
+import random
+import threading
+import time
+
+from database import db, Asset
+from services.outcome_resolver import resolve_open_signals
+from services.signal_scanner import scan_assets
+from services.timeframes import candle_open_ms, next_boundary_ms
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows; every process acts as leader
+    fcntl = None
+
+
+class LeaderLock:
+    """Non-blocking exclusive flock; the process holding it is the only one that runs scans."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._handle = None
+
+    def try_acquire(self) -> bool:
+        if self._handle is not None:
+            return True
+        if fcntl is None or not self.path:
+            self._handle = True
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        handle = open(self.path, "a+")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(os.getpid()))
+        handle.flush()
+        self._handle = handle
+        return True
+
+    def release(self) -> None:
+        if self._handle not in (None, True):
+            fcntl.flock(self._handle, fcntl.LOCK_UN)
+            self._handle.close()
+        self._handle = None
+
+
+class SignalScheduler:
+    """Wakes shortly after each candle boundary and precomputes signals for every asset.
+
+    Several gunicorn workers may start a scheduler; only the one holding the leader lock scans,
+    the others keep retrying the lock each cycle so one of them takes over if the leader exits.
+    """
+
+    def __init__(
+        self,
+        app,
+        timeframes: Sequence[str],
+        max_workers: int = 8,
+        jitter_seconds: float = 5.0,
+        lock_path: Optional[str] = None,
+        outcome_horizon: Optional[int] = 288,
+    ):
+        self.app = app
+        # Shortest candle first; months have no fixed length, so measure the candle containing the epoch.
+        self.timeframes = sorted(set(timeframes), key=lambda tf: next_boundary_ms(0, tf) - candle_open_ms(0, tf))
+        self.max_workers = max_workers
+        self.jitter_seconds = max(jitter_seconds, 0.0)
+        self.lock = LeaderLock(lock_path)
+        self.outcome_horizon = outcome_horizon
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def due_timeframes(self, boundary_ms: int) -> List[str]:
+        return [tf for tf in self.timeframes if candle_open_ms(boundary_ms, tf) == boundary_ms]
+
+    def run_cycle(self, timeframes: Sequence[str]) -> int:
+        """Scan every asset on `timeframes`; returns the number of signals stored."""
+        with self.app.app_context():
+            assets = db.session.query(Asset.id, Asset.symbol, Asset.exchange).order_by(Asset.id).all()
+            result = scan_assets(self.app, assets, timeframes, max_workers=self.max_workers)
+            self.app.logger.info(
+                "Scheduled scan %s: %d signals, %d errors",
+                ",".join(timeframes),
+                len(result.signals),
+                len(result.errors),
+            )
+            return len(result.signals)
+
+    def resolve_outcomes(self) -> int:
+        """Settle open signals against the candles that closed since the last cycle; returns the count."""
+        with self.app.app_context():
+            report = resolve_open_signals(self.outcome_horizon)
+            self.app.logger.info(
+                "Resolved %d of %d open signals in %d groups, %d errors",
+                report.resolved,
+                report.open_signals,
+                report.groups,
+                len(report.errors),
+            )
+            return report.resolved
+
+    def run_forever(self) -> None:
+        if not self.timeframes:
+            return
+        while not self._stop.is_set():
+            now_ms = int(time.time() * 1000)
+            boundary = min(next_boundary_ms(now_ms, tf) for tf in self.timeframes)
+            # Jitter spreads load on the exchange and gives it a moment to publish the closed candle.
+            delay = (boundary - now_ms) / 1000 + random.uniform(min(1.0, self.jitter_seconds), self.jitter_seconds)
+            if self._stop.wait(delay):
+                break
+            if not self.lock.try_acquire():
+                continue
+            try:
+                self.run_cycle(self.due_timeframes(boundary))
+            except Exception:
+                self.app.logger.exception("Scheduled scan failed")
+            if self.outcome_horizon:
+                try:
+                    self.resolve_outcomes()
+                except Exception:
+                    self.app.logger.exception("Outcome resolution failed")
+        self.lock.release()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run_forever, name="signal-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def build_scheduler(app) -> SignalScheduler:
+    timeframes = [tf.strip() for tf in app.config.get("SCHEDULER_TIMEFRAMES", "5m").split(",") if tf.strip()]
+    lock_path = app.config.get("SCHEDULER_LOCK_FILE")
+    outcome_horizon = app.config.get("OUTCOME_HORIZON_BARS", 288) if app.config.get("OUTCOME_RESOLVE_ENABLED", True) else None
+    return SignalScheduler(
+        app,
+        timeframes,
+        max_workers=app.config.get("SCHEDULER_MAX_WORKERS", 8),
+        jitter_seconds=app.config.get("SCHEDULER_JITTER_SECONDS", 5.0),
+        lock_path=os.path.abspath(lock_path) if lock_path else None,
+        outcome_horizon=outcome_horizon,
+    )
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, bindparam, delete, event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from database import db, Asset, Signal, SignalRollup
+
+
+# Signal counts and confidence sums per (asset, day, timeframe, side), kept in step with the signals
+# table so analytics read a few rollup rows instead of scanning signals. ORM writes are picked up
+# by a flush hook and applied in the same transaction; Core bulk inserts call record_signals.
+
+RollupKey = Tuple[int, date, str, str]
+
+GROUP_COLUMNS = {
+    "asset": SignalRollup.asset_id,
+    "day": SignalRollup.day,
+    "timeframe": SignalRollup.timeframe,
+    "side": SignalRollup.side,
+}
+
+_TRACKED = ("asset_id", "created_at", "timeframe", "side", "confidence")
+_hooks_installed = False
+
+
+def _add(deltas: Dict[RollupKey, List[float]], values: Dict[str, Any], sign: int) -> None:
+    created_at = values.get("created_at") or datetime.utcnow()
+    key = (values["asset_id"], created_at.date(), values.get("timeframe") or "5m", values["side"])
+    delta = deltas.setdefault(key, [0, 0.0])
+    delta[0] += sign
+    delta[1] += sign * (values.get("confidence") or 0.0)
+
+
+def _key_matches(table):
+    return and_(*(table.c[name] == bindparam("b_" + name) for name in ("asset_id", "day", "timeframe", "side")))
+
+
+def _apply(connection, deltas: Dict[RollupKey, List[float]]) -> None:
+    rows = [
+        {"asset_id": key[0], "day": key[1], "timeframe": key[2], "side": key[3], "signal_count": count, "confidence_sum": total}
+        for key, (count, total) in deltas.items()
+        if count or total
+    ]
+    if not rows:
+        return
+
+    table = SignalRollup.__table__
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.asset_id, table.c.day, table.c.timeframe, table.c.side],
+                set_={
+                    "signal_count": table.c.signal_count + stmt.excluded.signal_count,
+                    "confidence_sum": table.c.confidence_sum + stmt.excluded.confidence_sum,
+                },
+            ),
+            rows,
+        )
+    else:
+        increment = (
+            update(table)
+            .where(_key_matches(table))
+            .values(
+                signal_count=table.c.signal_count + bindparam("add_count"),
+                confidence_sum=table.c.confidence_sum + bindparam("add_sum"),
+            )
+        )
+        for row in rows:
+            params = {"b_" + name: row[name] for name in ("asset_id", "day", "timeframe", "side")}
+            result = connection.execute(increment, {**params, "add_count": row["signal_count"], "add_sum": row["confidence_sum"]})
+            if result.rowcount == 0:
+                connection.execute(insert(table), row)
+
+    removed = [row for row in rows if row["signal_count"] < 0]
+    if removed:
+        connection.execute(
+            delete(table).where(_key_matches(table), table.c.signal_count <= 0),
+            [{"b_" + name: row[name] for name in ("asset_id", "day", "timeframe", "side")} for row in removed],
+        )
+
+
+def record_signals(rows: Iterable[Dict[str, Any]]) -> None:
+    """Count signals inserted with Core (which the flush hook cannot see) in the session's transaction."""
+    deltas: Dict[RollupKey, List[float]] = {}
+    for row in rows:
+        _add(deltas, row, 1)
+    _apply(db.session.connection(), deltas)
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    deltas: Dict[RollupKey, List[float]] = {}
+    for obj in session.new:
+        if isinstance(obj, Signal):
+            _add(deltas, {name: getattr(obj, name) for name in _TRACKED}, 1)
+    for obj in session.deleted:
+        if isinstance(obj, Signal):
+            _add(deltas, {name: getattr(obj, name) for name in _TRACKED}, -1)
+    for obj in session.dirty:
+        if not isinstance(obj, Signal):
+            continue
+        attrs = inspect(obj).attrs
+        histories = {name: attrs[name].history for name in _TRACKED}
+        if not any(history.has_changes() for history in histories.values()):
+            continue
+        old, new = {}, {}
+        for name, history in histories.items():
+            current = getattr(obj, name)
+            new[name] = current
+            old[name] = history.deleted[0] if history.deleted else current
+        _add(deltas, old, -1)
+        _add(deltas, new, 1)
+    if deltas:
+        _apply(session.connection(), deltas)
+
+
+def _passthrough(target, value, oldvalue, initiator):
+    return value
+
+
+def install_rollup_hooks() -> None:
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    event.listen(Session, "after_flush", _after_flush)
+    # active_history loads the old value on assignment, even on an expired instance (e.g. just after a
+    # commit); without it the history of such an update has no deleted value to subtract.
+    for name in _TRACKED:
+        event.listen(getattr(Signal, name), "set", _passthrough, active_history=True, retval=True)
+    _hooks_installed = True
+
+
+def rebuild_rollups() -> int:
+    """Recompute every rollup row from the signals table; returns the number of rows. Commits."""
+    table = SignalRollup.__table__
+    day = func.date(Signal.created_at)
+    source = select(
+        Signal.asset_id,
+        day,
+        Signal.timeframe,
+        Signal.side,
+        func.count(Signal.id),
+        func.coalesce(func.sum(Signal.confidence), 0.0),
+    ).group_by(Signal.asset_id, day, Signal.timeframe, Signal.side)
+    db.session.execute(delete(table))
+    db.session.execute(
+        insert(table).from_select(
+            ["asset_id", "day", "timeframe", "side", "signal_count", "confidence_sum"], source
+        )
+    )
+    db.session.commit()
+    return db.session.execute(select(func.count()).select_from(table)).scalar()
+
+
+def signal_analytics(
+    group_by: Sequence[str],
+    asset_id: Optional[int] = None,
+    side: Optional[str] = None,
+    timeframe: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+) -> Dict[str, Any]:
+    """Signal counts and average confidence per bucket of `group_by` (names from GROUP_COLUMNS)."""
+    columns = [GROUP_COLUMNS[name].label(name) for name in group_by]
+    count = func.sum(SignalRollup.signal_count)
+    total = func.sum(SignalRollup.confidence_sum)
+    query = select(*columns, count.label("count"), total.label("confidence_sum"))
+    if "asset" in group_by:
+        query = query.add_columns(Asset.symbol).join(Asset, Asset.id == SignalRollup.asset_id).group_by(Asset.symbol)
+    if asset_id is not None:
+        query = query.where(SignalRollup.asset_id == asset_id)
+    if side is not None:
+        query = query.where(SignalRollup.side == side)
+    if timeframe is not None:
+        query = query.where(SignalRollup.timeframe == timeframe)
+    if since is not None:
+        query = query.where(SignalRollup.day >= since)
+    if until is not None:
+        query = query.where(SignalRollup.day <= until)
+    if columns:
+        query = query.group_by(*(GROUP_COLUMNS[name] for name in group_by)).order_by(*columns)
+
+    buckets = []
+    signals, confidence = 0, 0.0
+    for row in db.session.execute(query).mappings():
+        if not row["count"]:
+            continue
+        bucket = {("asset_id" if name == "asset" else name): row[name] for name in group_by}
+        if "day" in bucket and isinstance(bucket["day"], date):
+            bucket["day"] = bucket["day"].isoformat()
+        if "asset" in group_by:
+            bucket["symbol"] = row["symbol"]
+        bucket["count"] = int(row["count"])
+        bucket["avg_confidence"] = row["confidence_sum"] / row["count"]
+        buckets.append(bucket)
+        signals += bucket["count"]
+        confidence += row["confidence_sum"]
+    return {
+        "group_by": list(group_by),
+        "buckets": buckets,
+        "total": {"count": signals, "avg_confidence": confidence / signals if signals else None},
+    }
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from database import db, Signal
+from services.candle_store import deferred_candle_writes, upsert_candles
+from services.market_service import MarketSnapshot, fetch_market_snapshots, generate_auto_signal
+
+
+# Fan-out version of POST /api/signals/auto: fetch every asset (all its timeframes at once) on a
+# thread pool, then store the fetched candles and all resulting signals in a single transaction.
+
+
+@dataclass
+class ScanResult:
+    signals: List[Tuple[Signal, MarketSnapshot]] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def _snapshot_task(app, asset_id: int, symbol: str, exchange_id: str, timeframes: Sequence[str]):
+    # Worker threads get their own app context, and with it their own database session. They only
+    # read from it: fetched candles are handed back and written by the caller, not committed here.
+    with app.app_context(), deferred_candle_writes() as writes:
+        try:
+            snapshots = fetch_market_snapshots(symbol, timeframes, asset_id=asset_id, exchange_id=exchange_id)
+            return asset_id, snapshots, None, writes
+        except Exception as exc:  # one bad symbol must not sink the whole scan
+            app.logger.warning("Scan failed for asset %s %s: %s", asset_id, ",".join(timeframes), exc)
+            return asset_id, {}, str(exc), writes
+
+
+def scan_assets(
+    app,
+    assets: Iterable[Tuple[int, str, str]],
+    timeframes: Sequence[str],
+    max_workers: int = 16,
+) -> ScanResult:
+    """Generate and store auto signals for every (asset_id, symbol, exchange) x timeframe pair.
+
+    Must be called inside an app context; candles and signals are committed with one commit on its session.
+    """
+    tasks = list(assets)
+    result = ScanResult()
+    if not tasks or not timeframes:
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as pool:
+        outcomes = list(pool.map(lambda task: _snapshot_task(app, *task, timeframes), tasks))
+
+    pairs = []
+    candle_writes = []
+    for asset_id, snapshots, error, writes in outcomes:
+        candle_writes.extend(writes)
+        if error is not None:
+            result.errors.extend(
+                {"asset_id": asset_id, "timeframe": timeframe, "error": error} for timeframe in timeframes
+            )
+            continue
+        pairs.extend((asset_id, snapshots[timeframe]) for timeframe in timeframes)
+
+    for asset_id, snapshot in pairs:
+        auto_fields = generate_auto_signal(snapshot)
+        signal = Signal(
+            asset_id=asset_id,
+            side=auto_fields["side"],
+            timeframe=auto_fields["timeframe"],
+            confidence=auto_fields["confidence"],
+            entry_price=auto_fields["entry_price"],
+            stop_loss=auto_fields["stop_loss"],
+            take_profit=auto_fields["take_profit"],
+        )
+        result.signals.append((signal, snapshot))
+
+    for asset_id, timeframe, rows in candle_writes:
+        upsert_candles(asset_id, timeframe, rows, commit=False)
+    db.session.add_all([signal for signal, _ in result.signals])
+    if candle_writes or result.signals:
+        db.session.commit()
+    return result
+
+
+def parse_timeframes(payload: Dict[str, Any], default: str = "5m") -> Optional[List[str]]:
+    """Read `timeframes` (list) or `timeframe` (string) from a request payload; None if malformed."""
+    timeframes = payload.get("timeframes")
+    if timeframes is None:
+        return [payload.get("timeframe", default)]
+    if not isinstance(timeframes, list) or not timeframes or not all(isinstance(t, str) for t in timeframes):
+        return None
+    return list(dict.fromkeys(timeframes))
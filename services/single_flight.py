@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+import hashlib
+import os
+import threading
+import time
+
+from metrics import SINGLE_FLIGHT_CALLS
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+# Request coalescing. Concurrent calls with the same key share one execution: the first caller
+# runs it and every caller that arrives while it is in flight waits for, and returns, its result.
+#
+# With a lock directory configured, the leader also takes a file lock for the key, so leaders in
+# other gunicorn workers queue behind it. The wrapped functions re-check their shared cache once
+# they hold the lock (the candle store's forming candle, the ai_insight_cache table), so the queued
+# workers find the result there instead of calling the exchange or the model again.
+#
+# Nobody waits forever: followers and queued leaders give up after `lock_wait_seconds` and run the
+# call themselves.
+
+_settings: Dict[str, Any] = {"lock_dir": None, "lock_wait_seconds": 30.0}
+
+LOCK_STRIPES = 256  # lock files per flight name; unrelated keys sharing a stripe only wait for each other
+
+
+def configure_single_flight(lock_dir: Optional[str] = None, lock_wait_seconds: float = 30.0) -> None:
+    """Enable the cross-worker file lock in `lock_dir` (None keeps coalescing per process)."""
+    if lock_dir:
+        os.makedirs(lock_dir, exist_ok=True)
+    _settings.update(lock_dir=lock_dir or None, lock_wait_seconds=lock_wait_seconds)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+        """Run `func(*args, **kwargs)` once per in-flight `key`. Returns (result, shared with another caller)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            if call.done.wait(_settings["lock_wait_seconds"]):
+                SINGLE_FLIGHT_CALLS.inc(name=self.name, role="follower")
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            # The leader is stuck (e.g. a hung exchange call); do not stall this request behind it.
+            SINGLE_FLIGHT_CALLS.inc(name=self.name, role="timeout")
+            return func(*args, **kwargs), False
+
+        SINGLE_FLIGHT_CALLS.inc(name=self.name, role="leader")
+        try:
+            with _file_lock(self.name, key):
+                call.result = func(*args, **kwargs)
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+@contextmanager
+def _file_lock(name: str, key: Hashable) -> Iterator[None]:
+    lock_dir = _settings["lock_dir"]
+    if not lock_dir or fcntl is None:
+        yield
+        return
+
+    stripe = int(hashlib.sha1(repr(key).encode()).hexdigest(), 16) % LOCK_STRIPES
+    with open(os.path.join(lock_dir, f"{name}-{stripe}.lock"), "a+") as handle:
+        # flock has no timeout, so poll; past the deadline run unlocked rather than stall the request.
+        deadline = time.monotonic() + _settings["lock_wait_seconds"]
+        locked = False
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked = True
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            if locked:
+                fcntl.flock(handle, fcntl.LOCK_UN)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import argparse
+import asyncio
+import json
+import threading
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover - only needed to run the replay server
+    websockets = None
+
+from services.market_stream import stream_name
+from services.timeframes import timeframe_to_ms
+
+
+# Local stand-in for the Binance kline WebSocket. It replays recorded candles as combined-stream
+# kline events so MarketStream can be exercised offline:
+#
+#     python -m services.stream_replay recorded.jsonl --port 8765
+#     STREAM_ENABLED=1 STREAM_WS_URL=ws://127.0.0.1:8765 python app.py
+#
+# Each line of the recording is {"symbol": "BTC/USDT", "timeframe": "5m", "candle": [t, o, h, l, c, v]}.
+
+Recording = Dict[str, List[List[float]]]  # stream name -> candles in time order
+
+
+def load_recording(path: str) -> Recording:
+    recording: Recording = {}
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            recording.setdefault(stream_name(entry["symbol"], entry["timeframe"]), []).append(entry["candle"])
+    return recording
+
+
+def kline_event(name: str, candle: List[float], closed: bool) -> str:
+    symbol, interval = name.split("@kline_")
+    open_time = int(candle[0])
+    return json.dumps(
+        {
+            "stream": name,
+            "data": {
+                "e": "kline",
+                "E": open_time,
+                "s": symbol.upper(),
+                "k": {
+                    "t": open_time,
+                    "T": open_time + timeframe_to_ms(interval) - 1,
+                    "s": symbol.upper(),
+                    "i": interval,
+                    "o": str(candle[1]),
+                    "h": str(candle[2]),
+                    "l": str(candle[3]),
+                    "c": str(candle[4]),
+                    "v": str(candle[5]),
+                    "x": closed,
+                },
+            },
+        }
+    )
+
+
+class ReplayServer:
+    """Serves `recording` to every client, `interval` seconds between events, on a background thread."""
+
+    def __init__(
+        self,
+        recording: Recording,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        interval: float = 0.05,
+        loop: bool = False,
+    ):
+        if websockets is None:
+            raise RuntimeError("websockets is not installed")
+        self.recording = recording
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.loop = loop
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Future] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def _events(self, names: List[str]) -> List[Tuple[str, List[float]]]:
+        events = [(name, candle) for name in names for candle in self.recording.get(name, [])]
+        return sorted(events, key=lambda event: event[1][0])
+
+    async def _handler(self, socket, path: Optional[str] = None) -> None:
+        path = path if path is not None else socket.path
+        names = parse_qs(urlparse(path).query).get("streams", [""])[0].split("/")
+        events = self._events([name for name in names if name])
+        try:
+            while True:
+                for name, candle in events:
+                    await socket.send(kline_event(name, candle, closed=True))
+                    await asyncio.sleep(self.interval)
+                if not self.loop:
+                    break
+            await socket.wait_closed()
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _serve(self) -> None:
+        self._stop = asyncio.get_running_loop().create_future()
+        async with websockets.serve(self._handler, self.host, self.port) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._stop
+
+    def start(self) -> "ReplayServer":
+        def run() -> None:
+            self._event_loop = asyncio.new_event_loop()
+            self._event_loop.run_until_complete(self._serve())
+
+        self._thread = threading.Thread(target=run, name="kline-replay", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self) -> None:
+        if self._event_loop is not None and self._stop is not None:
+            self._event_loop.call_soon_threadsafe(self._stop.set_result, None)
+        if self._thread is not None:
+            self._thread.join(5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded candles as a Binance kline WebSocket.")
+    parser.add_argument("recording", help="JSON lines of {symbol, timeframe, candle}")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.25, help="seconds between events")
+    parser.add_argument("--loop", action="store_true", help="restart the recording when it ends")
+    args = parser.parse_args()
+
+    server = ReplayServer(load_recording(args.recording), args.host, args.port, args.interval, args.loop).start()
+    print(f"Replaying on {server.url}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+
+_UNIT_MS = {
+    "s": 1_000,
+    "m": 60_000,
+    "h": 3_600_000,
+    "d": 86_400_000,
+    "w": 604_800_000,
+}
+
+# 1970-01-01 was a Thursday; exchanges open weekly candles on Monday 00:00 UTC.
+_WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def _calendar_months(timeframe: str) -> int:
+    """Months in a calendar timeframe ("1M", "3M"), or 0 for fixed-length timeframes."""
+    timeframe = (timeframe or "").strip()
+    if timeframe.endswith("M") and timeframe[:-1].isdigit() and int(timeframe[:-1]) > 0:
+        return int(timeframe[:-1])
+    return 0
+
+
+def is_calendar_timeframe(timeframe: str) -> bool:
+    """True for month timeframes, whose candles have no fixed length (see timeframe_to_ms)."""
+    return _calendar_months(timeframe) > 0
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Length of a ccxt-style timeframe ("5m", "1h", "1d") in milliseconds.
+
+    Raises ValueError for unknown timeframes and for months ("1M"), which are valid but vary in length.
+    """
+    timeframe = (timeframe or "").strip()
+    if is_calendar_timeframe(timeframe):
+        raise ValueError(f"Timeframe {timeframe!r} has no fixed length")
+    unit = timeframe[-1:]
+    if unit not in _UNIT_MS or not timeframe[:-1].isdigit():
+        raise ValueError(f"Unsupported timeframe: {timeframe!r}")
+    amount = int(timeframe[:-1])
+    if amount <= 0:
+        raise ValueError(f"Unsupported timeframe: {timeframe!r}")
+    return amount * _UNIT_MS[unit]
+
+
+def _month_index(timestamp_ms: int) -> int:
+    moment = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+    return moment.year * 12 + moment.month - 1
+
+
+def _month_start_ms(index: int) -> int:
+    year, month = divmod(index, 12)
+    return int(datetime(year, month + 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def candle_open_ms(timestamp_ms: int, timeframe: str) -> int:
+    """Open time of the candle containing `timestamp_ms`, aligned as the exchange aligns it.
+
+    Fixed-length candles are aligned to the epoch, weeks to Monday and months to the first of the month.
+    """
+    months = _calendar_months(timeframe)
+    if months:
+        return _month_start_ms(_month_index(timestamp_ms) // months * months)
+    step = timeframe_to_ms(timeframe)
+    offset = _WEEK_OFFSET_MS if timeframe.strip().endswith("w") else 0
+    return timestamp_ms - (timestamp_ms - offset) % step
+
+
+def next_boundary_ms(timestamp_ms: int, timeframe: str) -> int:
+    """First candle boundary strictly after `timestamp_ms`."""
+    months = _calendar_months(timeframe)
+    if months:
+        return _month_start_ms(_month_index(timestamp_ms) // months * months + months)
+    return candle_open_ms(timestamp_ms, timeframe) + timeframe_to_ms(timeframe)
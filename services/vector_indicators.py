@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - market_service falls back to the pure-Python loops
+    np = None
+
+
+# NumPy versions of the indicator math in market_service. Every function works along the last
+# axis, so a 1-D array is one price series and a 2-D (symbols x candles) array is many series
+# computed in the same pass.
+
+_BLOCK = 64
+_kernels: Dict[float, Any] = {}
+
+
+def _as_array(values: Any) -> "np.ndarray":
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _kernel(alpha: float):
+    # Lower-triangular weights for one block of y_t = alpha * x_t + (1 - alpha) * y_{t-1}.
+    # Only non-negative powers of (1 - alpha) appear, so the blocked form is as stable as the loop.
+    kernel = _kernels.get(alpha)
+    if kernel is None:
+        decay = 1.0 - alpha
+        lags = np.arange(_BLOCK)[:, None] - np.arange(_BLOCK)[None, :]
+        weights = np.where(lags >= 0, alpha * decay ** np.maximum(lags, 0), 0.0)
+        carry = decay ** np.arange(1, _BLOCK + 1)
+        kernel = (np.ascontiguousarray(weights.T), carry)
+        _kernels[alpha] = kernel
+    return kernel
+
+
+def _smooth(values: "np.ndarray", alpha: float, initial: "np.ndarray") -> "np.ndarray":
+    """Exponential smoothing of `values` (last axis) continuing from `initial`."""
+    weights_t, carry = _kernel(alpha)
+    out = np.empty_like(values)
+    previous = initial
+    length = values.shape[-1]
+    for start in range(0, length, _BLOCK):
+        stop = min(start + _BLOCK, length)
+        size = stop - start
+        block = values[..., start:stop] @ weights_t[:size, :size]
+        block += previous[..., None] * carry[:size]
+        out[..., start:stop] = block
+        previous = block[..., -1]
+    return out
+
+
+def ema(values: Any, period: int) -> "np.ndarray":
+    """EMA seeded with the first value, matching market_service._ema."""
+    values = _as_array(values)
+    out = np.empty_like(values)
+    if values.shape[-1] == 0:
+        return out
+    out[..., 0] = values[..., 0]
+    out[..., 1:] = _smooth(values[..., 1:], 2 / (period + 1), values[..., 0])
+    return out
+
+
+def macd(values: Any, fast: int = 12, slow: int = 26, signal: int = 9):
+    """Return (macd, signal) series."""
+    values = _as_array(values)
+    macd_series = ema(values, fast) - ema(values, slow)
+    return macd_series, ema(macd_series, signal)
+
+
+def rsi(values: Any, period: int = 14) -> "np.ndarray":
+    """Wilder RSI series; entry t uses closes[..., :t + 1], with 50.0 until `period` changes exist."""
+    values = _as_array(values)
+    out = np.full(values.shape, 50.0)
+    if values.shape[-1] < period + 1:
+        return out
+    changes = np.diff(values, axis=-1)
+    gains = np.where(changes >= 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+
+    alpha = 1 / period
+    avg_gain = np.empty_like(changes[..., period - 1:])
+    avg_loss = np.empty_like(avg_gain)
+    avg_gain[..., 0] = gains[..., :period].sum(axis=-1) / period
+    avg_loss[..., 0] = losses[..., :period].sum(axis=-1) / period
+    avg_gain[..., 1:] = _smooth(gains[..., period:], alpha, avg_gain[..., 0])
+    avg_loss[..., 1:] = _smooth(losses[..., period:], alpha, avg_loss[..., 0])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values_rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    out[..., period:] = np.where(avg_loss == 0, 100.0, values_rsi)
+    return out
+
+
+def volatility(values: Any) -> "np.ndarray":
+    """Population std-dev of simple returns over the whole last axis, skipping zero prices."""
+    values = _as_array(values)
+    if values.shape[-1] < 2:
+        return np.zeros(values.shape[:-1])
+    previous = values[..., :-1]
+    valid = previous != 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(valid, (values[..., 1:] - previous) / previous, 0.0)
+    count = valid.sum(axis=-1)
+    safe_count = np.maximum(count, 1)
+    mean = returns.sum(axis=-1) / safe_count
+    deviations = np.where(valid, returns - mean[..., None], 0.0)
+    variance = (deviations * deviations).sum(axis=-1) / safe_count
+    return np.where(count >= 2, np.sqrt(variance), 0.0)
+
+
+def rolling_volatility(values: Any, window: int) -> "np.ndarray":
+    """Series form of `volatility`: entry t covers the last `window` returns ending at close t."""
+    values = _as_array(values)
+    out = np.zeros(values.shape)
+    if values.shape[-1] < 2:
+        return out
+    previous = values[..., :-1]
+    valid = previous != 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(valid, (values[..., 1:] - previous) / previous, 0.0)
+
+    pad = np.zeros(values.shape[:-1] + (1,))
+    counts = np.concatenate([pad, np.cumsum(valid, axis=-1)], axis=-1)
+    sums = np.concatenate([pad, np.cumsum(returns, axis=-1)], axis=-1)
+    squares = np.concatenate([pad, np.cumsum(returns * returns, axis=-1)], axis=-1)
+
+    end = np.arange(values.shape[-1])
+    start = np.maximum(end - window, 0)
+    count = counts[..., end] - counts[..., start]
+    total = sums[..., end] - sums[..., start]
+    total_sq = squares[..., end] - squares[..., start]
+    safe_count = np.maximum(count, 1)
+    mean = total / safe_count
+    variance = np.maximum(total_sq / safe_count - mean * mean, 0.0)
+    out[...] = np.where(count >= 2, np.sqrt(variance), 0.0)
+    return out
+
+
+def compute_indicators(values: Any, volatility_window: Optional[int] = None) -> Dict[str, Any]:
+    """Latest last_price / rsi / macd / signal / volatility for one series or a 2-D batch."""
+    values = _as_array(values)
+    if values.shape[-1] == 0:
+        raise RuntimeError("No market data returned")
+    macd_series, signal_series = macd(values)
+    vol_values = values if volatility_window is None else values[..., -(volatility_window + 1):]
+    return {
+        "last_price": values[..., -1],
+        "rsi": rsi(values)[..., -1],
+        "macd": macd_series[..., -1],
+        "signal": signal_series[..., -1],
+        "volatility": volatility(vol_values),
+    }
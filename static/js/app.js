@@ -19,6 +19,16 @@ async function apiRequest(path, method, body) {
   return data;
 }
 
+// List endpoints are paginated: the body is one page and X-Next-Cursor is set when more rows exist.
+async function apiCount(path) {
+  const response = await fetch(path);
+  const data = await response.json();
+  if (!response.ok) {
+    throw new Error(data.error || data.message || "Request failed");
+  }
+  return response.headers.get("X-Next-Cursor") ? `${data.length}+` : data.length;
+}
+
 function showOutput(payload) {
   output.textContent = JSON.stringify(payload, null, 2);
 }
@@ -31,11 +41,11 @@ function setStatus(ok) {
 async function refreshLists() {
   try {
     const [assets, signals] = await Promise.all([
-      apiRequest("/api/assets/", "GET"),
-      apiRequest("/api/signals/", "GET")
+      apiCount("/api/assets/?limit=1000"),
+      apiCount("/api/signals/?limit=1000")
     ]);
-    assetCount.textContent = assets.length;
-    signalCount.textContent = signals.length;
+    assetCount.textContent = assets;
+    signalCount.textContent = signals;
 
     setStatus(true);
   } catch (err) {
@@ -130,3 +140,17 @@ document.getElementById("clearOutput").addEventListener("click", () => {
 });
 
 refreshLists();
+
+// Live updates: the server pushes each new signal/insight once, instead of the page re-polling the lists.
+function bumpCount(element) {
+  const current = element.textContent;
+  if (!current.endsWith("+")) {
+    element.textContent = Number(current) + 1;
+  }
+}
+
+if (window.EventSource) {
+  const events = new EventSource("/api/stream/events");
+  events.addEventListener("signal", () => bumpCount(signalCount));
+  events.addEventListener("insight", (event) => showOutput({ insight: JSON.parse(event.data) }));
+}
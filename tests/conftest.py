@@ -0,0 +1,53 @@
+"""Shared fixtures.
+
+The app is built once, at import time, against a temporary SQLite database with the stream and
+scheduler off, and the exchange and Gemini replaced by the offline fakes in benchmarks/fakes.py.
+Every test gets an app context and an empty database.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORKDIR = tempfile.mkdtemp(prefix="crypto-tests-")
+os.environ.update(
+    DATABASE_PATH=os.path.join(WORKDIR, "test.db"),
+    DATABASE_URL="",
+    LOG_FILE=os.path.join(WORKDIR, "app.log"),
+    LOG_LEVEL="WARNING",
+    EXCHANGE_LOCK_DIR="",
+    SINGLEFLIGHT_LOCK_DIR="",
+    STREAM_ENABLED="0",
+    SCHEDULER_ENABLED="0",
+    PROFILING_ENABLED="0",
+    GEMINI_API_KEY="test",
+    FLASK_DEBUG="0",
+)
+
+from benchmarks.fakes import install_fakes  # noqa: E402
+
+install_fakes()
+
+from app import app as flask_app  # noqa: E402
+from database import db  # noqa: E402
+from services.candle_cache import candle_cache  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        yield flask_app
+        db.session.rollback()
+        for table in reversed(db.metadata.sorted_tables):
+            db.session.execute(table.delete())
+        db.session.commit()
+    candle_cache.invalidate()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import db, AIInsight, AIJob, Asset, Signal
+from services import ai_jobs
+
+CACHED = {"summary": "Cached summary", "recommendation": "Wait", "confidence": 0.7, "risks": ["volatility"]}
+
+
+@pytest.fixture
+def signal(app):
+    asset = Asset(symbol="BTCUSDT", name="Bitcoin")
+    db.session.add(asset)
+    db.session.commit()
+    signal = Signal(asset_id=asset.id, side="buy", confidence=0.5)
+    db.session.add(signal)
+    db.session.commit()
+    return signal
+
+
+def _serve_from_cache(monkeypatch):
+    monkeypatch.setattr(ai_jobs, "cached_generate_insight", lambda **kwargs: (dict(CACHED), True))
+
+
+def test_a_cache_hit_is_answered_from_the_cached_payload(signal, monkeypatch):
+    db.session.add(AIInsight(signal_id=signal.id, summary="Older summary", recommendation="Buy"))
+    db.session.commit()
+    _serve_from_cache(monkeypatch)
+
+    response = ai_jobs.summarize_signal(signal, signal.asset, {}, "key", "model")
+
+    assert response["summary"] == "Cached summary"
+    assert response["recommendation"] == "Wait"
+    assert response["confidence"] == 0.7 and response["cached"] is True
+    assert AIInsight.query.filter_by(signal_id=signal.id, summary="Cached summary").count() == 1
+
+
+def test_a_cache_hit_reuses_a_stored_insight_with_the_same_answer(signal, monkeypatch):
+    db.session.add(AIInsight(signal_id=signal.id, summary="Cached summary", recommendation="Wait"))
+    db.session.commit()
+    _serve_from_cache(monkeypatch)
+
+    ai_jobs.summarize_signal(signal, signal.asset, {}, "key", "model")
+
+    assert AIInsight.query.filter_by(signal_id=signal.id).count() == 1
+
+
+def test_jobs_interrupted_by_a_restart_are_failed(app):
+    stale = datetime.utcnow() - timedelta(seconds=3600)
+    db.session.add_all(
+        [
+            AIJob(id="stale-queued", status="queued", created_at=stale),
+            AIJob(id="stale-running", status="running", created_at=stale),
+            AIJob(id="fresh", status="running"),
+        ]
+    )
+    db.session.commit()
+
+    assert ai_jobs.fail_interrupted_jobs() == 2
+    db.session.expire_all()
+    assert {job.id: job.status for job in AIJob.query.all()} == {
+        "stale-queued": "failed",
+        "stale-running": "failed",
+        "fresh": "running",
+    }
+
+
+def test_polling_a_job_lost_by_another_worker_fails_it(client):
+    db.session.add(AIJob(id="lost", status="running", created_at=datetime.utcnow() - timedelta(seconds=3600)))
+    db.session.commit()
+
+    body = client.get("/api/ai/jobs/lost").get_json()
+
+    assert body["status"] == "failed" and body["error"].startswith("Interrupted")
+
+
+def test_batch_summaries_reject_boolean_signal_ids(client):
+    response = client.post("/api/ai/summary/batch", json={"signal_ids": [1, True]})
+
+    assert response.status_code == 400
+    assert AIJob.query.count() == 0
@@ -0,0 +1,50 @@
+import pytest
+
+from benchmarks.fakes import synthetic_ohlcv
+from database import db, Asset
+from services.backtest import sweep
+from services.exchange_client import get_exchange_client
+
+
+@pytest.fixture
+def asset(app):
+    asset = Asset(symbol="BTCUSDT", name="Bitcoin")
+    db.session.add(asset)
+    db.session.commit()
+    return asset
+
+
+def test_sweep_runs_on_spawned_processes():
+    ohlcv = synthetic_ohlcv("BTC/USDT", "5m", 600)
+    grid = {"rsi_buy": [35.0, 45.0]}
+    assert sweep(ohlcv, grid, 48, processes=2) == sweep(ohlcv, grid, 48, processes=1)
+
+
+@pytest.mark.parametrize(
+    "grid",
+    [{"rsi_buy": ["40"]}, {"rsi_buy": [True]}, {"rsi_buy": 40}, {"rsi_buy": []}, ["rsi_buy"]],
+)
+def test_invalid_sweep_values_are_rejected(client, asset, grid):
+    response = client.post("/api/backtest/", json={"asset_id": asset.id, "days": 1, "sweep": grid})
+    assert response.status_code == 400
+
+
+def test_rules_fix_the_parameters_a_sweep_does_not_vary(client, asset):
+    payload = {"asset_id": asset.id, "days": 2, "horizon": 48, "rules": {"stop_mult": 3.0}}
+    response = client.post("/api/backtest/", json={**payload, "sweep": {"rsi_buy": [35, 45]}})
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert {result["rules"]["stop_mult"] for result in results} == {3.0}
+    assert {result["rules"]["rsi_buy"] for result in results} == {35.0, 45.0}
+
+    response = client.post("/api/backtest/", json={**payload, "sweep": {"stop_mult": [1.5, 2.0]}})
+    assert response.status_code == 400
+
+
+def test_long_unstored_history_is_not_fetched_in_the_request(client, asset):
+    exchange = get_exchange_client("binance").exchange
+    calls = exchange.calls
+    response = client.post("/api/backtest/", json={"asset_id": asset.id, "days": 30})
+    assert response.status_code == 400
+    assert "manage.py backtest" in response.get_json()["error"]
+    assert exchange.calls == calls
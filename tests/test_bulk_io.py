@@ -0,0 +1,82 @@
+import io
+
+from database import db, AIInsight, Asset, Signal
+from services.bulk_io import import_assets, import_signals, iter_records, iter_signal_exports
+
+
+def _asset(symbol="BTCUSDT"):
+    asset = Asset(symbol=symbol, name=symbol)
+    db.session.add(asset)
+    db.session.commit()
+    return asset
+
+
+def test_export_has_one_row_per_signal_with_the_latest_insight(app):
+    asset = _asset()
+    signals = [Signal(asset_id=asset.id, side="buy", confidence=0.5) for _ in range(3)]
+    db.session.add_all(signals)
+    db.session.commit()
+    for signal in signals:
+        for number in range(3):
+            db.session.add(AIInsight(signal_id=signal.id, summary=f"v{number}", recommendation="hold"))
+    db.session.commit()
+
+    # A chunk of one row puts every page boundary next to a signal with several insights.
+    records = list(iter_signal_exports(chunk_size=1))
+    assert [record["id"] for record in records] == [signal.id for signal in signals]
+    assert {record["insight_summary"] for record in records} == {"v2"}
+
+
+def test_export_includes_signals_without_insight(app):
+    asset = _asset()
+    db.session.add(Signal(asset_id=asset.id, side="sell"))
+    db.session.commit()
+    (record,) = iter_signal_exports()
+    assert record["insight_summary"] is None
+
+
+def test_invalid_utf8_and_csv_lines_are_reported_not_raised(app):
+    asset = _asset()
+    body = (
+        b"asset_id,side,confidence\n"
+        + f"{asset.id},buy,0.1\n".encode()
+        + f"{asset.id},sell,\xff\xfe\n".encode("latin-1")
+        + f"{asset.id},buy\rjunk,0.3\n".encode()
+        + f"{asset.id},hold,0.4\n".encode()
+    )
+    report = import_signals(iter_records(io.BytesIO(body), "csv")).to_dict()
+
+    assert report["inserted"] == 2
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert report["errors"][0]["error"] == "invalid UTF-8"
+    assert report["errors"][1]["error"].startswith("invalid CSV")
+
+
+def test_invalid_utf8_ndjson_line_is_reported(app):
+    asset = _asset()
+    body = b'{"asset_id": %d, "side": "buy"}\n{"side": "\xff"}\n{"asset_id": %d, "side": "sell"}' % (asset.id, asset.id)
+    report = import_signals(iter_records(io.BytesIO(body), "ndjson")).to_dict()
+    assert report["inserted"] == 2
+    assert report["errors"] == [{"line": 2, "error": "invalid UTF-8"}]
+
+
+def test_signals_with_an_unknown_timeframe_are_reported(app):
+    asset = _asset()
+    body = b"asset_id,side,timeframe\n%d,buy,1h\n%d,sell,7x\n%d,hold,1M\n" % (asset.id, asset.id, asset.id)
+    report = import_signals(iter_records(io.BytesIO(body), "csv")).to_dict()
+
+    assert report["inserted"] == 2
+    assert report["errors"] == [{"line": 3, "error": "Unsupported timeframe: '7x'"}]
+    assert sorted(signal.timeframe for signal in Signal.query) == ["1M", "1h"]
+
+
+def test_assets_on_an_unsupported_exchange_are_reported(app):
+    body = (
+        b'{"symbol": "BTCUSDT", "name": "Bitcoin", "exchange": "Kraken"}\n'
+        b'{"symbol": "ETHUSDT", "name": "Ethereum", "exchange": "nowhere"}\n'
+    )
+    report = import_assets(iter_records(io.BytesIO(body), "ndjson")).to_dict()
+
+    assert report["inserted"] == 1
+    assert report["errors"] == [{"line": 2, "error": "unsupported exchange nowhere"}]
+    assert [(asset.symbol, asset.exchange) for asset in Asset.query] == [("BTCUSDT", "kraken")]
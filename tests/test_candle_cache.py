@@ -0,0 +1,30 @@
+from benchmarks.fakes import synthetic_ohlcv
+from services import candle_cache as candle_cache_module
+from services.candle_cache import CandleCache
+from services.timeframes import timeframe_to_ms
+
+STEP = timeframe_to_ms("5m")
+START = 1_700_000_000_000 - 1_700_000_000_000 % STEP
+
+
+def test_a_small_read_does_not_shrink_what_an_entry_covers(monkeypatch):
+    clock = {"now": START + 1}
+    monkeypatch.setattr(candle_cache_module, "_now_ms", lambda: clock["now"])
+    cache = CandleCache()
+    full_fetches = []
+
+    def fetch(since, limit):
+        if since is None:
+            full_fetches.append(limit)
+            return synthetic_ohlcv("BTC/USDT", "5m", limit, end_ms=clock["now"])
+        return synthetic_ohlcv("BTC/USDT", "5m", limit, end_ms=clock["now"], since=since)
+
+    key = ("binance", "BTC/USDT", "5m")
+    assert len(cache.get_candles(key, "5m", 303, fetch)) == 303
+    clock["now"] += STEP
+    assert len(cache.get_candles(key, "5m", 100, fetch)) == 100
+    clock["now"] += STEP
+    rows = cache.get_candles(key, "5m", 303, fetch)
+
+    assert len(rows) == 303 and rows[-1][0] == clock["now"] - 1
+    assert full_fetches == [303]
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from benchmarks.fakes import synthetic_ohlcv
+from database import db, Asset
+from services.exchange_client import get_exchange_client
+from services.market_service import (
+    CANDLE_LIMIT,
+    _resample_plan,
+    _stream_seed_limit,
+    configure_resampling,
+    fetch_market_snapshots,
+    start_market_stream,
+)
+from services.market_stream import MarketStream, set_market_stream
+
+
+@pytest.fixture
+def resample_5m():
+    configure_resampling("5m", 1000)
+    yield
+    configure_resampling("5m", 1000)
+
+
+def test_resample_plan_skips_the_base_timeframe(resample_5m):
+    assert _resample_plan(["5m", "15m", "30m", "1h"]) == {"15m": 3 * (CANDLE_LIMIT + 1), "30m": 6 * (CANDLE_LIMIT + 1)}
+    assert _stream_seed_limit("5m") == 1000
+    assert _stream_seed_limit("15m") == CANDLE_LIMIT
+
+
+def test_resampled_snapshots_are_served_from_a_seeded_stream_buffer(app, resample_5m):
+    stream = MarketStream("ws://127.0.0.1:9")
+    stream.subscribe("BTC/USDT", "5m", seed_rows=synthetic_ohlcv("BTC/USDT", "5m", _stream_seed_limit("5m")))
+    stream.connected.set()
+    client = get_exchange_client("binance").exchange
+    calls = client.calls
+    set_market_stream(stream)
+    try:
+        snapshots = fetch_market_snapshots("BTCUSDT", ["5m", "15m", "30m"])
+    finally:
+        set_market_stream(None)
+
+    assert set(snapshots) == {"5m", "15m", "30m"}
+    assert client.calls == calls
+
+
+def test_starting_the_stream_does_not_wait_for_the_seeds(app, monkeypatch):
+    db.session.add_all([Asset(symbol=f"COIN{i}USDT", name=f"Coin {i}") for i in range(3)])
+    db.session.commit()
+    exchange = get_exchange_client("binance").exchange
+    fetch_ohlcv = exchange.fetch_ohlcv
+
+    def slow_fetch(*args, **kwargs):
+        time.sleep(0.3)
+        return fetch_ohlcv(*args, **kwargs)
+
+    monkeypatch.setattr(exchange, "fetch_ohlcv", slow_fetch)
+    app.config.update(STREAM_WS_URL="ws://127.0.0.1:9", STREAM_TIMEFRAMES="5m")
+    started = time.monotonic()
+    stream = start_market_stream(app)
+    try:
+        assert time.monotonic() - started < 0.3
+        buffers = list(stream._buffers.values())
+        assert len(buffers) == 3
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and not all(len(buffer) for buffer in buffers):
+            time.sleep(0.05)
+        assert all(len(buffer) == _stream_seed_limit("5m") for buffer in buffers)
+    finally:
+        stream.stop(5)
+        set_market_stream(None)
@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import synthetic_ohlcv
+from services.market_stream import CandleBuffer, MarketStream, stream_name
+from services.stream_replay import ReplayServer, kline_event
+from services.timeframes import timeframe_to_ms
+
+STEP = timeframe_to_ms("5m")
+CANDLES = synthetic_ohlcv("BTC/USDT", "5m", 40)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _replay(candles):
+    pytest.importorskip("websockets")
+    return ReplayServer({stream_name("BTC/USDT", "5m"): candles}, interval=0.01).start()
+
+
+def test_stream_buffer_fills_from_a_local_replay_server():
+    server = _replay(CANDLES[20:])  # picks up at the seed's open candle
+    stream = MarketStream(server.url)
+    stream.subscribe("BTC/USDT", "5m", seed_rows=CANDLES[:21])
+    stream.start()
+    try:
+        key = ("binance", "BTC/USDT", "5m")
+        assert _wait_for(lambda: len(stream.candles(key, 40)) == 40)
+        assert stream.candles(key, 40) == [list(map(float, row)) for row in CANDLES]
+    finally:
+        stream.stop(5)
+        server.stop()
+
+
+def test_candles_missed_before_a_connect_are_backfilled():
+    server = _replay(CANDLES[30:])  # 20..29 closed while the stream was away
+    calls = []
+
+    def backfill(symbol, timeframe, since, limit):
+        calls.append((symbol, timeframe, since))
+        return [row for row in CANDLES if row[0] >= since][:limit]
+
+    stream = MarketStream(server.url, backfill=backfill)
+    stream.subscribe("BTC/USDT", "5m", seed_rows=CANDLES[:20])
+    stream.start()
+    try:
+        key = ("binance", "BTC/USDT", "5m")
+        assert _wait_for(lambda: len(stream.candles(key, 40)) == 40)
+        assert [row[0] for row in stream.candles(key, 40)] == [row[0] for row in CANDLES]
+        assert calls[0] == ("BTC/USDT", "5m", CANDLES[19][0])
+    finally:
+        stream.stop(5)
+        server.stop()
+
+
+def test_a_gap_keeps_the_buffer_cold_until_it_is_filled():
+    buffer = CandleBuffer(100, STEP)
+    buffer.seed(CANDLES[:10])
+    buffer.apply(CANDLES[15])
+    assert buffer.missing_from == CANDLES[10][0]
+    assert buffer.rows(5) == []
+
+    buffer.fill([])
+    assert buffer.rows(5) == []
+    buffer.fill(CANDLES[10:15])
+    assert buffer.missing_from is None
+    assert [row[0] for row in buffer.rows(16)] == [row[0] for row in CANDLES[:16]]
+
+
+def test_the_last_row_is_refetched_after_a_reconnect():
+    buffer = CandleBuffer(100, STEP)
+    buffer.seed(CANDLES[:10])
+    buffer.mark_suspect()
+    buffer.apply(CANDLES[10])  # contiguous, but candle 9 may have closed with a different close
+    assert buffer.missing_from == CANDLES[9][0]
+
+    buffer.fill([CANDLES[9], [CANDLES[10][0], 1.0, 1.0, 1.0, 1.0, 1.0]])
+    assert buffer.missing_from is None
+    assert buffer.rows(11)[-1] == CANDLES[10]  # the stream's newest row wins over REST
+
+
+def test_staleness_is_tracked_per_key():
+    stream = MarketStream("ws://127.0.0.1:9", stale_seconds=30.0)
+    stream.subscribe("BTC/USDT", "5m", seed_rows=CANDLES[:20])
+    stream.subscribe("ETH/USDT", "5m", seed_rows=CANDLES[:20])
+    stream.connected.set()
+    stream._buffers[("binance", "ETH/USDT", "5m")].updated_at -= 60
+
+    assert len(stream.candles(("binance", "BTC/USDT", "5m"), 20)) == 20
+    assert stream.candles(("binance", "ETH/USDT", "5m"), 20) == []
+
+
+def test_seeding_runs_in_the_background_and_keeps_streamed_rows():
+    stream = MarketStream("ws://127.0.0.1:9")
+    stream.subscribe("BTC/USDT", "5m")
+    stream.connected.set()
+    key = ("binance", "BTC/USDT", "5m")
+    release = threading.Event()
+
+    def load():
+        release.wait(5)
+        return CANDLES[:21]
+
+    stream.seed_async("BTC/USDT", "5m", load)
+    stream.handle_message(kline_event(stream_name("BTC/USDT", "5m"), CANDLES[20], closed=False))
+    assert stream.candles(key, 21) == []
+
+    release.set()
+    assert _wait_for(lambda: len(stream.candles(key, 21)) == 21)
+    stream.stop()
+
+
+def test_seed_and_backfill_failures_are_logged(caplog):
+    def backfill(symbol, timeframe, since, limit):
+        raise RuntimeError("venue down")
+
+    stream = MarketStream("ws://127.0.0.1:9", backfill=backfill)
+    stream.subscribe("BTC/USDT", "5m", seed_rows=CANDLES[:10])
+    stream.subscribe("ETH/USDT", "5m")
+    with caplog.at_level(logging.WARNING, logger="services.market_stream"):
+        stream.seed_async("ETH/USDT", "5m", lambda: backfill("ETH/USDT", "5m", 0, 10))
+        stream.handle_message(kline_event(stream_name("BTC/USDT", "5m"), CANDLES[15], closed=False))
+        assert _wait_for(lambda: len(caplog.records) == 2)
+    stream.stop()
+
+    messages = sorted(record.getMessage() for record in caplog.records)
+    assert messages == [
+        f"Stream backfill failed for BTC/USDT 5m since {CANDLES[10][0]}: venue down",
+        "Stream seed failed for ETH/USDT 5m: venue down",
+    ]
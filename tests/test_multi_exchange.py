@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from database import db, Asset
+from services.exchange_client import get_exchange_client
+from services.timeframes import candle_open_ms, timeframe_to_ms
+
+# Per-venue quotes: (last, bid, ask, last closed candle's close, its volume).
+VENUES = {
+    "binance": (100.0, 99.0, 101.0, 100.0, 10.0),
+    "kraken": (101.0, 100.5, 100.9, 102.0, 30.0),
+    "coinbase": (103.0, 102.0, 104.0, 104.0, 0.0),
+}
+
+
+def _quote(monkeypatch, exchange_id, last, bid, ask, close, volume, delay=0.0, error=None):
+    exchange = get_exchange_client(exchange_id).exchange
+    now = candle_open_ms(int(time.time() * 1000), "5m")
+    rows = [[now - timeframe_to_ms("5m"), close, close, close, close, volume], [now, last, last, last, last, 1.0]]
+
+    def fetch_ticker(symbol):
+        time.sleep(delay)
+        if error:
+            raise RuntimeError(error)
+        return {"symbol": symbol, "last": last, "bid": bid, "ask": ask}
+
+    monkeypatch.setattr(exchange, "fetch_ticker", fetch_ticker)
+    monkeypatch.setattr(exchange, "fetch_ohlcv", lambda symbol, timeframe="5m", since=None, limit=None: rows)
+
+
+@pytest.fixture
+def asset(app):
+    asset = Asset(symbol="BTCUSDT", name="Bitcoin")
+    db.session.add(asset)
+    db.session.commit()
+    return asset
+
+
+def test_consolidates_every_venue(client, asset, monkeypatch):
+    for exchange_id, quote in VENUES.items():
+        _quote(monkeypatch, exchange_id, *quote)
+
+    response = client.post("/api/market/aggregate", json={"asset_id": asset.id, "exchanges": list(VENUES)})
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body["price"] == 101.0
+    assert body["vwap_close"] == pytest.approx((100.0 * 10 + 102.0 * 30) / 40)
+    assert (body["best_bid"], body["best_bid_exchange"]) == (102.0, "coinbase")
+    assert (body["best_ask"], body["best_ask_exchange"]) == (100.9, "kraken")
+    venues = {venue["exchange"]: venue for venue in body["venues"]}
+    assert venues["binance"]["spread"] == pytest.approx(2.0)
+    assert venues["binance"]["spread_bps"] == pytest.approx(200.0)
+    assert venues["kraken"]["spread_bps"] == pytest.approx(0.4 / 100.7 * 10_000)
+    assert all(venue["status"] == "ok" for venue in venues.values())
+
+
+def test_slow_and_failing_venues_are_reported_and_left_out(client, asset, monkeypatch):
+    _quote(monkeypatch, "binance", *VENUES["binance"])
+    _quote(monkeypatch, "kraken", *VENUES["kraken"], delay=2.0)
+    _quote(monkeypatch, "coinbase", *VENUES["coinbase"], error="exchange down")
+
+    started = time.monotonic()
+    response = client.post(
+        "/api/market/aggregate", json={"asset_id": asset.id, "exchanges": list(VENUES), "timeout_seconds": 0.3}
+    )
+    elapsed = time.monotonic() - started
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert elapsed < 1.0
+    venues = {venue["exchange"]: venue for venue in body["venues"]}
+    assert venues["kraken"]["status"] == "timeout"
+    assert venues["coinbase"]["status"] == "error"
+    assert "exchange down" in venues["coinbase"]["error"]
+    assert body["price"] == 100.0
+    assert body["vwap_close"] == 100.0
+    assert body["best_bid_exchange"] == body["best_ask_exchange"] == "binance"
+
+
+def test_rejects_unsupported_exchanges(client, asset):
+    response = client.post("/api/market/aggregate", json={"asset_id": asset.id, "exchanges": ["nope"]})
+    assert response.status_code == 400
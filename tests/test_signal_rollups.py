@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from sqlalchemy import select
+
+from database import db, migrate_schema, Asset, Signal, SignalRollup
+from services.signal_rollups import signal_analytics
+
+
+def _signals(count):
+    asset = Asset(symbol="BTCUSDT", name="Bitcoin")
+    db.session.add(asset)
+    db.session.commit()
+    signals = [Signal(asset_id=asset.id, side="buy", confidence=0.5, created_at=datetime(2026, 1, 1)) for _ in range(count)]
+    db.session.add_all(signals)
+    db.session.commit()
+    return signals
+
+
+def test_writes_keep_rollups_in_step(app):
+    signals = _signals(3)
+    signals[0].side = "sell"
+    db.session.delete(signals[1])
+    db.session.commit()
+
+    totals = {bucket["side"]: bucket["count"] for bucket in signal_analytics(["side"])["buckets"]}
+    assert totals == {"buy": 1, "sell": 1}
+
+
+def test_migrate_backfills_a_newly_created_rollup_table(app):
+    _signals(3)
+    SignalRollup.__table__.drop(db.engine)
+
+    changes = migrate_schema()
+
+    assert "create table signal_rollups" in changes
+    assert "backfill signal_rollups (1 rows)" in changes
+    assert signal_analytics(["side"])["total"]["count"] == 3
+    assert migrate_schema() == []
+    assert db.session.execute(select(SignalRollup.signal_count)).scalars().all() == [3]
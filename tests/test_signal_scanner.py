@@ -0,0 +1,40 @@
+import threading
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from database import db, Asset, Candle, Signal
+
+
+def _assets(count):
+    assets = [Asset(symbol=f"COIN{i}USDT", name=f"Coin {i}") for i in range(count)]
+    db.session.add_all(assets)
+    db.session.commit()
+    return assets
+
+
+def test_scan_threads_leave_all_writes_to_the_calling_session(client):
+    _assets(3)
+    committing_threads = []
+
+    def record(session):
+        committing_threads.append(threading.current_thread())
+
+    event.listen(Session, "after_commit", record)
+    try:
+        response = client.post("/api/signals/scan", json={"timeframes": ["5m", "1h"]})
+    finally:
+        event.remove(Session, "after_commit", record)
+
+    assert response.status_code == 201
+    assert len(response.get_json()["signals"]) == 6
+    assert set(committing_threads) == {threading.current_thread()}
+    assert db.session.execute(select(func.count(Signal.id))).scalar() == 6
+    stored = db.session.execute(select(Candle.asset_id, Candle.timeframe).distinct()).all()
+    assert len(stored) == 6
+
+
+def test_scan_rejects_boolean_asset_ids(client):
+    _assets(1)
+    response = client.post("/api/signals/scan", json={"asset_ids": [True]})
+    assert response.status_code == 400
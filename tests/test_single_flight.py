@@ -0,0 +1,66 @@
+import threading
+import time
+
+from database import db, Asset
+from services.candle_cache import candle_cache
+from services.exchange_client import get_exchange_client
+from services.market_service import fetch_market_snapshots
+from services.single_flight import SingleFlight, configure_single_flight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+    started = threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "done"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 5
+
+
+def test_follower_wait_is_bounded():
+    configure_single_flight(lock_wait_seconds=0.1)
+    try:
+        flight = SingleFlight("test")
+        release = threading.Event()
+        leader = threading.Thread(target=flight.do, args=("key", release.wait, 5))
+        leader.start()
+        time.sleep(0.05)
+        started = time.monotonic()
+        result = flight.do("key", lambda: "own result")
+        assert result == ("own result", False)
+        assert time.monotonic() - started < 1
+        release.set()
+        leader.join()
+    finally:
+        configure_single_flight()
+
+
+def test_snapshot_reuses_candles_another_worker_stored(app):
+    asset = Asset(symbol="BTCUSDT", name="Bitcoin")
+    db.session.add(asset)
+    db.session.commit()
+    exchange = get_exchange_client("binance").exchange
+
+    fetch_market_snapshots(asset.symbol, ["5m", "1h"], asset_id=asset.id)
+    calls = exchange.calls
+    # A worker with a cold candle cache finds the forming candles in the shared store.
+    candle_cache.invalidate()
+    fetch_market_snapshots(asset.symbol, ["5m", "1h"], asset_id=asset.id)
+
+    assert exchange.calls == calls
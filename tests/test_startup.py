@@ -0,0 +1,59 @@
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.startup import LAZY_MODULES, ROOT, _environment, probe
+
+# The worker cold-start check from benchmarks/startup.py, as a regression test. STARTUP_BUDGET_MS
+# loosens the budget on slow CI machines.
+BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1000"))
+
+
+def test_import_app_within_budget_and_without_lazy_backends(tmp_path):
+    probe(str(tmp_path), auto_migrate=True)
+    samples = [json.loads(probe(str(tmp_path)).stdout) for _ in range(3)]
+
+    assert not {module for sample in samples for module in sample["loaded"]}, LAZY_MODULES
+    assert statistics.median(sample["import_ms"] for sample in samples) <= BUDGET_MS
+
+
+def test_migrate_on_a_fresh_database_does_not_start_the_stream(tmp_path):
+    env = _environment(str(tmp_path), auto_migrate=False)
+    env.update(STREAM_ENABLED="1", STREAM_WS_URL="ws://127.0.0.1:9", SCHEDULER_ENABLED="1")
+    result = subprocess.run(
+        [sys.executable, "manage.py", "migrate"], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert "create table assets" in result.stdout
+
+
+def test_services_do_not_import_routes():
+    offenders = []
+    for name in sorted(os.listdir(os.path.join(ROOT, "services"))):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(ROOT, "services", name), encoding="utf-8") as handle:
+            tree = ast.parse(handle.read())
+        for node in ast.walk(tree):
+            modules = [alias.name for alias in node.names] if isinstance(node, ast.Import) else []
+            if isinstance(node, ast.ImportFrom) and node.module:
+                modules = [node.module]
+            offenders += [f"{name}: {module}" for module in modules if module.split(".")[0] == "routes"]
+    assert not offenders
+
+
+def test_the_worker_process_builds_the_app_without_background_work(tmp_path):
+    probe(str(tmp_path), auto_migrate=True)
+    env = _environment(str(tmp_path), auto_migrate=False)
+    env.update(STREAM_ENABLED="1", STREAM_WS_URL="ws://127.0.0.1:9", SCHEDULER_ENABLED="1")
+    code = (
+        "import worker\n"
+        "from services.market_stream import get_market_stream\n"
+        "print(get_market_stream() is None and 'signal_scheduler' not in worker.app.extensions)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "True"
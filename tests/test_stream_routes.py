@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+from routes import stream_routes
+from routes.stream_routes import _in_commit_order
+
+
+def _rows(*ids):
+    return [SimpleNamespace(id=row_id) for row_id in ids]
+
+
+def test_a_stream_does_not_move_past_an_id_that_has_not_committed_yet():
+    ready, gap = _in_commit_order(_rows(11, 12), 9, None, grace_seconds=60)
+    assert ready == [] and gap[0] == 10
+
+    # id 10 commits after 11 and 12: all three are sent, in id order.
+    ready, gap = _in_commit_order(_rows(10, 11, 12), 9, gap, grace_seconds=60)
+    assert [row.id for row in ready] == [10, 11, 12]
+
+
+def test_a_hole_is_skipped_after_the_grace_period():
+    ready, gap = _in_commit_order(_rows(10, 12), 9, None, grace_seconds=60)
+    assert [row.id for row in ready] == [10] and gap[0] == 11
+
+    ready, gap = _in_commit_order(_rows(12), 10, (11, gap[1] - 61), grace_seconds=60)
+    assert [row.id for row in ready] == [12]
+
+
+def test_streams_beyond_the_limit_are_told_to_retry(app, client):
+    app.config["SSE_MAX_STREAMS"] = 1
+    app.config["SSE_MAX_SECONDS"] = 0.01
+    try:
+        first = client.get("/api/stream/events")
+        assert stream_routes._open_streams == 1
+        busy = client.get("/api/stream/events")
+        assert busy.status_code == 200
+        assert busy.get_data() == f"retry: {stream_routes._BUSY_RETRY_MS}\n\n".encode()
+
+        first.get_data()
+        first.close()
+        assert stream_routes._open_streams == 0
+        again = client.get("/api/stream/events")
+        assert again.get_data().startswith(b"retry: ")
+        again.close()
+    finally:
+        app.config["SSE_MAX_STREAMS"] = 24
+        app.config["SSE_MAX_SECONDS"] = 300.0
@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from database import db, Asset
+from services.timeframes import candle_open_ms, is_calendar_timeframe, next_boundary_ms, timeframe_to_ms
+
+
+def _ms(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def test_weekly_candles_open_on_monday():
+    sunday = _ms(2026, 10, 18, 13, 5)
+    assert candle_open_ms(sunday, "1w") == _ms(2026, 10, 12)
+    assert next_boundary_ms(sunday, "1w") == _ms(2026, 10, 19)
+    assert candle_open_ms(_ms(2026, 10, 19), "1w") == _ms(2026, 10, 19)
+
+
+def test_monthly_candles_follow_the_calendar():
+    assert is_calendar_timeframe("1M") and not is_calendar_timeframe("1m")
+    assert candle_open_ms(_ms(2026, 2, 28, 23), "1M") == _ms(2026, 2, 1)
+    assert next_boundary_ms(_ms(2026, 2, 28, 23), "1M") == _ms(2026, 3, 1)
+    assert candle_open_ms(_ms(2026, 12, 31), "3M") == _ms(2026, 10, 1)
+    assert next_boundary_ms(_ms(2026, 12, 31), "3M") == _ms(2027, 1, 1)
+    with pytest.raises(ValueError):
+        timeframe_to_ms("1M")
+
+
+def test_monthly_snapshots_are_fetched_directly(client):
+    asset = Asset(symbol="BTCUSDT", name="Bitcoin")
+    db.session.add(asset)
+    db.session.commit()
+
+    response = client.post("/api/market/snapshot", json={"asset_id": asset.id, "timeframes": ["5m", "1M"]})
+
+    assert response.status_code == 200
+    assert set(response.get_json()) == {"5m", "1M"}
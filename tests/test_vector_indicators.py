@@ -0,0 +1,53 @@
+import math
+
+import numpy as np
+import pytest
+
+from benchmarks.fakes import synthetic_ohlcv
+from services.indicator_engine import IndicatorEngine
+from services.market_service import _compute_indicators_python, compute_indicators, compute_indicators_batch
+
+KEYS = ("last_price", "rsi", "macd", "signal", "volatility")
+WINDOW = 99
+
+
+def _assert_close(actual, expected):
+    for key in KEYS:
+        assert actual[key] == pytest.approx(expected[key], rel=1e-9, abs=1e-9), key
+
+
+def _as_dict(values):
+    return {key: getattr(values, key) for key in KEYS}
+
+
+@pytest.mark.parametrize("count", [1, 2, 15, 30, 100, 1000])
+def test_numpy_matches_pure_python(count):
+    closes = [row[4] for row in synthetic_ohlcv("BTC/USDT", "5m", count, end_ms=1_700_000_000_000)]
+    for window in (None, WINDOW):
+        _assert_close(compute_indicators(closes, window), _compute_indicators_python(closes, window))
+
+
+def test_batch_matches_one_series_at_a_time():
+    matrix = [
+        [row[4] for row in synthetic_ohlcv(symbol, "1h", 200, end_ms=1_700_000_000_000)]
+        for symbol in ("BTC/USDT", "ETH/USDT", "SOL/USDT", "XRP/USDT")
+    ]
+    for row, values in zip(matrix, compute_indicators_batch(np.array(matrix), WINDOW)):
+        _assert_close(values, _compute_indicators_python(row, WINDOW))
+
+
+def test_batch_handles_flat_series():
+    flat = [[100.0] * 50, [1.0 + 0.01 * i for i in range(50)]]
+    for row, values in zip(flat, compute_indicators_batch(np.array(flat), WINDOW)):
+        _assert_close(values, _compute_indicators_python(row, WINDOW))
+        assert all(math.isfinite(values[key]) for key in KEYS)
+
+
+def test_incremental_engine_matches_full_recompute():
+    rows = synthetic_ohlcv("BTC/USDT", "5m", 400, end_ms=1_700_000_000_000)
+    engine = IndicatorEngine(volatility_window=WINDOW)
+    # Slide a 100-candle window forward one candle at a time, as successive snapshots would.
+    for end in range(100, len(rows) + 1, 7):
+        values = engine.update("key", rows[end - 100:end])
+        closes = [row[4] for row in rows[:end]]
+        _assert_close(_as_dict(values), compute_indicators(closes, WINDOW))
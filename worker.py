@@ -0,0 +1,12 @@
+import os
+
+# Standalone scheduler process (Procfile "worker"), so signal precomputation never shares a web worker.
+# The app is built without background work: no market stream, in-app scheduler or job recovery here.
+os.environ["APP_START_BACKGROUND"] = "0"
+
+from app import app
+from services.scheduler import build_scheduler
+
+
+if __name__ == "__main__":
+    build_scheduler(app).run_forever()